@@ -3,8 +3,6 @@ from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 
-from app.firebase_config import init_firebase  # ✅ FIXED: moved to the top-level import
-
 load_dotenv()
 
 def create_app():
@@ -13,8 +11,21 @@ def create_app():
     # Configure CORS
     CORS(app, origins=[os.environ.get('CORS_ORIGINS', 'http://localhost:3000')])
 
-    # ✅ Initialize Firebase
-    init_firebase()
+    # Use the data backend already configured (tests, benchmarks), else the one
+    # DATA_BACKEND selects; Firebase is only initialized when it is used
+    from app.repositories import get_store
+    if get_store().name == 'firebase':
+        # ✅ Initialize Firebase (imported here so the local backends run without firebase_admin)
+        from app.firebase_config import init_firebase
+        init_firebase()
+
+    # Per-route latency, status and size metrics plus database/Agmarknet call timings
+    from app.services.metrics import metrics
+    metrics.init_app(app)
+
+    # Opt-in per-request profiling (PROFILE_SECRET / PROFILE_SAMPLE_RATE); no hooks otherwise
+    from app.services.request_profiler import request_profiler
+    request_profiler.init_app(app)
 
     # Register blueprints
     from app.routes.auth import auth_bp
@@ -22,11 +33,19 @@ def create_app():
     from app.routes.suppliers import suppliers_bp
     from app.routes.orders import orders_bp
     from app.routes.mandi_prices import mandi_bp
+    from app.routes.analytics import analytics_bp
+    from app.routes.metrics import metrics_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(vendors_bp, url_prefix='/api/vendors')
     app.register_blueprint(suppliers_bp, url_prefix='/api/suppliers')
     app.register_blueprint(orders_bp, url_prefix='/api/orders')
     app.register_blueprint(mandi_bp, url_prefix='/api')
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+    app.register_blueprint(metrics_bp)
+
+    # Replay orders accepted before a restart but not yet written to Firebase
+    from app.services.order_queue import order_queue
+    order_queue.start()
 
     return app
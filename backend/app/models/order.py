@@ -2,6 +2,17 @@ from dataclasses import dataclass
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
+# Allowed status changes; delivered and cancelled are final
+ORDER_TRANSITIONS = {
+    'pending': ['confirmed', 'cancelled'],
+    'confirmed': ['preparing', 'shipped', 'cancelled'],
+    'preparing': ['shipped', 'cancelled'],
+    'shipped': ['delivered'],
+    'delivered': [],
+    'cancelled': []
+}
+ORDER_STATUSES = list(ORDER_TRANSITIONS)
+
 @dataclass
 class OrderItem:
     """Individual item in an order"""
@@ -74,6 +85,11 @@ class Order:
             'discount': self.discount
         }
     
+    @staticmethod
+    def can_transition(current_status: str, new_status: str) -> bool:
+        """Check a status change against the order state machine"""
+        return new_status in ORDER_TRANSITIONS.get(current_status, [])
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Order':
         """Create Order object from dictionary"""
@@ -0,0 +1,93 @@
+"""
+Data access layer
+Code reads and writes through `store` (a drop-in for firebase_admin.db, with
+reference(path)) or the collection repositories below, so the backend can be
+swapped with DATA_BACKEND:
+    
+    firebase  Firebase Realtime Database (default)
+    memory    in-process dict tree, for development, load tests and benchmarks
+    sqlite    local file at SQLITE_DATABASE_PATH (default data/swadsupply.sqlite3)
+"""
+from typing import Optional
+import os
+import threading
+
+from app.repositories.instrumented import CallObserver, InstrumentedReference
+from app.repositories.repository import (
+    Repository, ProductRepository, OrderRepository, UserRepository, SupplierRepository, PriceRepository
+)
+
+BACKENDS = ('firebase', 'memory', 'sqlite')
+
+_active = None
+_lock = threading.Lock()
+
+def _create_backend(name: str, **options):
+    if name == 'firebase':
+        from app.repositories.firebase_store import FirebaseStore
+        return FirebaseStore()
+    if name == 'memory':
+        from app.repositories.memory_store import MemoryStore
+        return MemoryStore(options.get('data'))
+    if name == 'sqlite':
+        from app.repositories.sqlite_store import SQLiteStore
+        default_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'swadsupply.sqlite3')
+        return SQLiteStore(options.get('path') or os.environ.get('SQLITE_DATABASE_PATH', default_path))
+    raise ValueError(f"Unknown data backend '{name}', expected one of {', '.join(BACKENDS)}")
+
+def backend_name() -> str:
+    """Backend chosen by configure_store(), or the one DATA_BACKEND selects"""
+    if _active is not None:
+        return _active.name
+    return os.environ.get('DATA_BACKEND', 'firebase').lower()
+
+def configure_store(name: Optional[str] = None, **options):
+    """
+    Select the storage backend (default from DATA_BACKEND) and return it
+    Options: data= initial tree for memory, path= database file for sqlite
+    """
+    global _active
+    backend = _create_backend((name or os.environ.get('DATA_BACKEND', 'firebase')).lower(), **options)
+    with _lock:
+        _active = backend
+    return backend
+
+def get_store():
+    global _active
+    if _active is None:
+        with _lock:
+            if _active is None:
+                _active = _create_backend(backend_name())
+    return _active
+
+class _StoreProxy:
+    """Module-level handle that always forwards to the configured backend"""
+    
+    def __init__(self):
+        self._observer = None
+    
+    def observe(self, observer: Optional[CallObserver]) -> None:
+        """Report every database call to observer(backend, operation, seconds, error); None stops it"""
+        self._observer = observer
+    
+    def reference(self, path: str = '/'):
+        backend = get_store()
+        if self._observer is None:
+            return backend.reference(path)
+        return InstrumentedReference(backend.reference(path), self._observer, backend.name)
+    
+    @property
+    def TransactionAbortedError(self):
+        return get_store().TransactionAbortedError
+    
+    @property
+    def name(self) -> str:
+        return get_store().name
+
+store = _StoreProxy()
+
+product_repository = ProductRepository(store)
+order_repository = OrderRepository(store)
+user_repository = UserRepository(store)
+supplier_repository = SupplierRepository(store)
+price_repository = PriceRepository(store)
@@ -0,0 +1,354 @@
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import json
+import queue
+import random
+import threading
+import time
+
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+class TransactionAbortedError(Exception):
+    """A transaction could not be committed"""
+
+class Event:
+    """Change notification passed to listen() callbacks, shaped like the Admin SDK's"""
+    
+    def __init__(self, event_type: str, path: str, data: Any):
+        self.event_type = event_type
+        self.path = path
+        self.data = data
+
+class ListenerRegistration:
+    """Returned by listen(); close() stops the callbacks"""
+    
+    def __init__(self, store: 'TreeStore', listener: tuple):
+        self._store = store
+        self._listener = listener
+    
+    def close(self) -> None:
+        self._store._remove_listener(self._listener)
+
+def split_path(path: str) -> List[str]:
+    return [part for part in (path or '').split('/') if part]
+
+def clone(value: Any) -> Any:
+    """Deep copy of JSON data"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.loads(json.dumps(value))
+
+def prune(value: Any) -> Any:
+    """Drop nulls and empty objects the way the Realtime Database does"""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, child in value.items():
+            child = prune(child)
+            if child is not None:
+                pruned[str(key)] = child
+        return pruned or None
+    if isinstance(value, list):
+        return [prune(child) for child in value] or None
+    return value
+
+def set_in(root: Optional[Dict[str, Any]], parts: List[str], value: Any) -> Optional[Dict[str, Any]]:
+    """Set (or with None, remove) the value at parts inside root, pruning emptied parents"""
+    value = prune(value)
+    if not parts:
+        return value if isinstance(value, dict) else None
+    
+    root = root if isinstance(root, dict) else {}
+    trail = [root]
+    node = root
+    for part in parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            if value is None:
+                return root or None
+            child = {}
+            node[part] = child
+        node = child
+        trail.append(node)
+    
+    if value is None:
+        node.pop(parts[-1], None)
+    else:
+        node[parts[-1]] = value
+    
+    # Remove parents left empty by a delete
+    for depth in range(len(parts) - 1, 0, -1):
+        if trail[depth]:
+            break
+        del trail[depth - 1][parts[depth - 1]]
+    return root or None
+
+def has_server_values(value: Any) -> bool:
+    if isinstance(value, dict):
+        return '.sv' in value or any(has_server_values(child) for child in value.values())
+    return False
+
+def resolve_server_values(value: Any, current: Any) -> Any:
+    """Replace {'.sv': 'timestamp'} and {'.sv': {'increment': n}} placeholders, given the current value"""
+    if not isinstance(value, dict):
+        return value
+    if '.sv' in value:
+        server_value = value['.sv']
+        if server_value == 'timestamp':
+            return int(time.time() * 1000)
+        if isinstance(server_value, dict) and 'increment' in server_value:
+            if isinstance(current, (int, float)) and not isinstance(current, bool):
+                return current + server_value['increment']
+            return server_value['increment']
+        raise ValueError(f'Unsupported server value: {server_value}')
+    current = current if isinstance(current, dict) else {}
+    return {key: resolve_server_values(child, current.get(key)) for key, child in value.items()}
+
+def get_in(root: Any, parts: List[str]) -> Any:
+    node = root
+    for part in parts:
+        if isinstance(node, dict):
+            node = node.get(part)
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return None
+    return node
+
+def _sort_key(value: Any) -> tuple:
+    """Realtime Database ordering: null < false < true < numbers < strings < objects"""
+    if value is None:
+        return (0, 0)
+    if value is False:
+        return (1, 0)
+    if value is True:
+        return (2, 0)
+    if isinstance(value, (int, float)):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5, 0)
+
+class TreeQuery:
+    """Ordered, filtered read of a node's children"""
+    
+    def __init__(self, reference: 'TreeReference', order_by: str, child_path: Optional[str] = None):
+        self._reference = reference
+        self._order_by = order_by  # 'key', 'child' or 'value'
+        self._child_parts = split_path(child_path) if child_path else []
+        self._start = None
+        self._end = None
+        self._limit_first = None
+        self._limit_last = None
+    
+    def start_at(self, value: Any) -> 'TreeQuery':
+        self._start = value
+        return self
+    
+    def end_at(self, value: Any) -> 'TreeQuery':
+        self._end = value
+        return self
+    
+    def equal_to(self, value: Any) -> 'TreeQuery':
+        self._start = value
+        self._end = value
+        return self
+    
+    def limit_to_first(self, limit: int) -> 'TreeQuery':
+        self._limit_first = limit
+        return self
+    
+    def limit_to_last(self, limit: int) -> 'TreeQuery':
+        self._limit_last = limit
+        return self
+    
+    def get(self) -> 'OrderedDict[str, Any]':
+        children = self._reference.get()
+        if not isinstance(children, dict):
+            return OrderedDict()
+        
+        def ordered_value(key, child):
+            if self._order_by == 'key':
+                return key
+            if self._order_by == 'value':
+                return child
+            return get_in(child, self._child_parts)
+        
+        rows = sorted(
+            ((_sort_key(ordered_value(key, child)), key, child) for key, child in children.items()),
+            key=lambda row: (row[0], row[1])
+        )
+        if self._start is not None:
+            rows = [row for row in rows if row[0] >= _sort_key(self._start)]
+        if self._end is not None:
+            rows = [row for row in rows if row[0] <= _sort_key(self._end)]
+        if self._limit_first is not None:
+            rows = rows[:self._limit_first]
+        if self._limit_last is not None:
+            rows = rows[-self._limit_last:] if self._limit_last else []
+        
+        return OrderedDict((key, child) for _, key, child in rows)
+
+class TreeReference:
+    """A location in a TreeStore, with the subset of the Admin SDK Reference API the app uses"""
+    
+    def __init__(self, store: 'TreeStore', path: str):
+        self._store = store
+        self._parts = split_path(path)
+        self.path = '/' + '/'.join(self._parts)
+    
+    @property
+    def key(self) -> Optional[str]:
+        return self._parts[-1] if self._parts else None
+    
+    def child(self, path: str) -> 'TreeReference':
+        return TreeReference(self._store, '/'.join(self._parts + split_path(path)))
+    
+    def get(self) -> Any:
+        return self._store._read(self._parts)
+    
+    def set(self, value: Any) -> None:
+        self._store._write([(self._parts, value)], 'put')
+    
+    def update(self, values: Dict[str, Any]) -> None:
+        """Multi-location update: every path is written atomically"""
+        if not values:
+            raise ValueError('Dictionary must not be empty')
+        writes = [(self._parts + split_path(path), value) for path, value in values.items()]
+        paths = ['/'.join(parts) for parts, _ in writes]
+        for path in paths:
+            for other in paths:
+                if other.startswith(path + '/'):
+                    raise ValueError(f'Path {path} is an ancestor of {other}')
+        self._store._write(writes, 'patch')
+    
+    def delete(self) -> None:
+        self.set(None)
+    
+    def push(self, value: Any = '') -> 'TreeReference':
+        reference = self.child(self._store.push_id())
+        if value is not None and value != '':
+            reference.set(value)
+        return reference
+    
+    def transaction(self, transaction_update: Callable[[Any], Any]) -> Any:
+        return self._store._transaction(self._parts, transaction_update)
+    
+    def listen(self, callback: Callable[[Event], None]) -> ListenerRegistration:
+        return self._store._listen(self._parts, callback)
+    
+    def order_by_key(self) -> TreeQuery:
+        return TreeQuery(self, 'key')
+    
+    def order_by_child(self, path: str) -> TreeQuery:
+        return TreeQuery(self, 'child', path)
+    
+    def order_by_value(self) -> TreeQuery:
+        return TreeQuery(self, 'value')
+
+class TreeStore(ABC):
+    """
+    Base for local stores holding the database as one JSON tree
+    Subclasses implement _read, _apply_writes and _transaction; listeners,
+    references, queries and push IDs are shared
+    """
+    
+    TransactionAbortedError = TransactionAbortedError
+    name = 'tree'
+    
+    def __init__(self):
+        self._listeners = []  # (parts, callback)
+        self._listeners_lock = threading.Lock()
+        self._events = None  # queue feeding the dispatcher thread, created on first listen
+        self._push_lock = threading.Lock()
+        self._last_push_time = 0
+        self._last_push_random = []
+    
+    def reference(self, path: str = '/') -> TreeReference:
+        return TreeReference(self, path)
+    
+    def push_id(self) -> str:
+        """Chronologically ordered 20-character key, like Firebase push IDs"""
+        with self._push_lock:
+            now = int(time.time() * 1000)
+            if now == self._last_push_time:
+                # Same millisecond: increment the random part so keys stay ordered
+                for index in range(11, -1, -1):
+                    if self._last_push_random[index] < 63:
+                        self._last_push_random[index] += 1
+                        break
+                    self._last_push_random[index] = 0
+            else:
+                self._last_push_time = now
+                self._last_push_random = [random.randrange(64) for _ in range(12)]
+            
+            stamp = ''
+            for _ in range(8):
+                stamp = PUSH_CHARS[now % 64] + stamp
+                now //= 64
+            return stamp + ''.join(PUSH_CHARS[index] for index in self._last_push_random)
+    
+    @abstractmethod
+    def _read(self, parts: List[str]) -> Any:
+        """Value at parts, copied so callers cannot change stored data"""
+    
+    @abstractmethod
+    def _apply_writes(self, writes: List[Tuple[List[str], Any]]) -> List[Tuple[List[str], Any]]:
+        """Apply all writes atomically; returns them with server values resolved"""
+    
+    @abstractmethod
+    def _transaction(self, parts: List[str], transaction_update: Callable[[Any], Any]) -> Any:
+        """Atomically replace the value at parts with transaction_update(value) and return it"""
+    
+    def _write(self, writes: List[Tuple[List[str], Any]], event_type: str) -> None:
+        self._notify(self._apply_writes(writes), event_type)
+    
+    def _listen(self, parts: List[str], callback: Callable[[Event], None]) -> ListenerRegistration:
+        listener = (parts, callback)
+        with self._listeners_lock:
+            if self._events is None:
+                self._events = queue.Queue()
+                threading.Thread(target=self._dispatch, name=f'{self.name}-listeners', daemon=True).start()
+            self._listeners.append(listener)
+        # Like the SDK, the first callback carries the current value
+        self._events.put((callback, Event('put', '/', self._read(parts))))
+        return ListenerRegistration(self, listener)
+    
+    def _remove_listener(self, listener: tuple) -> None:
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+    
+    def _notify(self, writes: List[Tuple[List[str], Any]], event_type: str) -> None:
+        """Queue events for listeners whose location the writes touched"""
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        if not listeners:
+            return
+        
+        for listener_parts, callback in listeners:
+            depth = len(listener_parts)
+            covers_listener = False
+            below = {}
+            for parts, value in writes:
+                if parts[:depth] == listener_parts and len(parts) > depth:
+                    below['/'.join(parts[depth:])] = clone(prune(value))
+                elif listener_parts[:len(parts)] == parts:
+                    covers_listener = True
+            
+            if covers_listener:
+                self._events.put((callback, Event('put', '/', self._read(listener_parts))))
+            elif event_type == 'put' and len(below) == 1:
+                path, value = next(iter(below.items()))
+                self._events.put((callback, Event('put', '/' + path, value)))
+            elif below:
+                self._events.put((callback, Event('patch', '/', below)))
+    
+    def _dispatch(self) -> None:
+        """Deliver events in write order, off the writer's thread"""
+        while True:
+            callback, event = self._events.get()
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in database listener callback: {e}")
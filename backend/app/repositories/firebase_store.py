@@ -0,0 +1,14 @@
+from typing import Any
+
+class FirebaseStore:
+    """Firebase Realtime Database through the Admin SDK (the production backend)"""
+    
+    name = 'firebase'
+    
+    def __init__(self):
+        from firebase_admin import db
+        self._db = db
+        self.TransactionAbortedError = db.TransactionAbortedError
+    
+    def reference(self, path: str = '/') -> Any:
+        return self._db.reference(path)
@@ -0,0 +1,92 @@
+from typing import Any, Callable, Dict
+import time
+
+# observer(backend, operation, seconds, error)
+CallObserver = Callable[[str, str, float, bool], None]
+
+def _timed(observer: CallObserver, backend: str, operation: str, call: Callable, *args, **kwargs) -> Any:
+    started = time.perf_counter()
+    error = True
+    try:
+        result = call(*args, **kwargs)
+        error = False
+        return result
+    finally:
+        observer(backend, operation, time.perf_counter() - started, error)
+
+class InstrumentedQuery:
+    """A query whose get() is reported to the observer as one 'query' call"""
+    
+    def __init__(self, query: Any, observer: CallObserver, backend: str):
+        self._query = query
+        self._observer = observer
+        self._backend = backend
+    
+    def start_at(self, value: Any) -> 'InstrumentedQuery':
+        self._query = self._query.start_at(value)
+        return self
+    
+    def end_at(self, value: Any) -> 'InstrumentedQuery':
+        self._query = self._query.end_at(value)
+        return self
+    
+    def equal_to(self, value: Any) -> 'InstrumentedQuery':
+        self._query = self._query.equal_to(value)
+        return self
+    
+    def limit_to_first(self, limit: int) -> 'InstrumentedQuery':
+        self._query = self._query.limit_to_first(limit)
+        return self
+    
+    def limit_to_last(self, limit: int) -> 'InstrumentedQuery':
+        self._query = self._query.limit_to_last(limit)
+        return self
+    
+    def get(self, *args, **kwargs) -> Any:
+        return _timed(self._observer, self._backend, 'query', self._query.get, *args, **kwargs)
+
+class InstrumentedReference:
+    """
+    Wraps a backend reference so every database round trip (get, set, update,
+    delete, push, transaction, query) is reported to the observer with its
+    duration; anything else is passed through
+    """
+    
+    def __init__(self, reference: Any, observer: CallObserver, backend: str):
+        self._reference = reference
+        self._observer = observer
+        self._backend = backend
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._reference, name)
+    
+    def child(self, path: str) -> 'InstrumentedReference':
+        return InstrumentedReference(self._reference.child(path), self._observer, self._backend)
+    
+    def get(self, *args, **kwargs) -> Any:
+        return _timed(self._observer, self._backend, 'get', self._reference.get, *args, **kwargs)
+    
+    def set(self, value: Any) -> None:
+        _timed(self._observer, self._backend, 'set', self._reference.set, value)
+    
+    def update(self, values: Dict[str, Any]) -> None:
+        _timed(self._observer, self._backend, 'update', self._reference.update, values)
+    
+    def delete(self) -> None:
+        _timed(self._observer, self._backend, 'delete', self._reference.delete)
+    
+    def push(self, value: Any = '') -> 'InstrumentedReference':
+        reference = _timed(self._observer, self._backend, 'push', self._reference.push, value)
+        return InstrumentedReference(reference, self._observer, self._backend)
+    
+    def transaction(self, transaction_update: Callable[[Any], Any]) -> Any:
+        return _timed(self._observer, self._backend, 'transaction', self._reference.transaction, transaction_update)
+    
+    def order_by_key(self) -> InstrumentedQuery:
+        return InstrumentedQuery(self._reference.order_by_key(), self._observer, self._backend)
+    
+    def order_by_child(self, path: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._reference.order_by_child(path), self._observer, self._backend)
+    
+    def order_by_value(self) -> InstrumentedQuery:
+        return InstrumentedQuery(self._reference.order_by_value(), self._observer, self._backend)
@@ -0,0 +1,45 @@
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from app.repositories.base import TreeStore, clone, get_in, set_in, has_server_values, resolve_server_values
+import threading
+
+class MemoryStore(TreeStore):
+    """
+    Process-local database held as a dict tree
+    For development, load tests and benchmarks; nothing survives a restart
+    and each gunicorn worker has its own copy
+    """
+    
+    name = 'memory'
+    
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self._root = set_in(None, [], clone(data)) or {}
+        self._lock = threading.RLock()
+    
+    def load(self, data: Dict[str, Any]) -> None:
+        """Replace the whole tree, e.g. with fixtures"""
+        self._write([([], clone(data))], 'put')
+    
+    def _read(self, parts: List[str]) -> Any:
+        with self._lock:
+            return clone(get_in(self._root, parts))
+    
+    def _apply_writes(self, writes: List[Tuple[List[str], Any]]) -> List[Tuple[List[str], Any]]:
+        # Copy before taking the lock so callers cannot mutate stored data afterwards
+        writes = [(parts, clone(value)) for parts, value in writes]
+        applied = []
+        with self._lock:
+            for parts, value in writes:
+                if has_server_values(value):
+                    value = resolve_server_values(value, get_in(self._root, parts))
+                self._root = set_in(self._root, parts, value) or {}
+                applied.append((parts, value))
+        return applied
+    
+    def _transaction(self, parts: List[str], transaction_update: Callable[[Any], Any]) -> Any:
+        # Holding the lock makes the read-modify-write atomic, so nothing is retried
+        with self._lock:
+            new_value = clone(transaction_update(clone(get_in(self._root, parts))))
+            self._root = set_in(self._root, parts, new_value) or {}
+        self._notify([(parts, new_value)], 'put')
+        return clone(new_value)
@@ -0,0 +1,85 @@
+from typing import Dict, Any, Optional
+import uuid
+
+class Repository:
+    """
+    Records of one collection (products/{id}, orders/{id}, ...)
+    The store is looked up on every call, so repositories created at import
+    time follow configure_store()
+    """
+    
+    collection = ''
+    
+    def __init__(self, store):
+        self._store = store
+    
+    def ref(self, record_id: Optional[str] = None):
+        """Reference to the collection, or to one record"""
+        path = f'{self.collection}/{record_id}' if record_id else self.collection
+        return self._store.reference(path)
+    
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        return self.ref(record_id).get()
+    
+    def list_all(self) -> Dict[str, Dict[str, Any]]:
+        return self.ref().get() or {}
+    
+    def create(self, data: Dict[str, Any], record_id: Optional[str] = None) -> str:
+        """Store a new record and return its ID (a UUID unless one is given)"""
+        record_id = record_id or str(uuid.uuid4())
+        self.ref(record_id).set(data)
+        return record_id
+    
+    def save(self, record_id: str, data: Dict[str, Any]) -> None:
+        self.ref(record_id).set(data)
+    
+    def update(self, record_id: str, fields: Dict[str, Any]) -> None:
+        self.ref(record_id).update(fields)
+    
+    def delete(self, record_id: str) -> None:
+        self.ref(record_id).delete()
+
+class ProductRepository(Repository):
+    collection = 'products'
+
+class OrderRepository(Repository):
+    collection = 'orders'
+    
+    def list_created_since(self, created_at: str) -> Dict[str, Dict[str, Any]]:
+        """Orders whose created_at is at or after the given ISO time"""
+        return self.ref().order_by_child('created_at').start_at(created_at).get() or {}
+
+class UserRepository(Repository):
+    collection = 'users'
+
+class SupplierRepository(Repository):
+    collection = 'suppliers'
+    
+    def get_reviews(self, supplier_id: str) -> Dict[str, Dict[str, Any]]:
+        return self._store.reference(f'reviews/suppliers/{supplier_id}').get() or {}
+    
+    def add_review(self, supplier_id: str, review_data: Dict[str, Any]) -> str:
+        """Append a review under a chronological push ID and return the ID"""
+        return self._store.reference(f'reviews/suppliers/{supplier_id}').push(review_data).key
+
+class PriceRepository:
+    """Mandi price data: the synced market prices, the API cache and price history"""
+    
+    def __init__(self, store):
+        self._store = store
+    
+    def get_mandi_prices(self) -> Optional[Dict[str, Any]]:
+        return self._store.reference('mandi_prices').get()
+    
+    def get_cached_prices(self) -> Optional[Dict[str, Any]]:
+        return self._store.reference('cache/mandi_prices').get()
+    
+    def set_cached_prices(self, data: Dict[str, Any]) -> None:
+        self._store.reference('cache/mandi_prices').set(data)
+    
+    def get_history(self, supplier_id: Optional[str] = None) -> Dict[str, Any]:
+        path = f'price_history/{supplier_id}' if supplier_id else 'price_history'
+        return self._store.reference(path).get() or {}
+    
+    def save_validation(self, product_id: str, key: str, validation: Dict[str, Any]) -> None:
+        self._store.reference(f'price_validations/{product_id}/{key}').set(validation)
@@ -0,0 +1,149 @@
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from app.repositories.base import TreeStore, clone, get_in, prune, set_in, has_server_values, resolve_server_values
+import json
+import os
+import sqlite3
+import threading
+
+class SQLiteStore(TreeStore):
+    """
+    Database tree persisted in a local SQLite file
+    Each second-level node (orders/{id}, products/{id}, ...) is one row of
+    JSON, so reading or writing a record touches one row and collections are
+    a range scan. Writes and transactions run under BEGIN IMMEDIATE, which
+    serializes them across threads and processes sharing the file
+    """
+    
+    name = 'sqlite'
+    
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS nodes ('
+            'collection TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+            'PRIMARY KEY (collection, key))'
+        )
+    
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit mode; transactions are opened explicitly
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+    
+    def _read(self, parts: List[str]) -> Any:
+        return self._read_with(self._connection(), parts)
+    
+    def _read_with(self, connection: sqlite3.Connection, parts: List[str]) -> Any:
+        if len(parts) >= 2:
+            row = connection.execute(
+                'SELECT value FROM nodes WHERE collection = ? AND key = ?', (parts[0], parts[1])
+            ).fetchone()
+            return get_in(json.loads(row[0]), parts[2:]) if row else None
+        
+        if parts:
+            rows = connection.execute(
+                'SELECT key, value FROM nodes WHERE collection = ?', (parts[0],)
+            ).fetchall()
+        else:
+            rows = connection.execute('SELECT collection, key, value FROM nodes').fetchall()
+            tree = {}
+            for collection, key, value in rows:
+                if key == '':
+                    tree[collection] = json.loads(value)
+                else:
+                    tree.setdefault(collection, {})[key] = json.loads(value)
+            return tree or None
+        
+        # A collection stored as a single leaf value has the empty key
+        for key, value in rows:
+            if key == '':
+                return json.loads(value)
+        return {key: json.loads(value) for key, value in rows} or None
+    
+    def _apply_writes(self, writes: List[Tuple[List[str], Any]]) -> List[Tuple[List[str], Any]]:
+        connection = self._connection()
+        applied = []
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for parts, value in writes:
+                if has_server_values(value):
+                    value = resolve_server_values(value, self._read_with(connection, parts))
+                self._write_with(connection, parts, value)
+                applied.append((parts, value))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return applied
+    
+    def _transaction(self, parts: List[str], transaction_update: Callable[[Any], Any]) -> Any:
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            new_value = clone(transaction_update(self._read_with(connection, parts)))
+            self._write_with(connection, parts, new_value)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        self._notify([(parts, new_value)], 'put')
+        return new_value
+    
+    def _write_with(self, connection: sqlite3.Connection, parts: List[str], value: Any) -> None:
+        if not parts:
+            connection.execute('DELETE FROM nodes')
+            tree = prune(value)
+            for collection, children in (tree if isinstance(tree, dict) else {}).items():
+                self._write_collection(connection, collection, children)
+            return
+        
+        if len(parts) == 1:
+            connection.execute('DELETE FROM nodes WHERE collection = ?', (parts[0],))
+            self._write_collection(connection, parts[0], prune(value))
+            return
+        
+        collection, key = parts[0], parts[1]
+        if len(parts) == 2:
+            document = prune(value)
+        else:
+            row = connection.execute(
+                'SELECT value FROM nodes WHERE collection = ? AND key = ?', (collection, key)
+            ).fetchone()
+            current = json.loads(row[0]) if row else None
+            document = set_in(current if isinstance(current, dict) else None, parts[2:], value)
+        
+        # The collection now has children, so it is no longer a leaf
+        connection.execute('DELETE FROM nodes WHERE collection = ? AND key = ?', (collection, ''))
+        if document is None:
+            connection.execute('DELETE FROM nodes WHERE collection = ? AND key = ?', (collection, key))
+        else:
+            connection.execute(
+                'INSERT OR REPLACE INTO nodes (collection, key, value) VALUES (?, ?, ?)',
+                (collection, key, json.dumps(document))
+            )
+    
+    @staticmethod
+    def _write_collection(connection: sqlite3.Connection, collection: str, children: Any) -> None:
+        """Insert an already pruned collection value"""
+        if children is None:
+            return
+        if not isinstance(children, dict):
+            connection.execute(
+                'INSERT INTO nodes (collection, key, value) VALUES (?, ?, ?)',
+                (collection, '', json.dumps(children))
+            )
+            return
+        connection.executemany(
+            'INSERT INTO nodes (collection, key, value) VALUES (?, ?, ?)',
+            [(collection, key, json.dumps(child)) for key, child in children.items()]
+        )
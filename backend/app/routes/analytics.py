@@ -0,0 +1,126 @@
+from flask import Blueprint, request, jsonify
+from app.services.analytics_replica import analytics_replica
+from app.services.sales_rollups import sales_rollup_service
+from datetime import date, timedelta
+from app.models.order import ORDER_STATUSES
+import time
+
+analytics_bp = Blueprint('analytics', __name__)
+
+def _report_filters():
+    """start/end dates and statuses from the query string; cancelled orders are left out by default"""
+    statuses = request.args.get('status')
+    if statuses:
+        statuses = [status for status in statuses.split(',') if status]
+        unknown = [status for status in statuses if status not in ORDER_STATUSES]
+        if unknown:
+            raise ValueError(f'Unknown status: {", ".join(unknown)}')
+    else:
+        statuses = [status for status in ORDER_STATUSES if status != 'cancelled']
+    return request.args.get('start'), request.args.get('end'), statuses
+
+def _replica_report(build):
+    """Run a replica query, or 503 while the replica is still loading"""
+    if not analytics_replica.ensure_started():
+        return jsonify({'error': 'Analytics replica is still loading, retry shortly'}), 503
+    
+    started = time.monotonic()
+    rows = build()
+    return jsonify({
+        'rows': rows,
+        'query_ms': round((time.monotonic() - started) * 1000, 2)
+    })
+
+@analytics_bp.route('/suppliers/<supplier_id>/products', methods=['GET'])
+def get_supplier_product_sales(supplier_id):
+    """Units, revenue and orders per product for a supplier, best sellers first"""
+    try:
+        start, end, statuses = _report_filters()
+        limit = request.args.get('limit', 50, type=int)
+        return _replica_report(lambda: analytics_replica.sales_by_product(supplier_id, start, end, statuses, limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/suppliers/<supplier_id>/daily', methods=['GET'])
+def get_supplier_daily_sales(supplier_id):
+    """Orders and revenue per day for a supplier"""
+    try:
+        start, end, statuses = _report_filters()
+        return _replica_report(lambda: analytics_replica.sales_by_day(supplier_id, start, end, statuses))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/suppliers/<supplier_id>/statuses', methods=['GET'])
+def get_supplier_orders_by_status(supplier_id):
+    """Order count and value per status for a supplier"""
+    try:
+        start, end, _ = _report_filters()
+        return _replica_report(lambda: analytics_replica.orders_by_status(supplier_id, start, end))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/suppliers', methods=['GET'])
+def get_sales_by_supplier():
+    """Admin report: orders, revenue and vendors per supplier"""
+    try:
+        start, end, statuses = _report_filters()
+        limit = request.args.get('limit', 50, type=int)
+        return _replica_report(lambda: analytics_replica.sales_by_supplier(start, end, statuses, limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/suppliers/<supplier_id>/dashboard', methods=['GET'])
+def get_supplier_dashboard(supplier_id):
+    """Revenue, units and orders per product and per day or week, from the sales rollups"""
+    try:
+        end = request.args.get('end') or date.today().isoformat()
+        start = request.args.get('start') or (date.fromisoformat(end[:10]) - timedelta(days=29)).isoformat()
+        group_by = request.args.get('group_by', 'day')
+        
+        return jsonify(sales_rollup_service.get_dashboard(supplier_id, start, end, group_by))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/rollups/rebuild', methods=['POST'])
+def rebuild_sales_rollups():
+    """Backfill or repair the sales rollups from orders"""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = sales_rollup_service.rebuild(data.get('supplier_id'))
+        
+        if not result['success']:
+            return jsonify(result), 500
+        
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/replica/status', methods=['GET'])
+def get_replica_status():
+    """Row counts, sync time and last consistency check of the analytics replica"""
+    try:
+        analytics_replica.ensure_started()
+        return jsonify(analytics_replica.get_status())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/replica/verify', methods=['POST'])
+def verify_replica():
+    """Compare the replica with the database now, repairing drift unless repair is false"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not analytics_replica.ensure_started():
+            return jsonify({'error': 'Analytics replica is still loading, retry shortly'}), 503
+        return jsonify(analytics_replica.verify(repair=data.get('repair', True)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
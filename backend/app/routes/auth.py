@@ -1,13 +1,22 @@
 from flask import Blueprint, request, jsonify
-import firebase_admin
-from firebase_admin import credentials, auth, db
+from app.repositories import user_repository, backend_name
 import os
 import json
 
 auth_bp = Blueprint('auth', __name__)
 
-# Initialize Firebase Admin SDK
-if not firebase_admin._apps:
+def init_firebase_admin() -> bool:
+    """
+    Initialize the Firebase Admin SDK from FIREBASE_CONFIG or FIREBASE_CREDENTIALS_PATH
+    Token verification needs it whatever the data backend; returns False when
+    no credentials are configured (an error on the firebase backend)
+    """
+    import firebase_admin
+    from firebase_admin import credentials
+    
+    if firebase_admin._apps:
+        return True
+    
     firebase_config = os.environ.get('FIREBASE_CONFIG')
     if firebase_config:
         try:
@@ -19,22 +28,43 @@ if not firebase_admin._apps:
     else:
         firebase_credentials_path = os.environ.get('FIREBASE_CREDENTIALS_PATH')
         if not firebase_credentials_path:
-            raise RuntimeError("No Firebase credentials found in environment variables.")
+            if backend_name() == 'firebase':
+                raise RuntimeError("No Firebase credentials found in environment variables.")
+            return False
         cred = credentials.Certificate(firebase_credentials_path)
     firebase_admin.initialize_app(cred, {
         'databaseURL': os.environ.get('FIREBASE_DATABASE_URL')
     })
+    return True
+
+# Initialize Firebase Admin SDK when data lives in Firebase or credentials are configured for token verification
+if backend_name() == 'firebase' or os.environ.get('FIREBASE_CONFIG') or os.environ.get('FIREBASE_CREDENTIALS_PATH'):
+    init_firebase_admin()
+
+def _firebase_admin_ready() -> bool:
+    try:
+        import firebase_admin
+    except ImportError:
+        return False
+    return bool(firebase_admin._apps)
 
 @auth_bp.route('/verify-token', methods=['POST'])
 def verify_token():
+    if not _firebase_admin_ready():
+        return jsonify({
+            'success': False,
+            'error': 'Token verification is not configured: set FIREBASE_CONFIG or FIREBASE_CREDENTIALS_PATH'
+        }), 503
+    
     try:
+        from firebase_admin import auth
+        
         token = request.json.get('token')
         decoded_token = auth.verify_id_token(token)
         uid = decoded_token['uid']
         
-        # Get user data from Realtime Database
-        ref = db.reference(f'users/{uid}')
-        user_data = ref.get()
+        # Get user data from the database
+        user_data = user_repository.get(uid)
         
         return jsonify({
             'success': True,
@@ -47,8 +77,7 @@ def verify_token():
 @auth_bp.route('/get-user-role/<uid>', methods=['GET'])
 def get_user_role(uid):
     try:
-        ref = db.reference(f'users/{uid}')
-        user_data = ref.get()
+        user_data = user_repository.get(uid)
         role = user_data.get('role') if user_data else None
         
         return jsonify({'role': role})
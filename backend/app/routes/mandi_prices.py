@@ -43,3 +43,33 @@ def process_voice_order():
         return jsonify(processed_order)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+MAX_VOICE_BATCH_SIZE = 100
+
+@mandi_bp.route('/process-voice-orders/batch', methods=['POST'])
+def process_voice_orders_batch():
+    try:
+        from app.services.voice_processing import process_voice_batch
+        
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        transcripts = data.get('transcripts')
+        
+        if not isinstance(transcripts, list) or not transcripts:
+            return jsonify({'error': 'transcripts must be a non-empty list'}), 400
+        if len(transcripts) > MAX_VOICE_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_VOICE_BATCH_SIZE} transcripts per batch'}), 400
+        
+        results = process_voice_batch(transcripts)
+        succeeded = sum(1 for result in results if result['success'])
+        
+        return jsonify({
+            'results': results,
+            'total': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,21 @@
+from flask import Blueprint, Response, jsonify
+from app.services.metrics import metrics
+from app.services.request_profiler import request_profiler
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request and downstream-call metrics for Prometheus to scrape"""
+    try:
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        return Response(f'# error rendering metrics: {e}\n', status=500, mimetype='text/plain')
+
+@metrics_bp.route('/profiler/stats', methods=['GET'])
+def get_profiler_stats():
+    """Request profiles taken, skipped and deleted by this worker"""
+    try:
+        return jsonify(request_profiler.get_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
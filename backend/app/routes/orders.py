@@ -1,14 +1,51 @@
-from flask import Blueprint, request, jsonify
-from firebase_admin import db
+from flask import Blueprint, Response, request, jsonify
+from app.repositories import order_repository
 from datetime import datetime
+from app.services.order_status_service import order_status_service
+from app.services.order_queue import order_queue
+from app.services.order_index import build_order_create_updates
+from app.services.idempotency_service import idempotent
+from app.services.order_events import order_event_hub, StreamLimitError
 import uuid
 
 orders_bp = Blueprint('orders', __name__)
 
+# Characters Firebase refuses in keys; such an order could never be flushed
+INVALID_KEY_CHARS = set('.$#[]/')
+
+def _order_body_error(order_data):
+    """Why an order body cannot be queued, or None if it can"""
+    if not isinstance(order_data, dict):
+        return 'Request body must be a JSON object'
+    if not (order_data.get('vendor_id') or order_data.get('vendorId')):
+        return 'vendor_id is required'
+    
+    items = order_data.get('items')
+    if not isinstance(items, list) or not items:
+        return 'items must be a non-empty list'
+    for item in items:
+        if not isinstance(item, dict):
+            return 'Each item must be an object'
+        if not (item.get('product_id') or item.get('product') or item.get('product_name')):
+            return 'Each item needs a product_id, product or product_name'
+        quantity = item.get('quantity', 1)
+        if isinstance(quantity, bool) or not isinstance(quantity, (int, float)) or quantity <= 0:
+            return 'Item quantities must be positive numbers'
+    
+    for fields in [order_data] + items:
+        for key in fields:
+            if not key or INVALID_KEY_CHARS.intersection(key):
+                return f'Invalid field name: {key!r}'
+    return None
+
 @orders_bp.route('/', methods=['POST'])
+@idempotent('orders.create_order')
 def create_order():
     try:
-        order_data = request.json
+        order_data = request.get_json(silent=True)
+        error = _order_body_error(order_data)
+        if error:
+            return jsonify({'error': error}), 400
         
         # Generate order ID
         order_id = str(uuid.uuid4())
@@ -18,11 +55,10 @@ def create_order():
         order_data['createdAt'] = datetime.now().isoformat()
         order_data['status'] = 'pending'
         
-        # Save to Firebase
-        ref = db.reference('orders')
-        ref.child(order_id).set(order_data)
+        # Queue the order and its index entries for write-behind to Firebase
+        order_queue.enqueue(order_id, build_order_create_updates(order_data))
         
-        return jsonify({'success': True, 'orderId': order_id})
+        return jsonify({'success': True, 'orderId': order_id, 'status': 'queued'}), 202
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -31,21 +67,110 @@ def update_order_status(order_id):
     try:
         new_status = request.json.get('status')
         
-        ref = db.reference(f'orders/{order_id}')
-        ref.update({
-            'status': new_status,
-            'updatedAt': datetime.now().isoformat()
-        })
+        outcome = order_status_service.apply_transitions([{'order_id': order_id, 'status': new_status}])
+        result = outcome['results'][0]
+        
+        if not result['success']:
+            return jsonify({'error': result['error']}), 409
         
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@orders_bp.route('/status/bulk', methods=['POST'])
+def bulk_update_order_status():
+    """Move many orders to new statuses in one write, with a result per order"""
+    try:
+        data = request.get_json()
+        
+        # Either explicit per-order changes or one status for a list of orders
+        changes = data.get('changes')
+        if changes is None:
+            changes = [{'order_id': order_id, 'status': data.get('status')} for order_id in data.get('order_ids', [])]
+        
+        if not changes:
+            return jsonify({'error': 'changes or order_ids is required'}), 400
+        if len(changes) > order_status_service.max_batch_size:
+            return jsonify({'error': f'At most {order_status_service.max_batch_size} orders per request'}), 400
+        
+        outcome = order_status_service.apply_transitions(changes, supplier_id=data.get('supplier_id'))
+        
+        return jsonify(outcome), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@orders_bp.route('/queue/stats', methods=['GET'])
+def get_queue_stats():
+    """Depth and flush progress of this worker's order intake queue"""
+    try:
+        return jsonify(order_queue.get_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@orders_bp.route('/stream', methods=['GET'])
+def stream_order_events():
+    """Server-sent events for order changes of a vendor and/or supplier"""
+    vendor_id = request.args.get('vendor_id')
+    supplier_id = request.args.get('supplier_id')
+    if not vendor_id and not supplier_id:
+        return jsonify({'error': 'vendor_id or supplier_id is required'}), 400
+    
+    keys = []
+    if vendor_id:
+        keys.append(f'vendor:{vendor_id}')
+    if supplier_id:
+        keys.append(f'supplier:{supplier_id}')
+    
+    # EventSource resends the last ID it saw when it reconnects
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    try:
+        subscription, backlog = order_event_hub.subscribe(keys, last_event_id)
+    except StreamLimitError as e:
+        # EventSource reconnects after its retry delay
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        yield 'retry: 5000\n\n'
+        if backlog is None:
+            # Too far behind to resume; the client should refetch its orders
+            yield 'event: reset\ndata: {}\n\n'
+        else:
+            for event in backlog:
+                yield order_event_hub.format_event(event)
+        
+        while True:
+            if subscription.overflowed and subscription.events.empty():
+                yield 'event: reset\ndata: {}\n\n'
+                return
+            event = subscription.get(order_event_hub.heartbeat_interval)
+            if event is None:
+                yield ': heartbeat\n\n'
+            else:
+                yield order_event_hub.format_event(event)
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs even if the client leaves before the first chunk, unlike a finally in generate()
+    response.call_on_close(lambda: order_event_hub.unsubscribe(subscription))
+    return response
+
+@orders_bp.route('/stream/stats', methods=['GET'])
+def get_stream_stats():
+    """Connections and buffered events of this worker's order event stream"""
+    try:
+        return jsonify(order_event_hub.get_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @orders_bp.route('/vendor/<vendor_id>', methods=['GET'])
 def get_vendor_orders(vendor_id):
     try:
-        ref = db.reference('orders')
-        all_orders = ref.get()
+        all_orders = order_repository.list_all()
         
         vendor_orders = []
         if all_orders:
@@ -1,6 +1,13 @@
 from flask import Blueprint, request, jsonify
-from firebase_admin import db
-import uuid
+from app.repositories import product_repository, supplier_repository
+from datetime import datetime
+from app.services.trust_score_service import trust_score_service
+from app.services.ranking_service import supplier_ranking_service
+from app.services.autocomplete_service import autocomplete_service
+from app.services.catalog_service import product_catalog
+from app.services.inventory_service import inventory_service
+from app.services.order_index import order_index_service
+from app.models.order import ORDER_STATUSES
 
 suppliers_bp = Blueprint('suppliers', __name__)
 
@@ -8,11 +15,13 @@ suppliers_bp = Blueprint('suppliers', __name__)
 def add_product():
     try:
         product_data = request.json
-        product_id = str(uuid.uuid4())
-        
-        # Save to Firebase
-        ref = db.reference('products')
-        ref.child(product_id).set(product_data)
+        # Save to the database
+        product_id = product_repository.create(product_data)
+        supplier_ranking_service.invalidate_candidates()
+        autocomplete_service.add_product(product_data)
+        product_catalog.upsert(product_id, product_data)
+        if 'quantity_available' in product_data:
+            inventory_service.restock(product_id, product_data['quantity_available'])
         
         return jsonify({'success': True, 'productId': product_id})
     except Exception as e:
@@ -23,8 +32,16 @@ def update_product(product_id):
     try:
         product_data = request.json
         
-        ref = db.reference(f'products/{product_id}')
-        ref.update(product_data)
+        previous_data = product_repository.get(product_id) if 'name' in product_data or 'tags' in product_data else None
+        product_repository.update(product_id, product_data)
+        supplier_ranking_service.invalidate_candidates()
+        product_catalog.apply_update(product_id, product_data)
+        if 'quantity_available' in product_data:
+            inventory_service.restock(product_id, product_data['quantity_available'])
+        
+        if previous_data:
+            autocomplete_service.remove_product(previous_data)
+            autocomplete_service.add_product({**previous_data, **product_data})
         
         return jsonify({'success': True})
     except Exception as e:
@@ -33,9 +50,99 @@ def update_product(product_id):
 @suppliers_bp.route('/products/<product_id>', methods=['DELETE'])
 def delete_product(product_id):
     try:
-        ref = db.reference(f'products/{product_id}')
-        ref.delete()
+        previous_data = product_repository.get(product_id)
+        product_repository.delete(product_id)
+        supplier_ranking_service.invalidate_candidates()
+        autocomplete_service.remove_product(previous_data)
+        product_catalog.remove(product_id)
         
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@suppliers_bp.route('/<supplier_id>/orders', methods=['GET'])
+def get_supplier_inbox(supplier_id):
+    """Get one status tab of a supplier's orders, newest first"""
+    try:
+        status = request.args.get('status', 'pending')
+        if status not in ORDER_STATUSES:
+            return jsonify({'error': f'status must be one of {", ".join(ORDER_STATUSES)}'}), 400
+        
+        page = order_index_service.get_supplier_orders(
+            supplier_id,
+            status,
+            limit=request.args.get('limit', type=int),
+            before=request.args.get('before')
+        )
+        
+        return jsonify(page)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@suppliers_bp.route('/orders/index/rebuild', methods=['POST'])
+def rebuild_supplier_order_index():
+    """Backfill or repair the supplier order inbox index from orders"""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = order_index_service.rebuild_supplier_index(data.get('supplier_id'))
+        
+        if not result['success']:
+            return jsonify(result), 500
+        
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@suppliers_bp.route('/<supplier_id>/trust-score', methods=['GET'])
+def get_trust_score(supplier_id):
+    try:
+        force_recalculate = request.args.get('refresh', 'false').lower() == 'true'
+        trust_score = trust_score_service.get_trust_score(supplier_id, force_recalculate)
+        
+        return jsonify(trust_score)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@suppliers_bp.route('/products/<product_id>/stock', methods=['GET'])
+def get_product_stock(product_id):
+    """Get live stock for a product, summed across its counters"""
+    try:
+        available = inventory_service.get_available(product_id)
+        if available is None:
+            product_data = product_repository.get(product_id)
+            if not product_data:
+                return jsonify({'error': 'Product not found'}), 404
+            available = product_data.get('quantity_available')
+        
+        return jsonify({'product_id': product_id, 'quantity_available': available})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@suppliers_bp.route('/inventory/stats', methods=['GET'])
+def get_inventory_stats():
+    """Reservation outcomes and counter contention for this process"""
+    try:
+        return jsonify(inventory_service.get_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@suppliers_bp.route('/trust-score/cache-stats', methods=['GET'])
+def get_trust_score_cache_stats():
+    try:
+        return jsonify(trust_score_service.get_cache_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@suppliers_bp.route('/<supplier_id>/reviews', methods=['POST'])
+def add_review(supplier_id):
+    try:
+        review_data = request.json
+        review_data['createdAt'] = datetime.now().isoformat()
+        
+        review_id = supplier_repository.add_review(supplier_id, review_data)
+        
+        trust_score_service.update_score_on_review(supplier_id, review_data)
+        
+        return jsonify({'success': True, 'reviewId': review_id})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,6 +1,13 @@
 from flask import Blueprint, request, jsonify
-from firebase_admin import db
+from app.repositories import product_repository, supplier_repository
 from datetime import datetime
+from app.services.ranking_service import supplier_ranking_service
+from app.services.autocomplete_service import autocomplete_service
+from app.services.catalog_service import product_catalog
+from app.services.order_index import build_order_create_updates, order_index_service
+from app.services.inventory_service import inventory_service
+from app.services.order_queue import order_queue
+from app.services.idempotency_service import idempotent
 import uuid
 import json
 
@@ -17,9 +24,8 @@ def get_nearby_suppliers():
         if not vendor_location:
             return jsonify({'error': 'Location is required'}), 400
         
-        # Get all suppliers from Firebase
-        ref = db.reference('suppliers')
-        all_suppliers = ref.get()
+        # Get all suppliers from the database
+        all_suppliers = supplier_repository.list_all()
         
         if not all_suppliers:
             return jsonify({'suppliers': [], 'total_found': 0}), 200
@@ -53,6 +59,42 @@ def get_nearby_suppliers():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@vendors_bp.route('/ranked-suppliers', methods=['POST'])
+def get_ranked_suppliers():
+    """Get the best nearby suppliers ranked by trust score, distance and price"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        vendor_location = data.get('location')
+        product = data.get('product')
+        
+        if not vendor_location:
+            return jsonify({'error': 'Location is required'}), 400
+        
+        try:
+            radius = float(data.get('radius', 10))
+            limit = int(data.get('limit', supplier_ranking_service.default_limit))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'radius and limit must be numbers'}), 400
+        if not 0 < radius < float('inf') or limit < 1:
+            return jsonify({'error': 'radius and limit must be positive'}), 400
+        radius = min(radius, supplier_ranking_service.max_radius)
+        limit = min(limit, supplier_ranking_service.max_limit)
+        
+        ranking = supplier_ranking_service.rank_suppliers(
+            vendor_location, radius=radius, product=product, limit=limit
+        )
+        
+        if 'error' in ranking:
+            return jsonify(ranking), 500
+        
+        return jsonify(ranking), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @vendors_bp.route('/products/search', methods=['GET'])
 def search_products():
     """Search products with filters"""
@@ -63,9 +105,8 @@ def search_products():
         min_price = request.args.get('min_price', type=float)
         max_price = request.args.get('max_price', type=float)
         
-        # Get all products from Firebase
-        ref = db.reference('products')
-        all_products = ref.get()
+        # Get all products from the database
+        all_products = product_repository.list_all()
         
         if not all_products:
             return jsonify({'products': [], 'total_found': 0}), 200
@@ -91,8 +132,7 @@ def search_products():
             
             # Get supplier info
             supplier_id = product_data.get('supplier_id')
-            supplier_ref = db.reference(f'suppliers/{supplier_id}')
-            supplier_data = supplier_ref.get() or {}
+            supplier_data = supplier_repository.get(supplier_id) or {}
             
             product_info = {
                 'id': product_id,
@@ -122,7 +162,25 @@ def search_products():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@vendors_bp.route('/products/autocomplete', methods=['GET'])
+def autocomplete_products():
+    """Complete a partially typed product name, most ordered first"""
+    try:
+        prefix = request.args.get('q', '')
+        limit = min(request.args.get('limit', 5, type=int), 10)
+        
+        suggestions = autocomplete_service.suggest(prefix, limit)
+        
+        response = jsonify({'query': prefix, 'suggestions': suggestions})
+        # Let debounced clients reuse answers for repeated prefixes
+        response.headers['Cache-Control'] = 'public, max-age=30'
+        return response, 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @vendors_bp.route('/orders', methods=['POST'])
+@idempotent('vendors.create_order')
 def create_order():
     """Create a new order"""
     try:
@@ -141,10 +199,11 @@ def create_order():
         total_amount = 0
         processed_items = []
         
+        # Resolve every product in one batched lookup
+        products = product_catalog.get_many([item.get('product_id') for item in data['items']])
+        
         for item in data['items']:
-            # Get product details from Firebase
-            product_ref = db.reference(f'products/{item.get("product_id")}')
-            product_data = product_ref.get()
+            product_data = products.get(item.get('product_id'))
             
             if not product_data:
                 return jsonify({'error': f'Product not found'}), 404
@@ -181,44 +240,71 @@ def create_order():
             'discount': data.get('discount', 0.0)
         }
         
-        # Save to Firebase
-        ref = db.reference('orders')
-        ref.child(order_id).set(order_data)
+        # Hold stock before saving so concurrent orders cannot oversell
+        reservation = inventory_service.reserve(order_id, processed_items, products)
+        if not reservation['success']:
+            return jsonify({
+                'error': reservation['error'],
+                'product_id': reservation['product_id']
+            }), 409
+        
+        # Queue the order and its vendor/supplier index entries as one atomic
+        # write, claiming the stock hold first; the flusher commits it to
+        # Firebase shortly after
+        claims = inventory_service.commit_claims(order_id) if reservation['reserved'] else None
+        try:
+            order_queue.enqueue(order_id, build_order_create_updates(order_data), claims=claims)
+        except Exception:
+            inventory_service.release(order_id)
+            raise
+        
+        autocomplete_service.record_order(processed_items)
         
         return jsonify({
             'success': True,
-            'message': 'Order created successfully',
+            'message': 'Order accepted',
             'order_id': order_id,
-            'total_amount': total_amount
-        }), 201
+            'total_amount': total_amount,
+            'status': 'queued'
+        }), 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @vendors_bp.route('/orders', methods=['GET'])
 def get_vendor_orders():
-    """Get all orders for a specific vendor"""
+    """Get a vendor's orders, newest first, a page at a time"""
     try:
         vendor_id = request.args.get('vendor_id')
         if not vendor_id:
             return jsonify({'error': 'vendor_id is required'}), 400
         
-        # Get all orders from Firebase
-        ref = db.reference('orders')
-        all_orders = ref.get()
+        # Key-range read on the vendor's time-ordered index instead of scanning orders
+        page = order_index_service.get_vendor_orders(
+            vendor_id,
+            limit=request.args.get('limit', type=int),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            before=request.args.get('before')
+        )
         
-        if not all_orders:
-            return jsonify({'orders': []}), 200
-        
-        vendor_orders = []
-        for order_id, order_data in all_orders.items():
-            if order_data.get('vendor_id') == vendor_id:
-                vendor_orders.append(order_data)
-        
-        # Sort by created_at (most recent first)
-        vendor_orders.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        return jsonify(page), 200
+    
+    except ValueError:
+        return jsonify({'error': 'start_date and end_date must be ISO dates'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@vendors_bp.route('/orders/index/rebuild', methods=['POST'])
+def rebuild_vendor_order_index():
+    """Backfill or repair the per-vendor order index from orders"""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = order_index_service.rebuild_vendor_index(data.get('vendor_id'))
         
-        return jsonify({'orders': vendor_orders}), 200
+        if not result['success']:
+            return jsonify(result), 500
         
+        return jsonify(result), 200
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -3,7 +3,9 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import os
-from firebase_admin import db
+import time
+from app.repositories import price_repository
+from app.services.metrics import metrics
 
 class AgmarketService:
     """Service to interact with Agmarknet API for mandi prices"""
@@ -43,8 +45,14 @@ class AgmarketService:
             url = f"{self.base_url}/{self.resource_id}"
             
             # Make API request
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+            started = time.perf_counter()
+            try:
+                response = requests.get(url, params=params, timeout=10)
+                response.raise_for_status()
+            except requests.RequestException:
+                metrics.observe_call('agmarknet', 'get_mandi_prices', time.perf_counter() - started, error=True)
+                raise
+            metrics.observe_call('agmarknet', 'get_mandi_prices', time.perf_counter() - started)
             
             data = response.json()
             
@@ -206,16 +214,14 @@ class AgmarketService:
     def _get_cached_prices(self) -> Optional[Dict[str, Any]]:
         """Get cached prices from Firebase"""
         try:
-            ref = db.reference('cache/mandi_prices')
-            return ref.get()
+            return price_repository.get_cached_prices()
         except Exception:
             return None
     
     def _cache_prices(self, data: Dict[str, Any]) -> None:
         """Cache prices in Firebase"""
         try:
-            ref = db.reference('cache/mandi_prices')
-            ref.set(data)
+            price_repository.set_cached_prices(data)
         except Exception as e:
             print(f"Error caching prices: {e}")
     
@@ -0,0 +1,423 @@
+from typing import Dict, List, Any, Optional, Iterable
+from datetime import datetime
+from app.repositories import store, order_repository, product_repository
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single worker, no file locking
+    fcntl = None
+
+DEFAULT_REPLICA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'analytics_replica.sqlite3'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    vendor_id TEXT,
+    supplier_id TEXT,
+    status TEXT,
+    total_amount REAL,
+    item_count INTEGER,
+    created_at TEXT,
+    order_day TEXT,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_supplier_day ON orders (supplier_id, order_day);
+CREATE INDEX IF NOT EXISTS idx_orders_vendor_day ON orders (vendor_id, order_day);
+CREATE INDEX IF NOT EXISTS idx_orders_day ON orders (order_day);
+
+CREATE TABLE IF NOT EXISTS order_items (
+    order_id TEXT,
+    line INTEGER,
+    supplier_id TEXT,
+    status TEXT,
+    order_day TEXT,
+    product_id TEXT,
+    product_name TEXT,
+    unit TEXT,
+    quantity REAL,
+    unit_price REAL,
+    subtotal REAL,
+    PRIMARY KEY (order_id, line)
+);
+CREATE INDEX IF NOT EXISTS idx_items_supplier_day ON order_items (supplier_id, order_day);
+CREATE INDEX IF NOT EXISTS idx_items_product ON order_items (product_id);
+
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    supplier_id TEXT,
+    name TEXT,
+    category TEXT,
+    price REAL,
+    unit TEXT,
+    quantity_available REAL,
+    is_available INTEGER,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_supplier ON products (supplier_id);
+
+CREATE TABLE IF NOT EXISTS replica_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def _digest(record: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _number(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def order_row(order_id: str, order_data: Dict[str, Any]) -> tuple:
+    """orders table row for backend (snake_case) or web client (camelCase) orders"""
+    created_at = order_data.get('created_at') or order_data.get('createdAt') or ''
+    return (
+        order_id,
+        order_data.get('vendor_id') or order_data.get('vendorId'),
+        order_data.get('supplier_id') or order_data.get('supplierId'),
+        order_data.get('status', 'pending'),
+        _number(order_data.get('total_amount', order_data.get('totalAmount'))),
+        len(order_data.get('items') or []),
+        created_at,
+        created_at[:10],
+        _digest(order_data)
+    )
+
+def item_rows(order_id: str, order_data: Dict[str, Any]) -> List[tuple]:
+    """order_items rows; the order's supplier, status and day are copied for indexed grouping"""
+    _, _, supplier_id, status, _, _, _, order_day, _ = order_row(order_id, order_data)
+    rows = []
+    for line, item in enumerate(order_data.get('items') or []):
+        if not isinstance(item, dict):
+            continue
+        quantity = _number(item.get('quantity', 1))
+        unit_price = _number(item.get('unit_price', item.get('price')))
+        subtotal = item.get('total_price')
+        rows.append((
+            order_id,
+            line,
+            supplier_id,
+            status,
+            order_day,
+            item.get('product_id') or item.get('id'),
+            item.get('product_name') or item.get('name'),
+            item.get('unit'),
+            quantity,
+            unit_price,
+            _number(subtotal) if subtotal is not None else quantity * unit_price
+        ))
+    return rows
+
+def product_row(product_id: str, product_data: Dict[str, Any]) -> tuple:
+    return (
+        product_id,
+        product_data.get('supplier_id') or product_data.get('supplierId'),
+        product_data.get('name'),
+        product_data.get('category'),
+        _number(product_data.get('price')),
+        product_data.get('unit'),
+        product_data.get('quantity_available'),
+        1 if product_data.get('is_available', True) else 0,
+        _digest(product_data)
+    )
+
+class AnalyticsReplica:
+    """
+    Local SQLite mirror of orders and products for analytics queries
+    One process per host maintains it: it claims the replica's lock file,
+    loads both collections from the first listener callback, then applies
+    each change as it streams in. A periodic check compares row digests with
+    the source and repairs drift. Every worker reads the same file, so
+    aggregates are plain indexed SQL instead of full-tree scans
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get('ANALYTICS_REPLICA_PATH', DEFAULT_REPLICA_PATH)
+        self.check_interval = 600  # seconds between consistency checks
+        self.ready_timeout = 10  # seconds a first query waits for the initial load
+        
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._listeners = []
+        self._loaded = {'orders': threading.Event(), 'products': threading.Event()}
+        self._started = False
+        self._stats = {
+            'changes_applied': 0,
+            'last_change_at': None,
+            'last_check': None
+        }
+    
+    def ensure_started(self) -> bool:
+        """
+        Open the replica, and start maintaining it if no other process does
+        Returns True once the replica holds a complete copy
+        """
+        with self._lock:
+            if not self._started:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._connection().executescript(SCHEMA)
+                self._started = True
+            if self._lock_file is None and self._claim():
+                for collection in ('orders', 'products'):
+                    self._loaded[collection].clear()
+                    callback = lambda event, collection=collection: self._on_change(collection, event)
+                    self._listeners.append(store.reference(collection).listen(callback))
+                threading.Thread(target=self._check_periodically, name='analytics-replica-check', daemon=True).start()
+        
+        if self._lock_file is not None:
+            for loaded in self._loaded.values():
+                loaded.wait(timeout=self.ready_timeout)
+        return self._get_meta('synced_at') is not None
+    
+    def is_maintainer(self) -> bool:
+        return self._lock_file is not None
+    
+    def get_status(self) -> Dict[str, Any]:
+        connection = self._connection()
+        return {
+            'path': self.path,
+            'maintainer': self.is_maintainer(),
+            'synced_at': self._get_meta('synced_at'),
+            'orders': connection.execute('SELECT COUNT(*) FROM orders').fetchone()[0],
+            'products': connection.execute('SELECT COUNT(*) FROM products').fetchone()[0],
+            **self._stats
+        }
+    
+    def verify(self, repair: bool = True) -> Dict[str, Any]:
+        """
+        Compare the replica with the source row by row (by digest)
+        Missing, outdated and extra rows are counted and, with repair, fixed
+        """
+        started = time.monotonic()
+        report = {'checked_at': datetime.now().isoformat()}
+        
+        sources = {
+            'orders': order_repository.list_all(),
+            'products': product_repository.list_all()
+        }
+        for collection, records in sources.items():
+            key_column = 'order_id' if collection == 'orders' else 'product_id'
+            replica_digests = dict(self._connection().execute(
+                f'SELECT {key_column}, digest FROM {collection}'
+            ).fetchall())
+            records = {key: value for key, value in records.items() if isinstance(value, dict)}
+            
+            missing = [key for key in records if key not in replica_digests]
+            stale = [key for key in records
+                     if key in replica_digests and replica_digests[key] != _digest(records[key])]
+            extra = [key for key in replica_digests if key not in records]
+            
+            if repair and (missing or stale or extra):
+                self._write(collection, {key: records[key] for key in missing + stale}, extra)
+            report[collection] = {
+                'source': len(records),
+                'missing': len(missing),
+                'stale': len(stale),
+                'extra': len(extra)
+            }
+        
+        report['repaired'] = repair
+        report['duration_ms'] = round((time.monotonic() - started) * 1000, 1)
+        self._stats['last_check'] = report
+        return report
+    
+    def sales_by_product(self, supplier_id: Optional[str] = None, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None, statuses: Optional[Iterable[str]] = None,
+                         limit: int = 50) -> List[Dict[str, Any]]:
+        """Units, revenue and order count per product, best sellers first"""
+        where, params = self._filters('supplier_id', supplier_id, start_date, end_date, statuses)
+        return self._query(
+            'SELECT product_id, product_name, unit, COUNT(DISTINCT order_id) AS orders, '
+            'SUM(quantity) AS units, SUM(subtotal) AS revenue '
+            f'FROM order_items {where} GROUP BY product_id, product_name, unit '
+            'ORDER BY revenue DESC LIMIT ?',
+            params + [limit]
+        )
+    
+    def sales_by_day(self, supplier_id: Optional[str] = None, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     statuses: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Order count and revenue per day, oldest first"""
+        where, params = self._filters('supplier_id', supplier_id, start_date, end_date, statuses)
+        return self._query(
+            'SELECT order_day AS day, COUNT(*) AS orders, SUM(total_amount) AS revenue, '
+            'SUM(item_count) AS items '
+            f'FROM orders {where} GROUP BY order_day ORDER BY order_day',
+            params
+        )
+    
+    def orders_by_status(self, supplier_id: Optional[str] = None, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        where, params = self._filters('supplier_id', supplier_id, start_date, end_date, None)
+        return self._query(
+            f'SELECT status, COUNT(*) AS orders, SUM(total_amount) AS revenue FROM orders {where} '
+            'GROUP BY status ORDER BY orders DESC',
+            params
+        )
+    
+    def sales_by_supplier(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          statuses: Optional[Iterable[str]] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Admin report: order count, revenue and distinct vendors per supplier"""
+        where, params = self._filters('supplier_id', None, start_date, end_date, statuses)
+        return self._query(
+            'SELECT supplier_id, COUNT(*) AS orders, SUM(total_amount) AS revenue, '
+            'COUNT(DISTINCT vendor_id) AS vendors '
+            f'FROM orders {where} GROUP BY supplier_id ORDER BY revenue DESC LIMIT ?',
+            params + [limit]
+        )
+    
+    def _on_change(self, collection: str, event) -> None:
+        """Listener callback: apply one change event to the replica"""
+        try:
+            parts = [part for part in (event.path or '/').split('/') if part]
+            
+            if not parts and event.event_type == 'put':
+                # Initial snapshot, or the whole collection replaced
+                records = {key: value for key, value in (event.data or {}).items() if isinstance(value, dict)}
+                self._write(collection, records, replace=True)
+                self._loaded[collection].set()
+                if all(loaded.is_set() for loaded in self._loaded.values()):
+                    self._set_meta('synced_at', datetime.now().isoformat())
+                return
+            
+            if event.event_type == 'patch':
+                changes = {'/'.join(parts + path.split('/')): value for path, value in (event.data or {}).items()}
+            else:
+                changes = {'/'.join(parts): event.data}
+            
+            upserts, deletes, partial = {}, [], set()
+            for path, value in changes.items():
+                key, _, rest = path.partition('/')
+                if rest:
+                    partial.add(key)
+                elif isinstance(value, dict):
+                    upserts[key] = value
+                else:
+                    deletes.append(key)
+            
+            # A field-level change: read the whole record so its digest stays comparable
+            repository = order_repository if collection == 'orders' else product_repository
+            for key in partial - set(upserts) - set(deletes):
+                record = repository.get(key)
+                if isinstance(record, dict):
+                    upserts[key] = record
+                else:
+                    deletes.append(key)
+            
+            self._write(collection, upserts, deletes)
+            self._stats['changes_applied'] += len(upserts) + len(deletes)
+            self._stats['last_change_at'] = datetime.now().isoformat()
+        except Exception as e:
+            print(f"Error applying change to analytics replica: {e}")
+    
+    def _write(self, collection: str, records: Dict[str, Dict[str, Any]],
+               deletes: Iterable[str] = (), replace: bool = False) -> None:
+        """Upsert and delete rows of one collection in a single transaction"""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if collection == 'orders':
+                if replace:
+                    connection.execute('DELETE FROM orders')
+                    connection.execute('DELETE FROM order_items')
+                stale = list(deletes) + list(records)
+                connection.executemany('DELETE FROM orders WHERE order_id = ?', [(key,) for key in stale])
+                connection.executemany('DELETE FROM order_items WHERE order_id = ?', [(key,) for key in stale])
+                connection.executemany(
+                    'INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [order_row(key, record) for key, record in records.items()]
+                )
+                connection.executemany(
+                    'INSERT INTO order_items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [row for key, record in records.items() for row in item_rows(key, record)]
+                )
+            else:
+                if replace:
+                    connection.execute('DELETE FROM products')
+                connection.executemany('DELETE FROM products WHERE product_id = ?', [(key,) for key in deletes])
+                connection.executemany(
+                    'INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [product_row(key, record) for key, record in records.items()]
+                )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+    
+    def _check_periodically(self) -> None:
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                report = self.verify()
+                drift = sum(report[collection][kind] for collection in ('orders', 'products')
+                            for kind in ('missing', 'stale', 'extra'))
+                if drift:
+                    print(f"Analytics replica repaired {drift} drifted rows")
+            except Exception as e:
+                print(f"Error checking analytics replica: {e}")
+    
+    def _claim(self) -> bool:
+        """Take the maintainer lock; False when another process holds it (lock held)"""
+        lock_file = open(self.path + '.lock', 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+        self._lock_file = lock_file
+        return True
+    
+    def _query(self, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        cursor = self._connection().execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _filters(column: str, value: Optional[str], start_date: Optional[str], end_date: Optional[str],
+                 statuses: Optional[Iterable[str]]) -> tuple:
+        clauses, params = [], []
+        if value:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+        if start_date:
+            clauses.append('order_day >= ?')
+            params.append(start_date[:10])
+        if end_date:
+            clauses.append('order_day <= ?')
+            params.append(end_date[:10])
+        statuses = list(statuses or [])
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        return ('WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+    
+    def _get_meta(self, name: str) -> Optional[str]:
+        row = self._connection().execute('SELECT value FROM replica_meta WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, name: str, value: str) -> None:
+        self._connection().execute('INSERT OR REPLACE INTO replica_meta VALUES (?, ?)', (name, value))
+    
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+# Global instance
+analytics_replica = AnalyticsReplica()
@@ -0,0 +1,165 @@
+from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta
+from app.repositories import product_repository, order_repository
+from app.services.voice_processing import PRODUCT_MAPPING
+from app.utils.prefix_trie import PrefixTrie
+import threading
+import time
+
+# Always suggested, even before the live catalog has loaded
+BASE_PRODUCT_NAMES = [
+    'Onion', 'Tomato', 'Potato', 'Garlic', 'Ginger',
+    'Green Chili', 'Coriander', 'Cooking Oil', 'Turmeric', 'Red Chili',
+    'Carrot', 'Cabbage', 'Cauliflower', 'Spinach', 'Okra',
+    'Eggplant', 'Bell Pepper', 'Cucumber', 'Radish', 'Beetroot'
+]
+
+# Any spoken alias -> all aliases of that product, so "pyaj" completes to "Onion"
+ALIAS_GROUPS = {
+    alias: variations
+    for variations in PRODUCT_MAPPING.values()
+    for alias in variations
+}
+
+class AutocompleteService:
+    """Prefix autocomplete over live product names and aliases, ranked by recent orders"""
+    
+    def __init__(self):
+        self.popularity_window_days = 30
+        self.refresh_interval = 300  # seconds between background catalog rebuilds
+        
+        self._trie = PrefixTrie(top_k=10)
+        self._name_refs = {}  # display name -> number of catalog entries using it
+        self._terms = {}  # display name -> indexed terms
+        self._popularity = {}  # normalized name -> recent order count
+        self._lock = threading.Lock()
+        self._built_at = 0.0
+        self._refreshing = False
+        
+        for name in BASE_PRODUCT_NAMES:
+            self._add_name(name)
+    
+    def suggest(self, prefix: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Return top completions for prefix, most ordered first"""
+        self._refresh_if_stale()
+        
+        prefix = self._normalize(prefix)
+        with self._lock:
+            matches = self._trie.complete(prefix, limit)
+        
+        return [{'name': name, 'popularity': int(score)} for score, name in matches]
+    
+    def add_product(self, product_data: Dict[str, Any]) -> None:
+        """Index a catalog product's name and tags"""
+        name = (product_data or {}).get('name')
+        if not name:
+            return
+        with self._lock:
+            self._add_name(name, product_data.get('tags') or [])
+    
+    def remove_product(self, product_data: Dict[str, Any]) -> None:
+        """Drop a catalog product; its name stays indexed while other products use it"""
+        name = (product_data or {}).get('name')
+        if not name:
+            return
+        with self._lock:
+            self._remove_name(name)
+    
+    def record_order(self, items: List[Dict[str, Any]]) -> None:
+        """Bump popularity of the ordered products"""
+        with self._lock:
+            for item in items:
+                name = item.get('product_name')
+                if not name:
+                    continue
+                key = self._normalize(name)
+                self._popularity[key] = self._popularity.get(key, 0) + 1
+                self._rescore(name)
+    
+    def rebuild(self) -> None:
+        """Rebuild the index from the live catalog and recent orders"""
+        try:
+            all_products = product_repository.list_all()
+            # Only the popularity window is read, through the created_at index
+            cutoff = (datetime.now() - timedelta(days=self.popularity_window_days)).isoformat()
+            recent_orders = order_repository.list_created_since(cutoff)
+            
+            popularity = {}
+            for order_data in recent_orders.values():
+                for item in order_data.get('items', []):
+                    key = self._normalize(item.get('product_name', ''))
+                    if key:
+                        popularity[key] = popularity.get(key, 0) + 1
+            
+            trie = PrefixTrie(top_k=self._trie.top_k)
+            with self._lock:
+                self._trie = trie
+                self._name_refs = {}
+                self._terms = {}
+                self._popularity = popularity
+                for name in BASE_PRODUCT_NAMES:
+                    self._add_name(name)
+                for product_data in all_products.values():
+                    if product_data.get('name'):
+                        self._add_name(product_data['name'], product_data.get('tags') or [])
+                self._built_at = time.monotonic()
+        except Exception as e:
+            print(f"Error rebuilding autocomplete index: {e}")
+        finally:
+            self._refreshing = False
+    
+    def _refresh_if_stale(self) -> None:
+        """Rebuild in the background; requests keep using the current index"""
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._built_at < self.refresh_interval:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.rebuild, name='autocomplete-rebuild', daemon=True).start()
+    
+    def _add_name(self, name: str, tags: Optional[List[str]] = None) -> None:
+        """Index a display name under every word start, plus its tags (lock held)"""
+        name = name.strip()
+        self._name_refs[name] = self._name_refs.get(name, 0) + 1
+        
+        terms = self._terms.setdefault(name, set())
+        words = self._normalize(name).split()
+        for index in range(len(words)):
+            terms.add(' '.join(words[index:]))
+        for tag in tags or []:
+            if isinstance(tag, str) and tag.strip():
+                terms.add(self._normalize(tag))
+        for alias in ALIAS_GROUPS.get(' '.join(words), []):
+            terms.add(alias)
+        
+        self._rescore(name)
+    
+    def _remove_name(self, name: str) -> None:
+        """Release one reference to a display name (lock held)"""
+        name = name.strip()
+        if name not in self._name_refs:
+            return
+        # Base names hold one permanent reference
+        if name in BASE_PRODUCT_NAMES and self._name_refs[name] <= 1:
+            return
+        
+        self._name_refs[name] -= 1
+        if self._name_refs[name] > 0:
+            return
+        
+        del self._name_refs[name]
+        for term in self._terms.pop(name, set()):
+            # Other names indexed under the same term, e.g. a shared tag, stay
+            self._trie.remove(term, name)
+    
+    def _rescore(self, name: str) -> None:
+        """Re-insert a name's terms with its current popularity (lock held)"""
+        score = self._popularity.get(self._normalize(name), 0)
+        for term in self._terms.get(name, set()):
+            self._trie.insert(term, name, score)
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return ' '.join(text.lower().split())
+
+# Global instance
+autocomplete_service = AutocompleteService()
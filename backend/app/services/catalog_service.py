@@ -0,0 +1,114 @@
+from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from app.repositories import product_repository
+import threading
+import time
+
+class ProductCatalog:
+    """
+    In-memory copy of the products tree for hot read paths
+    The snapshot is refreshed in the background; products missing from a
+    fresh snapshot, or requested while it is stale, are read from Firebase
+    concurrently instead of one after another. Products changed through the
+    API while a refresh is loading keep their newer local state
+    """
+    
+    def __init__(self, ttl: float = 30, max_workers: int = 8):
+        self.ttl = ttl  # seconds a snapshot is trusted for prices
+        self._products = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._version = 0  # bumped by every local change
+        self._changed = {}  # product_id -> version of its last local change
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='catalog')
+    
+    def get_many(self, product_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Resolve product IDs to product data (None if not found) in one step"""
+        unique_ids = list(dict.fromkeys(pid for pid in product_ids if pid))
+        
+        products = {}
+        missing = unique_ids
+        
+        snapshot = self._products
+        if snapshot is not None and time.monotonic() - self._loaded_at <= self.ttl:
+            products = {pid: snapshot[pid] for pid in unique_ids if pid in snapshot}
+            missing = [pid for pid in unique_ids if pid not in snapshot]
+        else:
+            self._refresh_in_background()
+        
+        if missing:
+            fetched = self._executor.map(self._fetch_product, missing)
+            products.update(zip(missing, fetched))
+        
+        return {pid: products.get(pid) for pid in unique_ids}
+    
+    def upsert(self, product_id: str, product_data: Dict[str, Any]) -> None:
+        """Apply a product create made through the API"""
+        with self._lock:
+            self._mark_changed(product_id)
+            if self._products is not None:
+                self._products = {**self._products, product_id: dict(product_data)}
+    
+    def apply_update(self, product_id: str, changes: Dict[str, Any]) -> None:
+        """Apply a partial product update; unknown products are left to be fetched"""
+        with self._lock:
+            self._mark_changed(product_id)
+            if self._products is not None and product_id in self._products:
+                self._products = {**self._products, product_id: {**self._products[product_id], **changes}}
+    
+    def remove(self, product_id: str) -> None:
+        """Apply a product delete made through the API"""
+        with self._lock:
+            self._mark_changed(product_id)
+            if self._products is not None and product_id in self._products:
+                products = dict(self._products)
+                del products[product_id]
+                self._products = products
+    
+    def refresh(self) -> bool:
+        """Reload the full catalog from Firebase"""
+        try:
+            with self._lock:
+                started = self._version
+            products = product_repository.list_all()
+            
+            with self._lock:
+                # The download may predate changes applied since it started
+                current = self._products or {}
+                for product_id, version in self._changed.items():
+                    if version <= started:
+                        continue
+                    if product_id in current:
+                        products[product_id] = current[product_id]
+                    else:
+                        # Deleted, or never loaded here: read it when asked for
+                        products.pop(product_id, None)
+                self._changed = {pid: version for pid, version in self._changed.items() if version > started}
+                self._products = products
+                self._loaded_at = time.monotonic()
+            return True
+        except Exception as e:
+            print(f"Error refreshing product catalog: {e}")
+            return False
+        finally:
+            self._refreshing = False
+    
+    def _refresh_in_background(self) -> None:
+        """Start at most one refresh thread at a time"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name='catalog-refresh', daemon=True).start()
+    
+    def _mark_changed(self, product_id: str) -> None:
+        """Record a local change so a refresh already under way does not undo it (lock held)"""
+        self._version += 1
+        self._changed[product_id] = self._version
+    
+    def _fetch_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        return product_repository.get(product_id)
+
+# Global instance
+product_catalog = ProductCatalog()
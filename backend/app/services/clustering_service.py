@@ -1,6 +1,6 @@
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from firebase_admin import db
+from app.repositories import order_repository
 import math
 from dataclasses import dataclass
 
@@ -435,8 +435,7 @@ class ClusteringService:
     def _get_pending_orders(self) -> List[Dict[str, Any]]:
         """Get all pending orders from database"""
         try:
-            ref = db.reference('orders')
-            all_orders = ref.get() or {}
+            all_orders = order_repository.list_all()
             
             pending_orders = []
             for order_id, order_data in all_orders.items():
@@ -0,0 +1,195 @@
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, jsonify, make_response
+from app.repositories import store
+from app.utils.cache import LRUCache
+import hashlib
+import threading
+import time
+import uuid
+
+class IdempotencyService:
+    """
+    Dedupe table for retried POSTs carrying an Idempotency-Key header
+    A request claims its key under idempotency_keys/ in a create-if-absent
+    transaction before the handler runs, so exactly one worker runs it; the
+    claim is replaced by the response once the handler succeeds. Duplicates
+    on any worker poll the record until the response appears. A claim whose
+    worker died lapses after claim_ttl. Completed responses are also kept in a
+    bounded in-memory LRU, so a retry is usually answered without Firebase
+    """
+    
+    def __init__(self):
+        self.key_ttl = timedelta(hours=24)
+        self.claim_ttl = timedelta(seconds=60)  # longer than any handler should run
+        self.wait_timeout = 30  # seconds a duplicate waits for the in-flight original
+        self.poll_interval = 0.1  # seconds between reads of a claimed key
+        self.purge_interval = 3600  # seconds between sweeps of expired persisted keys
+        self.responses = LRUCache(maxsize=10000, ttl=self.key_ttl.total_seconds())
+        
+        self._lock = threading.Lock()
+        self._last_purge = time.monotonic()
+    
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Claim a key before running the request
+        Returns ('run', claim) for the first request, ('replay', record) for a
+        repeat, 'mismatch' if the key was used for a different payload,
+        'busy' if the original is still running after wait_timeout, or
+        'unavailable' if the key cannot be claimed right now
+        """
+        record_key = self._record_key(key)
+        record = self.responses.get(record_key)
+        if record is not None:
+            return self._match(record, fingerprint)
+        
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            claim = self._new_claim(fingerprint)
+            try:
+                record = self._claim(record_key, claim)
+            except Exception as e:
+                # Running unclaimed could run the request twice
+                print(f"Error claiming idempotency key: {e}")
+                return 'unavailable', None
+            if record.get('claim_id') == claim['claim_id']:
+                return 'run', claim
+            
+            if 'body' in record:
+                self.responses.set(record_key, record)
+                return self._match(record, fingerprint)
+            if record.get('fingerprint') != fingerprint:
+                return 'mismatch', None
+            
+            # Another request holds the claim, possibly on another worker
+            if time.monotonic() >= deadline:
+                return 'busy', None
+            time.sleep(self.poll_interval)
+    
+    def complete(self, key: str, claim: Dict[str, Any], status: int, body: Any) -> None:
+        """Replace the claim with the successful response, for duplicates on every worker"""
+        record_key = self._record_key(key)
+        now = datetime.now()
+        record = {
+            'fingerprint': claim['fingerprint'],
+            'status': status,
+            'body': body,
+            'created_at': now.isoformat(),
+            'expires_at': (now + self.key_ttl).isoformat()
+        }
+        
+        self.responses.set(record_key, record)
+        try:
+            store.reference(f'idempotency_keys/{record_key}').set(record)
+        except Exception as e:
+            print(f"Error persisting idempotency key: {e}")
+        self._purge_if_due()
+    
+    def abandon(self, key: str, claim: Dict[str, Any]) -> None:
+        """Release a key whose request failed, so a retry runs it again"""
+        def release(current):
+            if current and current.get('claim_id') == claim['claim_id']:
+                return None
+            return current
+        
+        try:
+            store.reference(f'idempotency_keys/{self._record_key(key)}').transaction(release)
+        except Exception as e:
+            # The claim lapses after claim_ttl anyway
+            print(f"Error releasing idempotency key: {e}")
+    
+    def purge_expired(self) -> int:
+        """Delete persisted keys past their expiry"""
+        try:
+            records = store.reference('idempotency_keys').get() or {}
+            now = datetime.now().isoformat()
+            expired = {key: None for key, record in records.items() if record.get('expires_at', '') < now}
+            if expired:
+                store.reference('idempotency_keys').update(expired)
+            return len(expired)
+        except Exception as e:
+            print(f"Error purging idempotency keys: {e}")
+            return 0
+    
+    def _purge_if_due(self) -> None:
+        with self._lock:
+            if time.monotonic() - self._last_purge < self.purge_interval:
+                return
+            self._last_purge = time.monotonic()
+        threading.Thread(target=self.purge_expired, name='idempotency-purge', daemon=True).start()
+    
+    def _claim(self, record_key: str, claim: Dict[str, Any]) -> Dict[str, Any]:
+        """Store claim unless a live record exists; returns whichever record is there now"""
+        now = datetime.now().isoformat()
+        
+        def claim_if_absent(current):
+            if current and current.get('expires_at', '') >= now:
+                return current
+            return claim
+        
+        return store.reference(f'idempotency_keys/{record_key}').transaction(claim_if_absent)
+    
+    def _new_claim(self, fingerprint: str) -> Dict[str, Any]:
+        now = datetime.now()
+        return {
+            'claim_id': uuid.uuid4().hex,
+            'fingerprint': fingerprint,
+            'created_at': now.isoformat(),
+            'expires_at': (now + self.claim_ttl).isoformat()
+        }
+    
+    @staticmethod
+    def _match(record: Dict[str, Any], fingerprint: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        if record.get('fingerprint') != fingerprint:
+            return 'mismatch', None
+        return 'replay', record
+    
+    @staticmethod
+    def _record_key(key: str) -> str:
+        # Client keys may contain characters Firebase does not allow in paths
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:40]
+
+def idempotent(scope: str):
+    """Route decorator honouring an optional Idempotency-Key request header"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            client_key = request.headers.get('Idempotency-Key')
+            if not client_key:
+                return view(*args, **kwargs)
+            if len(client_key) > 255:
+                return jsonify({'error': 'Idempotency-Key must be at most 255 characters'}), 400
+            
+            key = f'{scope}:{client_key}'
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+            
+            outcome, record = idempotency_service.begin(key, fingerprint)
+            if outcome == 'replay':
+                response = make_response(jsonify(record['body']), record['status'])
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response
+            if outcome == 'mismatch':
+                return jsonify({'error': 'Idempotency-Key was already used with a different request body'}), 422
+            if outcome == 'busy':
+                return jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409
+            if outcome == 'unavailable':
+                return jsonify({'error': 'Idempotency-Key could not be checked, retry shortly'}), 503, {'Retry-After': '1'}
+            
+            try:
+                response = make_response(view(*args, **kwargs))
+            except Exception:
+                idempotency_service.abandon(key, record)
+                raise
+            
+            # Only successes are replayed; errors may succeed on retry
+            if 200 <= response.status_code < 300 and response.is_json:
+                idempotency_service.complete(key, record, response.status_code, response.get_json())
+            else:
+                idempotency_service.abandon(key, record)
+            return response
+        return wrapper
+    return decorator
+
+# Global instance
+idempotency_service = IdempotencyService()
@@ -0,0 +1,292 @@
+from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta
+from app.repositories import store
+from app.services.order_queue import order_queue
+import random
+import threading
+import time
+
+class InventoryService:
+    """
+    Stock reservation on sharded counters
+    Each product's stock is split across shard_count sub-counters under
+    inventory/{product_id}/shards and summed on read. A reservation decrements
+    shards with Firebase transactions starting from a random shard, so
+    concurrent orders for a hot product rarely contend on the same counter
+    """
+    
+    def __init__(self):
+        self.shard_count = 8
+        self.reservation_ttl = timedelta(minutes=15)  # holds not committed by then are released
+        self.sweep_interval = 60  # seconds between expiry sweeps
+        
+        self._stats = {
+            'reservations': 0,
+            'rejected': 0,
+            'transactions': 0,
+            'retries': 0,
+            'contended': 0,
+            'aborted': 0,
+            'released': 0,
+            'expired': 0
+        }
+        self._stats_lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._sweeping = False
+    
+    def get_available(self, product_id: str) -> Optional[float]:
+        """Current stock as the sum of all shards, or None if the product is not tracked"""
+        shards = store.reference(f'inventory/{product_id}/shards').get()
+        if shards is None:
+            return None
+        return round(sum(shards.values()), 3)
+    
+    def restock(self, product_id: str, quantity: float) -> None:
+        """
+        Set a product's stock level to quantity
+        The change from the last level is added to or taken from the shards
+        with transactions, so reservations made meanwhile, and their later
+        release, still balance
+        """
+        previous = None
+        
+        def set_stocked(current):
+            nonlocal previous
+            previous = current
+            return quantity
+        
+        store.reference(f'inventory/{product_id}/stocked').transaction(set_stocked)
+        if previous is None:
+            # Counters seeded before levels were recorded start from what is left
+            previous = self.get_available(product_id) or 0
+        
+        delta = round(quantity - previous, 3)
+        if delta > 0:
+            self._give_back(product_id, self._split(delta))
+        elif delta < 0:
+            self._take_up_to(product_id, -delta)
+        store.reference(f'inventory/{product_id}/updated_at').set(datetime.now().isoformat())
+    
+    def reserve(self, order_id: str, items: List[Dict[str, Any]],
+                products: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Hold stock for every item of an order, all or nothing
+        Products without a quantity_available field are not stock-tracked
+        """
+        self._sweep_if_due()
+        
+        # Collapse repeated cart lines so each product is reserved once
+        wanted = {}
+        for item in items:
+            product_data = products.get(item.get('product_id')) or {}
+            if 'quantity_available' not in product_data:
+                continue
+            wanted[item['product_id']] = wanted.get(item['product_id'], 0) + item.get('quantity', 1)
+        
+        allocations = {}
+        for product_id, quantity in wanted.items():
+            self._ensure_seeded(product_id, products[product_id])
+            taken = self._take(product_id, quantity)
+            if taken is None:
+                for held_id, shards in allocations.items():
+                    self._give_back(held_id, shards)
+                self._count('rejected')
+                return {
+                    'success': False,
+                    'error': 'Insufficient stock',
+                    'product_id': product_id
+                }
+            allocations[product_id] = taken
+        
+        if allocations:
+            now = datetime.now()
+            try:
+                store.reference(f'reservations/{order_id}').set({
+                    'status': 'held',
+                    'items': allocations,
+                    'created_at': now.isoformat(),
+                    'expires_at': (now + self.reservation_ttl).isoformat()
+                })
+            except Exception:
+                # Without a record nothing would ever release the stock
+                for held_id, shards in allocations.items():
+                    self._give_back(held_id, shards)
+                raise
+        
+        self._count('reservations')
+        return {'success': True, 'reserved': bool(allocations)}
+    
+    def commit_claims(self, order_id: str) -> Dict[str, Any]:
+        """
+        Order queue claim that marks a hold as belonging to a saved order
+        Settled by transaction before the order is written, so a hold the
+        expiry sweep (on any worker) released first refuses the order
+        """
+        return {f'reservations/{order_id}/status': {'expect': ['held', 'committed'], 'set': 'committed'}}
+    
+    def release(self, order_id: str, reason: str = 'released', statuses: tuple = ('held', 'committed')) -> bool:
+        """Return an order's stock to its shards if its hold is in one of statuses, exactly once"""
+        try:
+            released = False
+            
+            def mark_released(status):
+                nonlocal released
+                released = status in statuses
+                return reason if released else status
+            
+            store.reference(f'reservations/{order_id}/status').transaction(mark_released)
+            if not released:
+                return False
+            
+            reservation = store.reference(f'reservations/{order_id}').get() or {}
+            for product_id, shards in (reservation.get('items') or {}).items():
+                self._give_back(product_id, shards)
+            
+            self._count(reason)
+            return True
+        except Exception as e:
+            print(f"Error releasing reservation for order {order_id}: {e}")
+            return False
+    
+    def release_expired(self) -> int:
+        """Release holds whose order was never saved before they expired"""
+        try:
+            held = store.reference('reservations').order_by_child('status').equal_to('held').get() or {}
+            now = datetime.now().isoformat()
+            
+            expired = 0
+            for order_id, reservation in held.items():
+                # Orders still waiting in the intake queue keep their stock
+                if order_queue.is_pending(order_id):
+                    continue
+                # Only still-held stock: a commit settled meanwhile wins
+                if reservation.get('expires_at', '') < now and self.release(order_id, reason='expired', statuses=('held',)):
+                    expired += 1
+            return expired
+        except Exception as e:
+            print(f"Error sweeping expired reservations: {e}")
+            return 0
+        finally:
+            self._sweeping = False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Reservation outcomes and transaction contention since startup"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['shard_count'] = self.shard_count
+        stats['retry_rate'] = round(stats['retries'] / stats['transactions'], 4) if stats['transactions'] else 0.0
+        return stats
+    
+    def _ensure_seeded(self, product_id: str, product_data: Dict[str, Any]) -> None:
+        """Create shards from the product's quantity_available the first time it is ordered"""
+        if store.reference(f'inventory/{product_id}/shards').get() is not None:
+            return
+        
+        quantity = product_data.get('quantity_available', 0)
+        
+        def create_if_missing(current):
+            # A restock in progress owns the counters
+            if current and ('shards' in current or 'stocked' in current):
+                return current
+            return {'shards': self._split(quantity), 'stocked': quantity, 'updated_at': datetime.now().isoformat()}
+        
+        store.reference(f'inventory/{product_id}').transaction(create_if_missing)
+    
+    def _take(self, product_id: str, quantity: float) -> Optional[Dict[str, float]]:
+        """Decrement shards until quantity is covered; None (and nothing held) if stock runs out"""
+        taken = {}
+        remaining = quantity
+        start = random.randrange(self.shard_count)
+        
+        for offset in range(self.shard_count):
+            shard = f's{(start + offset) % self.shard_count}'
+            amount = self._take_from_shard(product_id, shard, remaining)
+            if amount > 0:
+                taken[shard] = amount
+                remaining = round(remaining - amount, 3)
+            if remaining <= 0:
+                return taken
+        
+        self._give_back(product_id, taken)
+        return None
+    
+    def _take_up_to(self, product_id: str, quantity: float) -> float:
+        """Decrement shards by up to quantity, keeping what is taken; returns the amount"""
+        remaining = quantity
+        for index in range(self.shard_count):
+            remaining = round(remaining - self._take_from_shard(product_id, f's{index}', remaining), 3)
+            if remaining <= 0:
+                break
+        return round(quantity - remaining, 3)
+    
+    def _take_from_shard(self, product_id: str, shard: str, wanted: float) -> float:
+        """Take up to wanted from one shard in a transaction, returning the amount taken"""
+        attempts = 0
+        amount = 0
+        
+        def decrement(current):
+            nonlocal attempts, amount
+            attempts += 1
+            current = current or 0
+            amount = min(current, wanted)
+            return round(current - amount, 3)
+        
+        try:
+            store.reference(f'inventory/{product_id}/shards/{shard}').transaction(decrement)
+        except store.TransactionAbortedError:
+            self._record_transaction(attempts, aborted=True)
+            return 0
+        
+        self._record_transaction(attempts)
+        return amount
+    
+    def _give_back(self, product_id: str, shards: Dict[str, float]) -> None:
+        """Add previously taken amounts back to their shards"""
+        for shard, amount in shards.items():
+            if not amount:
+                continue
+            attempts = 0
+            
+            def increment(current):
+                nonlocal attempts
+                attempts += 1
+                return round((current or 0) + amount, 3)
+            
+            store.reference(f'inventory/{product_id}/shards/{shard}').transaction(increment)
+            self._record_transaction(attempts)
+    
+    def _split(self, quantity: float) -> Dict[str, float]:
+        """Spread quantity over the shards, putting any remainder on the first ones"""
+        if isinstance(quantity, int):
+            base, remainder = divmod(quantity, self.shard_count)
+            return {f's{i}': base + (1 if i < remainder else 0) for i in range(self.shard_count)}
+        
+        share = round(quantity / self.shard_count, 3)
+        shards = {f's{i}': share for i in range(1, self.shard_count)}
+        shards['s0'] = round(quantity - share * (self.shard_count - 1), 3)
+        return shards
+    
+    def _sweep_if_due(self) -> None:
+        """Run the expiry sweep in the background at most once per interval"""
+        with self._stats_lock:
+            if self._sweeping or time.monotonic() - self._last_sweep < self.sweep_interval:
+                return
+            self._sweeping = True
+            self._last_sweep = time.monotonic()
+        threading.Thread(target=self.release_expired, name='reservation-sweep', daemon=True).start()
+    
+    def _record_transaction(self, attempts: int, aborted: bool = False) -> None:
+        with self._stats_lock:
+            self._stats['transactions'] += 1
+            self._stats['retries'] += max(attempts - 1, 0)
+            if attempts > 1:
+                self._stats['contended'] += 1
+            if aborted:
+                self._stats['aborted'] += 1
+    
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+# Global instance
+inventory_service = InventoryService()
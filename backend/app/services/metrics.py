@@ -0,0 +1,230 @@
+from typing import Dict, List, Any, Optional, Tuple
+from bisect import bisect_left
+import atexit
+import json
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by method, route and status code', None),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by method and route', LATENCY_BUCKETS),
+    'http_response_size_bytes': ('histogram', 'HTTP response body size by method and route', BYTES_BUCKETS),
+    'http_requests_in_flight': ('gauge', 'HTTP requests being served', None),
+    'downstream_calls_total': ('counter', 'Calls to the database backend and Agmarknet by operation and outcome', None),
+    'downstream_call_duration_seconds': ('histogram', 'Latency of calls to the database backend and Agmarknet', LATENCY_BUCKETS)
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class MetricsRegistry:
+    """
+    Request and downstream-call metrics in Prometheus text format
+    Values live in this process behind one lock. With METRICS_MULTIPROC_DIR set
+    (one directory shared by all gunicorn workers, emptied before they start)
+    each worker also writes its values to a file there every few seconds, and
+    /metrics on any worker serves the sum over all files, so totals do not
+    depend on which worker answers the scrape. Counters and histograms of
+    workers that have exited are kept; their in-flight gauges are not
+    """
+    
+    def __init__(self, multiprocess_dir: Optional[str] = None):
+        self.multiprocess_dir = multiprocess_dir or os.environ.get('METRICS_MULTIPROC_DIR')
+        self.flush_interval = 5  # seconds between writes of this worker's file
+        
+        self._lock = threading.Lock()
+        self._values = {}  # (name, labels) -> counter or gauge value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., count above the last bucket, sum]
+        self._last_flush = 0.0
+        
+        if self.multiprocess_dir:
+            atexit.register(self.flush)
+        if hasattr(os, 'register_at_fork'):
+            # A forked worker starts from zero rather than repeating its parent's counts
+            os.register_at_fork(after_in_child=self._after_fork)
+    
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        """Add to a counter, or to a gauge (amount may then be negative)"""
+        key = (name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        buckets = METRICS[name][2]
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(buckets) + 2)
+            histogram[bisect_left(buckets, value)] += 1
+            histogram[-1] += value
+    
+    def observe_request(self, method: str, route: str, status: int, seconds: float,
+                        response_bytes: Optional[int]) -> None:
+        labels = (('method', method), ('route', route))
+        self.inc('http_requests_total', labels + (('status', str(status)),))
+        self.observe('http_request_duration_seconds', labels, seconds)
+        if response_bytes is not None:
+            self.observe('http_response_size_bytes', labels, response_bytes)
+    
+    def observe_call(self, service: str, operation: str, seconds: float, error: bool = False) -> None:
+        """One call to a downstream service (the database backend by name, or 'agmarknet')"""
+        labels = (('service', service), ('operation', operation))
+        self.inc('downstream_calls_total', labels + (('outcome', 'error' if error else 'ok'),))
+        self.observe('downstream_call_duration_seconds', labels, seconds)
+    
+    def maybe_flush(self) -> None:
+        """Write this worker's file if multi-process mode is on and the last write is old enough"""
+        if self.multiprocess_dir and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+    
+    def flush(self) -> None:
+        if not self.multiprocess_dir:
+            return
+        try:
+            self._last_flush = time.monotonic()
+            snapshot = self._snapshot()
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+            path = os.path.join(self.multiprocess_dir, f"metrics-{snapshot['pid']}.json")
+            with open(path + '.tmp', 'w') as snapshot_file:
+                json.dump(snapshot, snapshot_file)
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            print(f"Error writing metrics file: {e}")
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        values, histograms = self._collect()
+        lines = []
+        for name, (metric_type, help_text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            if metric_type == 'histogram':
+                for labels, histogram in sorted(histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip(list(buckets) + [float('inf')], histogram[:-1]):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_number(bound)))} {cumulative}")
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(histogram[-1])}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+            else:
+                series = values.get(name, {})
+                if metric_type == 'gauge' and not series:
+                    series = {(): 0}
+                for labels, value in sorted(series.items()):
+                    lines.append(f'{name}{_format_labels(labels)} {_format_number(value)}')
+        return '\n'.join(lines) + '\n'
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'values': [[name, list(labels), value] for (name, labels), value in self._values.items()],
+                'histograms': [[name, list(labels), list(histogram)] for (name, labels), histogram in self._histograms.items()]
+            }
+    
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._values = {}
+        self._histograms = {}
+        self._last_flush = 0.0
+    
+    def _collect(self) -> Tuple[Dict[str, Dict[Labels, float]], Dict[str, Dict[Labels, List[float]]]]:
+        """Values and histograms by metric name, summed over workers in multi-process mode"""
+        if self.multiprocess_dir:
+            self.flush()
+            snapshots = []
+            for file_name in os.listdir(self.multiprocess_dir):
+                if not (file_name.startswith('metrics-') and file_name.endswith('.json')):
+                    continue
+                try:
+                    with open(os.path.join(self.multiprocess_dir, file_name)) as snapshot_file:
+                        snapshots.append(json.load(snapshot_file))
+                except (OSError, ValueError):
+                    continue  # being replaced or removed right now
+        else:
+            snapshots = [self._snapshot()]
+        
+        values = {}
+        histograms = {}
+        for snapshot in snapshots:
+            alive = snapshot['pid'] == os.getpid() or _pid_alive(snapshot['pid'])
+            for name, labels, value in snapshot['values']:
+                if METRICS[name][0] == 'gauge' and not alive:
+                    continue
+                series = values.setdefault(name, {})
+                key = tuple(tuple(pair) for pair in labels)
+                series[key] = series.get(key, 0) + value
+            for name, labels, histogram in snapshot['histograms']:
+                series = histograms.setdefault(name, {})
+                key = tuple(tuple(pair) for pair in labels)
+                if key in series:
+                    series[key] = [total + value for total, value in zip(series[key], histogram)]
+                else:
+                    series[key] = list(histogram)
+        return values, histograms
+    
+    def init_app(self, app) -> None:
+        """Time every request of app and report database calls made through the store"""
+        from flask import g, request
+        from app.repositories import store
+        
+        store.observe(self.observe_call)
+        
+        @app.before_request
+        def start_request_timer():
+            g.metrics_started = time.perf_counter()
+            self.inc('http_requests_in_flight', (), 1)
+        
+        @app.after_request
+        def record_response(response):
+            g.metrics_status = response.status_code
+            # Never buffer a streamed (SSE) body just to size it
+            g.metrics_bytes = response.calculate_content_length() if response.is_sequence else response.content_length
+            return response
+        
+        @app.teardown_request
+        def record_request(error=None):
+            started = g.pop('metrics_started', None)
+            if started is None:
+                return
+            self.inc('http_requests_in_flight', (), -1)
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            self.observe_request(
+                request.method,
+                route,
+                g.pop('metrics_status', 500),
+                time.perf_counter() - started,
+                g.pop('metrics_bytes', None)
+            )
+            self.maybe_flush()
+
+# Global instance
+metrics = MetricsRegistry()
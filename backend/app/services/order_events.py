@@ -0,0 +1,228 @@
+from typing import Dict, List, Any, Optional, Iterable
+from collections import deque
+from app.repositories import store
+import json
+import os
+import queue
+import threading
+
+class StreamLimitError(Exception):
+    """This worker already serves its maximum number of event streams"""
+
+class Subscription:
+    """One connected client; events are pushed to it only if they match its keys"""
+    
+    def __init__(self, keys: List[str], max_pending: int = 256):
+        self.keys = keys
+        self.events = queue.Queue(maxsize=max_pending)
+        self.overflowed = False
+    
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None after timeout (time for a heartbeat)"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class OrderEventHub:
+    """
+    Fans order changes out to server-sent event streams
+    One Firebase listener on orders/ per process feeds every connection.
+    Subscribers are indexed by vendor and supplier ID so an event only wakes
+    the connections it concerns; idle connections sit blocked on their own
+    queue. Recent events are kept in a ring buffer for Last-Event-ID resume;
+    event IDs come from the order ID and its last write time, so every
+    process names the same change alike and a client can resume on any
+    worker. Streams are served by gevent workers (see gunicorn.conf.py), where
+    an idle connection costs a greenlet, and are capped at
+    ORDER_STREAM_MAX_CONNECTIONS per process
+    """
+    
+    def __init__(self, buffer_size: int = 2000):
+        self.heartbeat_interval = 15  # seconds between keep-alive comments
+        self.max_connections = int(os.environ.get('ORDER_STREAM_MAX_CONNECTIONS', 5000))
+        
+        self._orders = {}  # order_id -> {'vendor_id', 'supplier_id', 'status', 'updated_at'}
+        self._buffer = deque(maxlen=buffer_size)  # (keys, event), oldest first
+        self._last_event_id = None
+        self._subscribers = {}  # key -> set of Subscription
+        self._connections = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._listener = None
+        self._listen_lock = threading.Lock()
+        self._ready = threading.Event()
+    
+    def subscribe(self, keys: List[str], last_event_id: Optional[str] = None) -> tuple:
+        """
+        Register a connection for 'vendor:{id}' / 'supplier:{id}' keys
+        Returns (subscription, missed events to send first, or None when the
+        client must refetch because its position can no longer be resumed)
+        """
+        self._ensure_listening()
+        
+        subscription = Subscription(keys)
+        with self._lock:
+            if self._connections >= self.max_connections:
+                self._rejected += 1
+                raise StreamLimitError(f'Too many open order streams ({self.max_connections}), retry shortly')
+            self._connections += 1
+            for key in keys:
+                self._subscribers.setdefault(key, set()).add(subscription)
+            backlog = self._missed_events(keys, last_event_id) if last_event_id else []
+        return subscription, backlog
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._connections -= 1
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[key]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'listening': self._listener is not None,
+                'connections': self._connections,
+                'max_connections': self.max_connections,
+                'rejected_connections': self._rejected,
+                'tracked_orders': len(self._orders),
+                'buffered_events': len(self._buffer),
+                'last_event_id': self._last_event_id
+            }
+    
+    def format_event(self, event: Dict[str, Any]) -> str:
+        """Render an event in text/event-stream framing"""
+        return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+    
+    def _ensure_listening(self) -> None:
+        # Separate from _lock, which the listener callback takes
+        with self._listen_lock:
+            if self._listener is None:
+                self._listener = store.reference('orders').listen(self._on_change)
+        # The first callback carries the current orders; wait for it before serving
+        self._ready.wait(timeout=10)
+    
+    def _on_change(self, event) -> None:
+        """Firebase listener callback (runs on the SDK's listener thread)"""
+        try:
+            parts = [part for part in (event.path or '/').split('/') if part]
+            changed = {}
+            
+            with self._lock:
+                if not parts and event.event_type == 'put':
+                    # Initial snapshot, or the whole tree replaced
+                    self._orders = {}
+                    for order_id, order_data in (event.data or {}).items():
+                        if isinstance(order_data, dict):
+                            self._orders[order_id] = self._summarize(order_data)
+                    self._ready.set()
+                    return
+                
+                if not parts:
+                    for relative_path, value in (event.data or {}).items():
+                        self._apply(relative_path.split('/'), value, changed)
+                elif event.event_type == 'patch':
+                    for relative_path, value in (event.data or {}).items():
+                        self._apply(parts + relative_path.split('/'), value, changed)
+                else:
+                    self._apply(parts, event.data, changed)
+                
+                for order_id, event_type in changed.items():
+                    self._publish(order_id, event_type)
+        except Exception as e:
+            print(f"Error handling order change event: {e}")
+    
+    def _apply(self, parts: List[str], value: Any, changed: Dict[str, str]) -> None:
+        """Update the order summaries for one written path (lock held)"""
+        order_id = parts[0]
+        known = order_id in self._orders
+        
+        if len(parts) == 1:
+            if value is None:
+                if known:
+                    changed[order_id] = 'deleted'
+                    self._orders[order_id]['status'] = 'deleted'
+                return
+            self._orders[order_id] = self._summarize(value)
+            changed[order_id] = 'updated' if known else 'created'
+            return
+        
+        if not known or len(parts) != 2:
+            return
+        if parts[1] == 'status':
+            self._orders[order_id]['status'] = value
+            changed.setdefault(order_id, 'updated')
+        elif parts[1] in ('updated_at', 'updatedAt'):
+            # Written with the status in the same update; names the resulting event
+            self._orders[order_id]['updated_at'] = value
+    
+    def _publish(self, order_id: str, event_type: str) -> None:
+        """Buffer an event and hand it to matching subscribers (lock held)"""
+        summary = self._orders[order_id]
+        keys = self._keys_for(summary)
+        
+        event = {
+            'id': self._event_id(order_id, summary, event_type),
+            'type': f'order.{event_type}',
+            'data': {'order_id': order_id, **summary}
+        }
+        self._buffer.append((keys, event))
+        self._last_event_id = event['id']
+        if event_type == 'deleted':
+            del self._orders[order_id]
+        
+        for key in keys:
+            for subscription in self._subscribers.get(key, ()):
+                if subscription.overflowed:
+                    continue
+                try:
+                    subscription.events.put_nowait(event)
+                except queue.Full:
+                    # A client this far behind resyncs instead of holding memory
+                    subscription.overflowed = True
+    
+    def _missed_events(self, keys: List[str], last_event_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Buffered events after last_event_id for these keys (lock held)
+        None if the ID is no longer buffered here, or was never seen
+        """
+        events = list(self._buffer)
+        for index in range(len(events) - 1, -1, -1):
+            if events[index][1]['id'] == last_event_id:
+                break
+        else:
+            return None
+        
+        wanted = set(keys)
+        return [event for event_keys, event in events[index + 1:] if wanted.intersection(event_keys)]
+    
+    @staticmethod
+    def _event_id(order_id: str, summary: Dict[str, Any], event_type: str) -> str:
+        """The same in every process: the order, its last write time and the kind of change"""
+        return f"{order_id}:{summary.get('updated_at') or ''}:{event_type}"
+    
+    @staticmethod
+    def _summarize(order_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'vendor_id': order_data.get('vendor_id') or order_data.get('vendorId'),
+            'supplier_id': order_data.get('supplier_id') or order_data.get('supplierId'),
+            'status': order_data.get('status'),
+            'updated_at': (order_data.get('updated_at') or order_data.get('updatedAt')
+                           or order_data.get('created_at') or order_data.get('createdAt'))
+        }
+    
+    @staticmethod
+    def _keys_for(summary: Dict[str, Any]) -> Iterable[str]:
+        keys = []
+        if summary.get('vendor_id'):
+            keys.append(f"vendor:{summary['vendor_id']}")
+        if summary.get('supplier_id'):
+            keys.append(f"supplier:{summary['supplier_id']}")
+        return keys
+
+# Global instance
+order_event_hub = OrderEventHub()
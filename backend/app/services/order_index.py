@@ -0,0 +1,289 @@
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+from app.repositories import store
+from app.services.sales_rollups import build_order_rollup_updates
+
+def _field(order_data: Dict[str, Any], name: str, camel_name: str, default: Any = None) -> Any:
+    """Read a field from either backend (snake_case) or web client (camelCase) orders"""
+    value = order_data.get(name)
+    if value is None:
+        value = order_data.get(camel_name, default)
+    return value
+
+def time_sortable_key(created_at: str, order_id: str) -> str:
+    """
+    Index key that sorts by creation time, e.g. '20250114T093012123456_<order_id>'
+    Firebase orders keys as strings, so key-range queries become time-range queries
+    """
+    try:
+        stamp = datetime.fromisoformat((created_at or '').replace('Z', '+00:00')).strftime('%Y%m%dT%H%M%S%f')
+    except ValueError:
+        stamp = '00000000T000000000000'
+    return f'{stamp}_{order_id}'
+
+def date_bound(value: str, end: bool = False) -> str:
+    """Key bound for a date ('2025-01-14') or datetime filter"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if len(value) <= 10:
+        # Whole days: '~' sorts after every digit, 'T' and '_'
+        return parsed.strftime('%Y%m%dT') + ('~' if end else '')
+    return parsed.strftime('%Y%m%dT%H%M%S%f') + ('~' if end else '')
+
+def order_summary(order_id: str, order_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Small copy of an order kept in the per-vendor and per-supplier indexes"""
+    summary = {
+        'order_id': order_id,
+        'vendor_id': _field(order_data, 'vendor_id', 'vendorId', ''),
+        'supplier_id': _field(order_data, 'supplier_id', 'supplierId', ''),
+        'status': order_data.get('status', 'pending'),
+        'total_amount': _field(order_data, 'total_amount', 'totalAmount', 0),
+        'item_count': len(order_data.get('items') or []),
+        'created_at': _field(order_data, 'created_at', 'createdAt', ''),
+        'estimated_delivery': _field(order_data, 'estimated_delivery', 'estimatedDelivery'),
+        'delivery_date': _field(order_data, 'delivery_date', 'deliveryDate')
+    }
+    # Firebase drops nulls, so leave them out to keep summaries comparable
+    return {key: value for key, value in summary.items() if value is not None}
+
+def vendor_index_path(order_id: str, order_data: Dict[str, Any]) -> Optional[str]:
+    """Location of an order's entry in vendor_orders, or None if it has no vendor"""
+    vendor_id = _field(order_data, 'vendor_id', 'vendorId')
+    if not vendor_id:
+        return None
+    created_at = _field(order_data, 'created_at', 'createdAt', '')
+    return f'vendor_orders/{vendor_id}/{time_sortable_key(created_at, order_id)}'
+
+def supplier_index_path(order_id: str, order_data: Dict[str, Any],
+                        status: Optional[str] = None) -> Optional[str]:
+    """Location of an order's entry in supplier_orders (under status, default its current one)"""
+    supplier_id = _field(order_data, 'supplier_id', 'supplierId')
+    if not supplier_id:
+        return None
+    return f"supplier_orders/{supplier_id}/{status or order_data.get('status', 'pending')}/{order_id}"
+
+def build_order_create_updates(order_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Multi-location update that writes an order, its index entries and its
+    sales rollup counters together
+    Apply with store.reference().update(...) so all paths commit atomically
+    """
+    order_id = order_data['id']
+    summary = order_summary(order_id, order_data)
+    
+    updates = {f'orders/{order_id}': order_data}
+    for path in (vendor_index_path(order_id, order_data), supplier_index_path(order_id, order_data)):
+        if path:
+            updates[path] = summary
+    updates.update(build_order_rollup_updates(order_data))
+    
+    return updates
+
+def build_order_status_updates(order_id: str, order_data: Dict[str, Any],
+                               status: str, timestamp: str) -> Dict[str, Any]:
+    """Multi-location update entries for one order's status change and its index entries"""
+    # Orders from the web client use camelCase fields
+    updated_field = 'updatedAt' if 'updatedAt' in order_data else 'updated_at'
+    updates = {
+        f'orders/{order_id}/status': status,
+        f'orders/{order_id}/{updated_field}': timestamp
+    }
+    summary = {**order_summary(order_id, order_data), 'status': status}
+    
+    # Whole entries, so a missing one is recreated rather than left as a stub
+    vendor_path = vendor_index_path(order_id, order_data)
+    if vendor_path:
+        updates[vendor_path] = summary
+    
+    # The supplier entry moves to the new status tab
+    previous_path = supplier_index_path(order_id, order_data)
+    if previous_path:
+        updates[previous_path] = None
+        updates[supplier_index_path(order_id, order_data, status)] = summary
+    
+    return updates
+
+class OrderIndexService:
+    """Queries over the denormalized order indexes, and rebuilding them from orders"""
+    
+    def __init__(self):
+        self.default_page_size = 20
+        self.max_page_size = 100
+        self.write_chunk_size = 500  # paths per multi-location update during rebuilds
+    
+    def get_vendor_orders(self, vendor_id: str, limit: Optional[int] = None,
+                          start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Newest-first page of a vendor's order summaries
+        start_date/end_date filter by creation time; before is the cursor
+        returned as next_cursor by the previous page
+        """
+        limit = max(1, min(limit or self.default_page_size, self.max_page_size))
+        
+        upper = date_bound(end_date, end=True) if end_date else None
+        if before and (upper is None or before < upper):
+            upper = before
+        
+        query = store.reference(f'vendor_orders/{vendor_id}').order_by_key()
+        if start_date:
+            query = query.start_at(date_bound(start_date))
+        if upper:
+            query = query.end_at(upper)
+        
+        # The cursor row itself may come back, plus one extra row to detect another page
+        entries = query.limit_to_last(limit + 2 if before else limit + 1).get() or {}
+        keys = sorted((key for key in entries if key != before), reverse=True)
+        
+        page = keys[:limit]
+        return {
+            'orders': [entries[key] for key in page],
+            'next_cursor': page[-1] if len(keys) > limit else None
+        }
+    
+    def get_supplier_orders(self, supplier_id: str, status: str, limit: Optional[int] = None,
+                            before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Newest-first page of one status tab of a supplier's inbox
+        before is the cursor returned as next_cursor by the previous page,
+        'created_at|order_id' so orders sharing a timestamp are neither
+        skipped nor repeated
+        """
+        limit = max(1, min(limit or self.default_page_size, self.max_page_size))
+        tab = store.reference(f'supplier_orders/{supplier_id}/{status}')
+        
+        query = tab.order_by_child('created_at')
+        cursor = None
+        ties = {}
+        if before:
+            cursor_time, _, cursor_id = before.partition('|')
+            cursor = (cursor_time, cursor_id)
+            if cursor_id:
+                # Orders sharing the cursor's timestamp continue below its order ID
+                ties = tab.order_by_child('created_at').equal_to(cursor_time).get() or {}
+            query = query.end_at(cursor_time)
+        # Rows at the cursor's timestamp may come back, plus one extra row to detect another page
+        entries = query.limit_to_last(limit + 1 + max(len(ties), 1 if before else 0)).get() or {}
+        
+        orders = sorted(entries.values(), key=self._page_key, reverse=True)
+        if cursor:
+            orders = [entry for entry in orders if self._page_key(entry) < cursor]
+        
+        page = orders[:limit]
+        next_cursor = None
+        if len(orders) > limit:
+            next_cursor = '|'.join(self._page_key(page[-1]))
+        return {
+            'status': status,
+            'orders': page,
+            'next_cursor': next_cursor
+        }
+    
+    def get_all_supplier_orders(self, supplier_id: str) -> List[Dict[str, Any]]:
+        """Every indexed order summary of a supplier, across all status tabs"""
+        tabs = store.reference(f'supplier_orders/{supplier_id}').get() or {}
+        return [
+            entry
+            for entries in tabs.values() if isinstance(entries, dict)
+            for entry in entries.values() if isinstance(entry, dict) and 'order_id' in entry
+        ]
+    
+    def rebuild_vendor_index(self, vendor_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Backfill or repair vendor_orders from orders
+        Writes missing or outdated entries and removes entries whose order is
+        gone or that use an old key; limited to one vendor when vendor_id is given
+        """
+        try:
+            all_orders = store.reference('orders').get() or {}
+            
+            expected = {}
+            for order_id, order_data in all_orders.items():
+                if not isinstance(order_data, dict):
+                    continue
+                if vendor_id and _field(order_data, 'vendor_id', 'vendorId') != vendor_id:
+                    continue
+                path = vendor_index_path(order_id, order_data)
+                if path:
+                    expected[path] = order_summary(order_id, order_data)
+            
+            if vendor_id:
+                current = {vendor_id: store.reference(f'vendor_orders/{vendor_id}').get() or {}}
+            else:
+                current = store.reference('vendor_orders').get() or {}
+            
+            existing = {
+                f'vendor_orders/{index_vendor}/{key}': entry
+                for index_vendor, entries in current.items()
+                for key, entry in (entries or {}).items()
+            }
+            
+            return self._apply_repair(expected, existing)
+        except Exception as e:
+            print(f"Error rebuilding vendor order index: {e}")
+            return {'success': False, 'error': str(e)}
+    
+    def rebuild_supplier_index(self, supplier_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Backfill or repair supplier_orders from orders
+        Entries filed under the wrong status tab, or in the older flat layout,
+        are moved; limited to one supplier when supplier_id is given
+        """
+        try:
+            all_orders = store.reference('orders').get() or {}
+            
+            expected = {}
+            for order_id, order_data in all_orders.items():
+                if not isinstance(order_data, dict):
+                    continue
+                if supplier_id and _field(order_data, 'supplier_id', 'supplierId') != supplier_id:
+                    continue
+                path = supplier_index_path(order_id, order_data)
+                if path:
+                    expected[path] = order_summary(order_id, order_data)
+            
+            if supplier_id:
+                current = {supplier_id: store.reference(f'supplier_orders/{supplier_id}').get() or {}}
+            else:
+                current = store.reference('supplier_orders').get() or {}
+            
+            existing = {}
+            for index_supplier, children in current.items():
+                for key, child in (children or {}).items():
+                    if not isinstance(child, dict):
+                        continue
+                    if 'order_id' in child:
+                        # Flat supplier_orders/{supplier_id}/{order_id} entry
+                        existing[f'supplier_orders/{index_supplier}/{key}'] = child
+                        continue
+                    for order_id, entry in child.items():
+                        existing[f'supplier_orders/{index_supplier}/{key}/{order_id}'] = entry
+            
+            return self._apply_repair(expected, existing)
+        except Exception as e:
+            print(f"Error rebuilding supplier order index: {e}")
+            return {'success': False, 'error': str(e)}
+    
+    def _apply_repair(self, expected: Dict[str, Any], existing: Dict[str, Any]) -> Dict[str, Any]:
+        """Write entries that differ and delete entries that should not exist"""
+        updates = {path: entry for path, entry in expected.items() if existing.get(path) != entry}
+        stale = [path for path in existing if path not in expected]
+        updates.update({path: None for path in stale})
+        
+        paths = list(updates)
+        for start in range(0, len(paths), self.write_chunk_size):
+            store.reference().update({path: updates[path] for path in paths[start:start + self.write_chunk_size]})
+        
+        return {
+            'success': True,
+            'indexed': len(expected),
+            'written': len(updates) - len(stale),
+            'removed': len(stale)
+        }
+    
+    @staticmethod
+    def _page_key(entry: Dict[str, Any]) -> tuple:
+        """Inbox sort order: creation time, then order ID as Firebase breaks ties"""
+        return entry.get('created_at', ''), entry.get('order_id', '')
+
+# Global instance
+order_index_service = OrderIndexService()
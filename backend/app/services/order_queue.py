@@ -0,0 +1,382 @@
+from typing import Dict, List, Any, Optional
+from collections import deque
+from itertools import islice
+from app.repositories import store
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single worker, no file locking
+    fcntl = None
+
+DEFAULT_QUEUE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+
+def _is_increment(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get('.sv'), dict) and 'increment' in value['.sv']
+
+class OrderIntakeQueue:
+    """
+    Durable write-behind queue for order intake
+    Each accepted order's Firebase writes are appended (and fsynced) to a local
+    write-ahead log before the API answers. A background flusher commits them
+    to Firebase in enqueue order, several orders per multi-location update,
+    retrying with backoff until Firebase accepts them. After a failed batch the
+    oldest entry is retried alone, and one Firebase keeps refusing for
+    max_attempts tries is moved to the dead-letter file so later orders are
+    not held behind it. An entry may carry claims, paths moved by transaction
+    just before its update is written; if one holds an unexpected value (a
+    stock hold already released, say) the entry is dead-lettered instead of
+    written. On startup any entries without a commit record are replayed,
+    including those in logs that no running worker holds
+    """
+    
+    def __init__(self, queue_dir: Optional[str] = None, batch_size: int = 100):
+        self.queue_dir = queue_dir or os.environ.get('ORDER_QUEUE_DIR', DEFAULT_QUEUE_DIR)
+        self.batch_size = batch_size
+        self.flush_interval = 0.05  # seconds the flusher waits to gather a batch
+        self.retry_backoff = 0.5  # seconds before the first retry, doubling up to max_backoff
+        self.max_backoff = 30  # seconds between retries while Firebase is failing
+        self.max_attempts = 8  # tries of a lone entry before it is dead-lettered (about 90s)
+        self.compact_bytes = 1024 * 1024  # truncate a fully committed log past this size
+        
+        self.path = None
+        self.dead_letter_path = os.path.join(self.queue_dir, 'order_queue.dead.jsonl')
+        self._file = None
+        self._pending = deque()  # (seq, order_id, updates, enqueued_at), oldest first
+        self._pending_ids = set()
+        self._claims = {}  # seq -> claims not yet settled
+        self._refused = set()  # seqs whose claims were refused; their updates are skipped
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._drained = threading.Condition(self._lock)
+        self._started = False
+        
+        self._stats = {
+            'enqueued': 0,
+            'committed': 0,
+            'batches': 0,
+            'retries': 0,
+            'replayed': 0,
+            'dead_lettered': 0,
+            'last_error': None,
+            'last_commit_at': None
+        }
+    
+    def start(self) -> None:
+        """Open this worker's log, replay uncommitted entries and start the flusher"""
+        with self._lock:
+            if self._started:
+                return
+            self._open_log()
+            self._replay()
+            self._adopt_orphaned_logs()
+            self._stats['replayed'] = len(self._pending)
+            self._started = True
+        threading.Thread(target=self._run, name='order-queue-flusher', daemon=True).start()
+    
+    def enqueue(self, order_id: str, updates: Dict[str, Any],
+                claims: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        """
+        Durably queue a multi-location update for an order; returns its sequence number
+        claims maps paths to {'expect': [values], 'set': value}; each is set
+        by a transaction before the update is written, and the whole entry is
+        refused if a path holds a value outside 'expect'
+        """
+        self.start()
+        
+        with self._lock:
+            self._seq += 1
+            record = {'seq': self._seq, 'order_id': order_id, 'updates': updates}
+            if claims:
+                record['claims'] = self._claims[self._seq] = claims
+            self._append(record)
+            self._pending.append((self._seq, order_id, updates, time.time()))
+            self._pending_ids.add(order_id)
+            self._stats['enqueued'] += 1
+            self._wakeup.notify()
+            return self._seq
+    
+    def is_pending(self, order_id: str) -> bool:
+        """True while an order is accepted but not yet in Firebase"""
+        with self._lock:
+            return order_id in self._pending_ids
+    
+    def wait_until_drained(self, timeout: float = 10) -> bool:
+        """Block until everything queued so far is committed"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._drained.wait(remaining)
+            return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, age of the oldest entry and flusher outcomes"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['depth'] = len(self._pending)
+            stats['oldest_pending_seconds'] = round(time.time() - self._pending[0][3], 3) if self._pending else 0.0
+            stats['log_path'] = self.path
+            stats['dead_letter_path'] = self.dead_letter_path
+            stats['log_bytes'] = self._file.tell() if self._file else 0
+        return stats
+    
+    def _open_log(self) -> None:
+        """Claim the first log file no other worker process holds (lock held)"""
+        os.makedirs(self.queue_dir, exist_ok=True)
+        index = 0
+        while True:
+            name = 'order_queue.wal' if index == 0 else f'order_queue.{index}.wal'
+            path = os.path.join(self.queue_dir, name)
+            log_file = open(path, 'a+', encoding='utf-8')
+            if fcntl is None:
+                break
+            try:
+                fcntl.flock(log_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                log_file.close()
+                index += 1
+        
+        self.path = path
+        self._file = log_file
+    
+    def _replay(self) -> None:
+        """Rebuild the pending queue from entries that have no commit record (lock held)"""
+        records, self._seq = self._read_uncommitted(self._file)
+        
+        now = time.time()
+        for record in records:
+            self._pending.append((record['seq'], record['order_id'], record['updates'], now))
+            self._pending_ids.add(record['order_id'])
+            if record.get('claims'):
+                self._claims[record['seq']] = record['claims']
+        self._file.seek(0, os.SEEK_END)
+    
+    def _adopt_orphaned_logs(self) -> None:
+        """
+        Take over uncommitted entries from logs no running worker holds, e.g.
+        slots beyond the current worker count after a scale-down (lock held)
+        Entries are copied into this worker's log before the orphan is emptied
+        """
+        if fcntl is None:
+            return
+        
+        for name in sorted(os.listdir(self.queue_dir)):
+            path = os.path.join(self.queue_dir, name)
+            if not name.endswith('.wal') or path == self.path:
+                continue
+            with open(path, 'a+', encoding='utf-8') as log_file:
+                try:
+                    fcntl.flock(log_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # a running worker owns it
+                
+                records, _ = self._read_uncommitted(log_file)
+                now = time.time()
+                for record in records:
+                    self._seq += 1
+                    record['seq'] = self._seq
+                    self._append(record)
+                    self._pending.append((self._seq, record['order_id'], record['updates'], now))
+                    self._pending_ids.add(record['order_id'])
+                    if record.get('claims'):
+                        self._claims[self._seq] = record['claims']
+                
+                log_file.truncate(0)
+                log_file.flush()
+                os.fsync(log_file.fileno())
+    
+    @staticmethod
+    def _read_uncommitted(log_file) -> tuple:
+        """Entries of a log that have no commit record, oldest first, and the highest seq seen"""
+        log_file.seek(0)
+        content = log_file.read()
+        intact = content[:content.rfind('\n') + 1]
+        if len(intact) != len(content):
+            # Drop a torn final write from a crash so new records start on a clean line
+            log_file.truncate(len(intact.encode('utf-8')))
+        
+        entries = {}
+        committed_through = 0
+        for line in intact.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'commit' in record:
+                committed_through = max(committed_through, record['commit'])
+            else:
+                entries[record['seq']] = record
+        
+        records = [entries[seq] for seq in sorted(entries) if seq > committed_through]
+        return records, max(entries, default=0)
+    
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Append one record and make it durable (lock held)"""
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def _run(self) -> None:
+        """Flusher loop: gather a batch, commit it, retry with backoff on failure"""
+        backoff = self.retry_backoff
+        isolate = False  # after a failed batch, find out whether its oldest entry is the cause
+        failing_seq, failures = None, 0
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._wakeup.wait()
+            
+            # Let a burst of orders accumulate into one write
+            time.sleep(self.flush_interval)
+            
+            limit = 1 if isolate else self.batch_size
+            batch = []
+            try:
+                self._settle_claims(limit)
+                batch, updates = self._next_batch(limit)
+                if updates:
+                    store.reference().update(updates)
+            except Exception as e:
+                with self._lock:
+                    self._stats['retries'] += 1
+                    self._stats['last_error'] = str(e)
+                
+                if isolate or len(batch) == 1:
+                    head = self._pending[0]  # only this thread removes entries
+                    failures = failures + 1 if head[0] == failing_seq else 1
+                    failing_seq = head[0]
+                    if failures >= self.max_attempts:
+                        self._dead_letter(head, e)
+                        backoff = self.retry_backoff
+                        isolate = False
+                        failing_seq, failures = None, 0
+                        continue
+                isolate = True
+                
+                print(f"Error flushing order queue, retrying in {backoff}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            
+            backoff = self.retry_backoff
+            isolate = False
+            failing_seq, failures = None, 0
+            self._mark_committed(batch)
+    
+    def _next_batch(self, limit: int) -> tuple:
+        """Oldest pending entries (at most limit) merged into one multi-location update"""
+        with self._lock:
+            candidates = list(islice(self._pending, limit))
+        
+        batch = []
+        updates = {}
+        ancestors = set()  # every proper ancestor of a path already in the batch
+        for entry in candidates:
+            entry_updates = {} if entry[0] in self._refused else entry[2]
+            # Firebase rejects an update where one path contains another,
+            # so an overlapping entry starts the next batch instead
+            if batch and any(self._overlaps(path, value, updates, ancestors) for path, value in entry_updates.items()):
+                break
+            batch.append(entry)
+            for path, value in entry_updates.items():
+                if path in updates:
+                    # Counter increments on the same path are summed into one
+                    value = {'.sv': {'increment': updates[path]['.sv']['increment'] + value['.sv']['increment']}}
+                updates[path] = value
+            for path in entry_updates:
+                parts = path.split('/')
+                ancestors.update('/'.join(parts[:depth]) for depth in range(1, len(parts)))
+        return batch, updates
+    
+    def _settle_claims(self, limit: int) -> None:
+        """Run the claim transactions of the next entries to flush, refusing entries whose claim fails"""
+        with self._lock:
+            entries = [entry for entry in islice(self._pending, limit) if entry[0] in self._claims]
+        
+        for seq, order_id, updates, _ in entries:
+            refused_path = None
+            for path, claim in self._claims[seq].items():
+                found = None
+                
+                def settle(current):
+                    nonlocal found
+                    found = current
+                    return claim['set'] if current in claim['expect'] else current
+                
+                store.reference(path).transaction(settle)
+                if found not in claim['expect']:
+                    refused_path = path
+                    break
+            
+            with self._lock:
+                del self._claims[seq]
+                if refused_path is not None:
+                    print(f"Order {order_id} refused, {refused_path} is {found!r}; moving it to {self.dead_letter_path}")
+                    self._refused.add(seq)
+                    self._write_dead_letter(order_id, updates, f'{refused_path} is {found!r}')
+    
+    def _mark_committed(self, batch: List[tuple]) -> None:
+        with self._lock:
+            refused = sum(1 for entry in batch if entry[0] in self._refused)
+            self._remove(batch)
+            self._stats['committed'] += len(batch) - refused
+            self._stats['batches'] += 1
+            self._stats['last_error'] = None
+            self._stats['last_commit_at'] = time.time()
+    
+    def _dead_letter(self, entry: tuple, error: Exception) -> None:
+        """Set aside an entry Firebase keeps refusing, keeping its updates for a manual replay"""
+        seq, order_id, updates, _ = entry
+        print(f"Error flushing order {order_id}, giving up after {self.max_attempts} attempts "
+              f"and moving it to {self.dead_letter_path}: {error}")
+        
+        with self._lock:
+            self._write_dead_letter(order_id, updates, str(error))
+            self._remove([entry])
+    
+    def _write_dead_letter(self, order_id: str, updates: Dict[str, Any], error: str) -> None:
+        """Append an entry that will not be written to the dead-letter file (lock held)"""
+        record = {'order_id': order_id, 'updates': updates, 'error': error, 'failed_at': time.time()}
+        # Shared by every worker; one appended line per entry
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as dead_letters:
+            dead_letters.write(json.dumps(record, separators=(',', ':')) + '\n')
+            dead_letters.flush()
+            os.fsync(dead_letters.fileno())
+        self._stats['dead_lettered'] += 1
+    
+    def _remove(self, batch: List[tuple]) -> None:
+        """Record the oldest pending entries as done and drop them from the queue (lock held)"""
+        self._append({'commit': batch[-1][0]})
+        for _ in batch:
+            seq, order_id, _, _ = self._pending.popleft()
+            self._pending_ids.discard(order_id)
+            self._claims.pop(seq, None)
+            self._refused.discard(seq)
+        
+        if not self._pending:
+            if self._file.tell() > self.compact_bytes:
+                # Everything is in Firebase, so the log can start over
+                self._file.truncate(0)
+                self._file.seek(0)
+            self._drained.notify_all()
+    
+    @staticmethod
+    def _overlaps(path: str, value: Any, paths: Dict[str, Any], ancestors: set) -> bool:
+        """True if path is an ancestor or descendant of a batched path, or batched with a value that cannot be combined"""
+        if path in ancestors:
+            return True
+        if path in paths:
+            return not (_is_increment(value) and _is_increment(paths[path]))
+        parts = path.split('/')
+        return any('/'.join(parts[:depth]) in paths for depth in range(1, len(parts)))
+
+# Global instance
+order_queue = OrderIntakeQueue()
@@ -0,0 +1,138 @@
+from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.repositories import store, order_repository
+from app.models.order import Order, ORDER_STATUSES
+from app.services.order_index import build_order_status_updates
+from app.services.sales_rollups import build_rollup_updates, merge_deltas, status_change_deltas
+from app.services.order_queue import order_queue
+from app.services.inventory_service import inventory_service
+from app.services.trust_score_service import trust_score_service
+from app.utils.helpers import is_delivered_on_time
+
+class OrderStatusService:
+    """Validated order status changes, applied in bulk with one multi-location write"""
+    
+    def __init__(self):
+        self.max_batch_size = 200
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='order-status')
+    
+    def apply_transitions(self, changes: List[Dict[str, Any]],
+                          supplier_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Move orders to new statuses
+        changes is a list of {'order_id', 'status'}; when supplier_id is given,
+        orders belonging to other suppliers are refused. Valid changes are
+        written together and per-order results are returned in request order
+        """
+        order_ids = list(dict.fromkeys(change.get('order_id') for change in changes if change.get('order_id')))
+        orders = dict(zip(order_ids, self.executor.map(self._fetch_order, order_ids)))
+        
+        timestamp = datetime.now().isoformat()
+        results = []
+        updates = {}
+        rollup_deltas = {}
+        applied = []
+        seen = set()
+        
+        for change in changes:
+            order_id = change.get('order_id')
+            new_status = change.get('status')
+            error = None
+            order_data = orders.get(order_id)
+            current_status = (order_data or {}).get('status', 'pending')
+            
+            if not order_id:
+                error = 'order_id is required'
+            elif order_id in seen:
+                error = 'Order appears more than once in this batch'
+            elif new_status not in ORDER_STATUSES:
+                error = f'Unknown status: {new_status}'
+            elif order_data is None or order_queue.is_pending(order_id):
+                # A missing order may still be in any worker's intake queue, and
+                # a queued write would overwrite this status change when it lands
+                error = 'Order is still being saved, retry shortly'
+            elif supplier_id and self._supplier_of(order_data) != supplier_id:
+                error = 'Order belongs to another supplier'
+            elif new_status != current_status and not Order.can_transition(current_status, new_status):
+                error = f'Cannot move order from {current_status} to {new_status}'
+            
+            if order_id:
+                seen.add(order_id)
+            if error:
+                results.append({'order_id': order_id, 'success': False, 'error': error})
+                continue
+            
+            changed = new_status != current_status
+            if changed:
+                updates.update(build_order_status_updates(order_id, order_data, new_status, timestamp))
+                # Orders in one batch can share a rollup counter, so deltas are summed first
+                merge_deltas(rollup_deltas, status_change_deltas(order_data, current_status, new_status))
+                applied.append((order_id, order_data, new_status))
+            results.append({
+                'order_id': order_id,
+                'success': True,
+                'previous_status': current_status,
+                'status': new_status,
+                'changed': changed
+            })
+        
+        if updates:
+            updates.update(build_rollup_updates(rollup_deltas))
+            try:
+                store.reference().update(updates)
+            except Exception as e:
+                print(f"Error applying order status changes: {e}")
+                changed_ids = {order_id for order_id, _, _ in applied}
+                for result in results:
+                    if result['order_id'] in changed_ids:
+                        result.update({'success': False, 'error': str(e)})
+                        result.pop('status', None)
+                applied = []
+        
+        self._run_hooks(applied)
+        
+        return {
+            'results': results,
+            'updated': len(applied),
+            'failed': sum(1 for result in results if not result['success'])
+        }
+    
+    def _run_hooks(self, applied: List[tuple]) -> None:
+        """Side effects of a batch: stock release, then one trust update per supplier"""
+        completed = {}
+        touched = set()
+        now = datetime.now().isoformat()
+        
+        for order_id, order_data, new_status in applied:
+            if new_status == 'cancelled':
+                inventory_service.release(order_id)
+            
+            supplier_id = self._supplier_of(order_data)
+            if not supplier_id:
+                continue
+            touched.add(supplier_id)
+            if new_status in trust_score_service.terminal_statuses:
+                estimated = order_data.get('estimated_delivery') or order_data.get('estimatedDelivery')
+                completed.setdefault(supplier_id, []).append({
+                    'order_id': order_id,
+                    'status': new_status,
+                    'delivered_on_time': is_delivered_on_time(now, estimated)
+                })
+        
+        for supplier_id in touched:
+            if supplier_id in completed:
+                # Fold finished orders into the supplier's trust score aggregates
+                trust_score_service.update_score_on_orders_completion(supplier_id, completed[supplier_id])
+            else:
+                trust_score_service.invalidate(supplier_id)
+    
+    def _fetch_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return order_repository.get(order_id)
+    
+    @staticmethod
+    def _supplier_of(order_data: Dict[str, Any]) -> Optional[str]:
+        return order_data.get('supplier_id') or order_data.get('supplierId')
+
+# Global instance
+order_status_service = OrderStatusService()
@@ -1,6 +1,6 @@
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from firebase_admin import db
+from app.repositories import product_repository, price_repository
 from app.services.agmarket_service import agmarket_service
 import statistics
 
@@ -187,8 +187,7 @@ class PriceValidationService:
         """
         try:
             # Get supplier's products
-            ref = db.reference('products')
-            all_products = ref.get() or {}
+            all_products = product_repository.list_all()
             
             supplier_products = []
             for product_id, product_data in all_products.items():
@@ -303,8 +302,7 @@ class PriceValidationService:
     def _get_competitor_prices(self, product_name: str, category: str) -> List[Dict[str, Any]]:
         """Get prices from other suppliers for the same product"""
         try:
-            ref = db.reference('products')
-            all_products = ref.get() or {}
+            all_products = product_repository.list_all()
             
             competitor_prices = []
             
@@ -384,8 +382,7 @@ class PriceValidationService:
     def _get_supplier_price_history(self, product_name: str, days: int) -> List[Dict[str, Any]]:
         """Get price history from suppliers for a product"""
         try:
-            ref = db.reference('price_history')
-            price_history = ref.get() or {}
+            price_history = price_repository.get_history()
             
             product_history = []
             cutoff_date = datetime.now() - timedelta(days=days)
@@ -504,9 +501,8 @@ class PriceValidationService:
         """Store validation result in database"""
         try:
             if product_id:
-                ref = db.reference(f'price_validations/{product_id}')
                 timestamp = datetime.now().isoformat()
-                ref.child(timestamp).set(result)
+                price_repository.save_validation(product_id, timestamp, result)
         except Exception as e:
             print(f"Error storing validation result: {e}")
     
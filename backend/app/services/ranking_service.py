@@ -0,0 +1,185 @@
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+from app.repositories import store, product_repository, supplier_repository
+from app.services.trust_score_service import trust_score_service
+from app.utils.cache import LRUCache
+from app.utils.helpers import calculate_distance
+import heapq
+import math
+
+class SupplierRankingService:
+    """Service to rank nearby suppliers by trust score, distance and price"""
+    
+    def __init__(self):
+        self.weight_factors = {
+            'trust': 0.5,
+            'distance': 0.3,
+            'price': 0.2
+        }
+        self.default_limit = 20
+        self.max_limit = 100
+        self.max_radius = 50  # km; wider searches are clamped to this
+        self.km_per_degree = 111.0  # Approximate km per degree of latitude
+        
+        # Candidate set is rebuilt at most once a minute
+        self.candidate_cache = LRUCache(maxsize=1, ttl=60)
+    
+    def rank_suppliers(self, vendor_location: Dict[str, float], radius: float = 10,
+                       product: Optional[str] = None,
+                       limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the best suppliers for a vendor, highest combined score first
+        Uses heap-based top-K selection so only `limit` suppliers are kept
+        """
+        try:
+            limit = min(limit or self.default_limit, self.max_limit)
+            vendor_lat = float(vendor_location['lat'])
+            vendor_lng = float(vendor_location['lng'])
+            product_key = product.lower().strip() if product else None
+            
+            candidates = self._get_candidates()
+            
+            # Cheapest offer for the product among all candidates, for price scoring
+            best_price = None
+            if product_key:
+                prices = [c['prices'][product_key] for c in candidates if product_key in c['prices']]
+                best_price = min(prices) if prices else None
+            
+            scored = self._score_candidates(
+                candidates, vendor_lat, vendor_lng, radius, product_key, best_price
+            )
+            top = heapq.nlargest(limit, scored, key=lambda entry: entry[0])
+            
+            suppliers = []
+            for score, distance, price, candidate in top:
+                supplier_info = {
+                    **candidate['info'],
+                    'trust_score': self._get_trust_score(candidate),
+                    'distance': round(distance, 2),
+                    'ranking_score': round(score * 100, 1)
+                }
+                if product_key:
+                    supplier_info['price'] = price
+                suppliers.append(supplier_info)
+            
+            return {
+                'suppliers': suppliers,
+                'total_found': len(suppliers),
+                'ranked_at': datetime.now().isoformat()
+            }
+        except Exception as e:
+            print(f"Error ranking suppliers: {e}")
+            return {'suppliers': [], 'total_found': 0, 'error': str(e)}
+    
+    def invalidate_candidates(self) -> None:
+        """Force the candidate set to be rebuilt on the next request"""
+        self.candidate_cache.clear()
+    
+    def _score_candidates(self, candidates: List[Dict[str, Any]], vendor_lat: float,
+                          vendor_lng: float, radius: float, product_key: Optional[str],
+                          best_price: Optional[float]):
+        """Yield (score, distance, price, candidate) for suppliers within radius"""
+        lat_delta = radius / self.km_per_degree
+        
+        for candidate in candidates:
+            # Cheap latitude bounding check before the haversine distance
+            if abs(candidate['lat'] - vendor_lat) > lat_delta:
+                continue
+            
+            price = None
+            if product_key:
+                price = candidate['prices'].get(product_key)
+                if price is None:
+                    continue
+            
+            distance = calculate_distance(vendor_lat, vendor_lng, candidate['lat'], candidate['lng'])
+            if distance > radius:
+                continue
+            
+            trust_component = self._get_trust_score(candidate) / 100
+            distance_component = 1 - (distance / radius) if radius > 0 else 1.0
+            if price and best_price:
+                price_component = best_price / price
+            else:
+                price_component = 1.0
+            
+            score = (
+                trust_component * self.weight_factors['trust'] +
+                distance_component * self.weight_factors['distance'] +
+                price_component * self.weight_factors['price']
+            )
+            yield score, distance, price, candidate
+    
+    def _get_trust_score(self, candidate: Dict[str, Any]) -> float:
+        """Prefer the live in-process trust score over the snapshot value"""
+        cached = trust_score_service.score_cache.peek(candidate['info']['id'])
+        if cached:
+            return cached.get('overall_score', candidate['trust_score'])
+        return candidate['trust_score']
+    
+    def _get_candidates(self) -> List[Dict[str, Any]]:
+        """Get the precomputed candidate set, rebuilding it if expired"""
+        candidates = self.candidate_cache.get('candidates')
+        if candidates is None:
+            candidates = self._build_candidates()
+            self.candidate_cache.set('candidates', candidates)
+        return candidates
+    
+    def _build_candidates(self) -> List[Dict[str, Any]]:
+        """Build candidate set of active suppliers with location, trust score and prices"""
+        all_suppliers = supplier_repository.list_all()
+        all_products = product_repository.list_all()
+        stored_scores = store.reference('trust_scores').get() or {}
+        
+        # Cheapest available price per supplier per product name
+        prices_by_supplier = {}
+        for product_id, product_data in all_products.items():
+            if not product_data.get('is_available', True):
+                continue
+            supplier_id = product_data.get('supplier_id')
+            name = product_data.get('name', '').lower().strip()
+            price = product_data.get('price', 0)
+            if not supplier_id or not name or price <= 0:
+                continue
+            
+            supplier_prices = prices_by_supplier.setdefault(supplier_id, {})
+            if name not in supplier_prices or price < supplier_prices[name]:
+                supplier_prices[name] = price
+        
+        candidates = []
+        for supplier_id, supplier_data in all_suppliers.items():
+            location = supplier_data.get('location')
+            if not supplier_data.get('is_active', True) or not location:
+                continue
+            try:
+                lat, lng = float(location['lat']), float(location['lng'])
+                if not (math.isfinite(lat) and math.isfinite(lng)):
+                    raise ValueError('coordinates must be finite')
+            except (KeyError, TypeError, ValueError) as e:
+                # One bad profile must not take ranking down for everyone
+                print(f"Skipping supplier {supplier_id} with invalid location {location!r}: {e}")
+                continue
+            
+            stored_score = stored_scores.get(supplier_id) or {}
+            candidates.append({
+                'lat': lat,
+                'lng': lng,
+                'trust_score': stored_score.get('overall_score', trust_score_service.neutral_score),
+                'prices': prices_by_supplier.get(supplier_id, {}),
+                'info': {
+                    'id': supplier_id,
+                    'business_name': supplier_data.get('business_name', ''),
+                    'owner_name': supplier_data.get('owner_name', ''),
+                    'location': location,
+                    'address': supplier_data.get('address', ''),
+                    'phone': supplier_data.get('phone', ''),
+                    'average_rating': supplier_data.get('average_rating', 0),
+                    'total_reviews': supplier_data.get('total_reviews', 0),
+                    'delivery_radius': supplier_data.get('delivery_radius', 10)
+                }
+            })
+        
+        return candidates
+
+# Global instance
+supplier_ranking_service = SupplierRankingService()
@@ -0,0 +1,216 @@
+from typing import Any, Dict, Optional
+from collections import Counter
+from datetime import datetime
+import hashlib
+import hmac
+import itertools
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_PROFILE_DIR = os.path.join(BACKEND_DIR, 'data', 'profiles')
+STDLIB_DIR = sysconfig.get_paths()['stdlib']
+PROFILE_HEADER = 'X-Profile'
+
+def _frame_label(code) -> str:
+    """'function (path:line)' with the path shortened to the app or the installed package"""
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[-1]
+    elif filename.startswith(STDLIB_DIR):
+        filename = os.path.relpath(filename, STDLIB_DIR)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+
+def sign_profile_request(secret: str, method: str, path: str, timestamp: Optional[int] = None) -> str:
+    """
+    X-Profile header value asking for a profile of one request (method and path, no query string)
+    The value is not single-use: anyone who sees it can replay it against the
+    same method and path until it is max_signature_age (5 minutes) old
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signature = hmac.new(secret.encode(), f'{timestamp}:{method.upper()}:{path}'.encode(), hashlib.sha256).hexdigest()
+    return f'{timestamp}:{signature}'
+
+class StackSampler:
+    """Samples one thread's stack on a timer thread, counting collapsed stacks"""
+    
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+    
+    def start(self) -> 'StackSampler':
+        self._thread.start()
+        return self
+    
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+class RequestProfiler:
+    """
+    Opt-in sampling profiler for single requests
+    A request is profiled when it carries a valid X-Profile header (an HMAC of
+    timestamp, method and path with PROFILE_SECRET, see sign_profile_request) or
+    is picked at random with probability PROFILE_SAMPLE_RATE. Its stacks are
+    written in collapsed format (one 'frame;frame;... count' line per stack, as
+    read by flamegraph.pl, inferno and speedscope) under PROFILE_DIR, deleting
+    the oldest profiles beyond PROFILE_MAX_MB. With neither setting no hooks
+    are installed, so requests pay nothing.
+    A captured signed header can be replayed for its 5-minute lifetime; that
+    only profiles the signed route, at most max_concurrent at a time, so send
+    it over HTTPS and keep the secret out of client code
+    """
+    
+    def __init__(self):
+        self.secret = os.environ.get('PROFILE_SECRET', '')
+        self.sample_rate = float(os.environ.get('PROFILE_SAMPLE_RATE', 0) or 0)
+        self.profile_dir = os.environ.get('PROFILE_DIR', DEFAULT_PROFILE_DIR)
+        self.max_bytes = int(float(os.environ.get('PROFILE_MAX_MB', 100)) * 1024 * 1024)
+        self.interval = 0.005  # seconds between stack samples
+        self.max_signature_age = 300  # seconds a signed header stays valid
+        self.max_concurrent = 2  # profiles running at once in this worker
+        
+        self._lock = threading.Lock()
+        self._active = 0
+        self._sequence = itertools.count()
+        self._stats = {'profiled': 0, 'signed': 0, 'sampled': 0, 'rejected_signatures': 0, 'skipped_busy': 0, 'deleted': 0}
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.secret) or self.sample_rate > 0
+    
+    def init_app(self, app) -> None:
+        """Install the request hooks, only if profiling is configured"""
+        if not self.enabled:
+            return
+        from flask import g, request
+        
+        @app.before_request
+        def start_profile():
+            reason = self._should_profile(request)
+            if reason is None or not self._acquire():
+                return
+            self._count(reason)
+            g.profile_file = self._file_name(request)
+            g.profile_sampler = StackSampler(threading.get_ident(), self.interval).start()
+        
+        @app.after_request
+        def tag_profiled_response(response):
+            if 'profile_file' in g:
+                response.headers['X-Profile-File'] = g.profile_file
+            return response
+        
+        @app.teardown_request
+        def finish_profile(error=None):
+            sampler = g.pop('profile_sampler', None)
+            if sampler is None:
+                return
+            try:
+                stacks = sampler.stop()
+                self._write(g.pop('profile_file'), stacks)
+            finally:
+                self._release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Profiles taken, skipped and deleted by this worker since startup"""
+        with self._lock:
+            return dict(self._stats, active=self._active, enabled=self.enabled)
+    
+    def _should_profile(self, request) -> Optional[str]:
+        header = request.headers.get(PROFILE_HEADER)
+        if header and self.secret:
+            if self._valid_signature(header, request.method, request.path):
+                return 'signed'
+            self._count('rejected_signatures')
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+    
+    def _valid_signature(self, header: str, method: str, path: str) -> bool:
+        timestamp, _, signature = header.partition(':')
+        if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > self.max_signature_age:
+            return False
+        expected = sign_profile_request(self.secret, method, path, int(timestamp)).partition(':')[2]
+        return hmac.compare_digest(expected, signature)
+    
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._active >= self.max_concurrent:
+                self._stats['skipped_busy'] += 1
+                return False
+            self._active += 1
+            return True
+    
+    def _release(self) -> None:
+        with self._lock:
+            self._active -= 1
+    
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+            if key in ('signed', 'sampled'):
+                self._stats['profiled'] += 1
+    
+    def _file_name(self, request) -> str:
+        route = request.url_rule.rule if request.url_rule else request.path
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_')[:80] or 'root'
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        return f'{stamp}-{os.getpid()}-{next(self._sequence)}-{request.method}-{slug}.folded'
+    
+    def _write(self, file_name: str, stacks: Counter) -> None:
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = os.path.join(self.profile_dir, file_name)
+            with open(path, 'w') as profile_file:
+                for stack, count in stacks.most_common():
+                    profile_file.write(f'{stack} {count}\n')
+            self._enforce_cap()
+        except Exception as e:
+            print(f"Error writing request profile: {e}")
+    
+    def _enforce_cap(self) -> None:
+        """Delete the oldest profiles until the directory fits in max_bytes"""
+        profiles = []
+        for entry in os.scandir(self.profile_dir):
+            if entry.is_file() and entry.name.endswith('.folded'):
+                stat = entry.stat()
+                profiles.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in profiles)
+        for _, size, path in sorted(profiles):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self._count('deleted')
+            except OSError:
+                pass  # another worker removed it first
+
+# Global instance
+request_profiler = RequestProfiler()
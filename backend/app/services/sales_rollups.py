@@ -0,0 +1,238 @@
+from typing import Dict, Any, Optional
+from datetime import date
+from app.repositories import store, order_repository
+import re
+
+ORDER_TOTAL_KEY = '_all'  # per-day node holding whole-order totals next to the product nodes
+UNCOUNTED_STATUSES = ('cancelled',)
+COUNTERS = ('orders', 'units', 'revenue', 'delivered_orders', 'delivered_units', 'delivered_revenue')
+
+def _field(order_data: Dict[str, Any], name: str, camel_name: str, default: Any = None) -> Any:
+    value = order_data.get(name)
+    if value is None:
+        value = order_data.get(camel_name, default)
+    return value
+
+def _number(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def product_key(item: Dict[str, Any]) -> str:
+    """Rollup key for an order item: its product ID, or its name made safe for a Firebase key"""
+    key = item.get('product_id') or item.get('id') or item.get('product_name') or item.get('name') or 'unknown'
+    return re.sub(r'[.$#\[\]/]', '_', str(key))
+
+def order_contribution(order_data: Dict[str, Any], status: Optional[str] = None) -> Dict[str, float]:
+    """
+    Counter values an order adds to its supplier's rollups while it has status
+    (default its current one), keyed '{supplier_id}/{yyyy-mm-dd}/{product}/{counter}'.
+    Cancelled orders add nothing; delivered orders also add the delivered_* counters
+    """
+    status = status or order_data.get('status', 'pending')
+    supplier_id = _field(order_data, 'supplier_id', 'supplierId')
+    day = (_field(order_data, 'created_at', 'createdAt') or '')[:10]
+    if not supplier_id or len(day) != 10 or status in UNCOUNTED_STATUSES:
+        return {}
+    
+    prefixes = ['', 'delivered_'] if status == 'delivered' else ['']
+    counters = {}
+    
+    def add(path: str, value: float) -> None:
+        counters[path] = counters.get(path, 0) + value
+    
+    base = f'{supplier_id}/{day}'
+    units_total = 0
+    products = set()
+    for item in order_data.get('items') or []:
+        if not isinstance(item, dict):
+            continue
+        key = product_key(item)
+        quantity = _number(item.get('quantity', 1))
+        revenue = item.get('total_price')
+        revenue = _number(revenue) if revenue is not None else quantity * _number(item.get('unit_price', item.get('price')))
+        for prefix in prefixes:
+            add(f'{base}/{key}/{prefix}units', quantity)
+            add(f'{base}/{key}/{prefix}revenue', revenue)
+        units_total += quantity
+        products.add(key)
+    
+    # An order counts once per product however many lines it has
+    for key in products:
+        for prefix in prefixes:
+            add(f'{base}/{key}/{prefix}orders', 1)
+    
+    total_amount = _number(_field(order_data, 'total_amount', 'totalAmount'))
+    for prefix in prefixes:
+        add(f'{base}/{ORDER_TOTAL_KEY}/{prefix}orders', 1)
+        add(f'{base}/{ORDER_TOTAL_KEY}/{prefix}units', units_total)
+        add(f'{base}/{ORDER_TOTAL_KEY}/{prefix}revenue', total_amount)
+    return counters
+
+def rollup_labels(order_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Product name and unit stored beside each product's counters"""
+    supplier_id = _field(order_data, 'supplier_id', 'supplierId')
+    day = (_field(order_data, 'created_at', 'createdAt') or '')[:10]
+    if not supplier_id or len(day) != 10:
+        return {}
+    
+    labels = {}
+    for item in order_data.get('items') or []:
+        if not isinstance(item, dict):
+            continue
+        base = f'{supplier_id}/{day}/{product_key(item)}'
+        name = item.get('product_name') or item.get('name')
+        if name:
+            labels[f'{base}/product_name'] = name
+        if item.get('unit'):
+            labels[f'{base}/unit'] = item['unit']
+    return labels
+
+def status_change_deltas(order_data: Dict[str, Any], previous_status: str, status: str) -> Dict[str, float]:
+    """Counter changes for moving an order from previous_status to status"""
+    deltas = order_contribution(order_data, status)
+    for path, value in order_contribution(order_data, previous_status).items():
+        deltas[path] = deltas.get(path, 0) - value
+    return {path: value for path, value in deltas.items() if value}
+
+def merge_deltas(into: Dict[str, float], deltas: Dict[str, float]) -> Dict[str, float]:
+    for path, value in deltas.items():
+        into[path] = into.get(path, 0) + value
+    return into
+
+def build_rollup_updates(deltas: Dict[str, float], labels: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Multi-location update entries applying counter deltas under analytics/
+    Counters use server-side increments, so concurrent writers never lose
+    counts; combine all deltas of one update first, since a path may appear once
+    """
+    updates = {f'analytics/{path}': {'.sv': {'increment': value}} for path, value in deltas.items() if value}
+    for path, value in (labels or {}).items():
+        updates[f'analytics/{path}'] = value
+    return updates
+
+def build_order_rollup_updates(order_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rollup entries for a newly created order"""
+    return build_rollup_updates(order_contribution(order_data), rollup_labels(order_data))
+
+class SalesRollupService:
+    """Reads of the per-supplier daily sales rollups, and rebuilding them from orders"""
+    
+    def __init__(self):
+        self.max_range_days = 366
+        self.write_chunk_size = 500  # paths per multi-location update during rebuilds
+    
+    def get_dashboard(self, supplier_id: str, start_date: str, end_date: str,
+                      group_by: str = 'day') -> Dict[str, Any]:
+        """
+        Sales for a date range (inclusive, 'yyyy-mm-dd') from the rollups
+        Returns per-period totals (day or ISO week), per-product totals and
+        the overall totals; raises ValueError for a bad range
+        """
+        start, end = date.fromisoformat(start_date[:10]), date.fromisoformat(end_date[:10])
+        if end < start:
+            raise ValueError('end must not be before start')
+        if (end - start).days >= self.max_range_days:
+            raise ValueError(f'Range must be at most {self.max_range_days} days')
+        if group_by not in ('day', 'week'):
+            raise ValueError("group_by must be 'day' or 'week'")
+        
+        days = store.reference(f'analytics/{supplier_id}').order_by_key() \
+            .start_at(start.isoformat()).end_at(end.isoformat()).get() or {}
+        
+        periods = {}
+        products = {}
+        totals = dict.fromkeys(COUNTERS, 0)
+        for day, nodes in sorted(days.items()):
+            if not isinstance(nodes, dict):
+                continue
+            if group_by == 'week':
+                year, week, _ = date.fromisoformat(day).isocalendar()
+                period_key = f'{year}-W{week:02d}'
+            else:
+                period_key = day
+            period = periods.setdefault(period_key, {'period': period_key, **dict.fromkeys(COUNTERS, 0)})
+            
+            for key, counters in nodes.items():
+                if not isinstance(counters, dict):
+                    continue
+                if key == ORDER_TOTAL_KEY:
+                    for counter in COUNTERS:
+                        period[counter] += counters.get(counter, 0)
+                        totals[counter] += counters.get(counter, 0)
+                    continue
+                product = products.setdefault(key, {
+                    'product_id': key,
+                    'product_name': counters.get('product_name'),
+                    'unit': counters.get('unit'),
+                    **dict.fromkeys(COUNTERS, 0)
+                })
+                for counter in COUNTERS:
+                    product[counter] += counters.get(counter, 0)
+        
+        return {
+            'supplier_id': supplier_id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'group_by': group_by,
+            'totals': totals,
+            'periods': list(periods.values()),
+            'products': sorted(products.values(), key=lambda product: product['revenue'], reverse=True)
+        }
+    
+    def rebuild(self, supplier_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Recompute rollups from orders, for backfills or after drift
+        Each day node is rewritten whole; days with no remaining orders are removed.
+        Orders written while the rebuild runs may need another pass
+        """
+        try:
+            expected = {}
+            for order_data in order_repository.list_all().values():
+                if not isinstance(order_data, dict):
+                    continue
+                if supplier_id and _field(order_data, 'supplier_id', 'supplierId') != supplier_id:
+                    continue
+                paths = order_contribution(order_data)
+                # Labels only where the order is counted, as cancelled-only products drop out
+                paths.update({path: value for path, value in rollup_labels(order_data).items()
+                              if path.rsplit('/', 1)[0] + '/units' in paths})
+                for path, value in paths.items():
+                    supplier, day, key, counter = path.split('/')
+                    node = expected.setdefault(f'{supplier}/{day}', {}).setdefault(key, {})
+                    if isinstance(value, str):
+                        node[counter] = value
+                    else:
+                        node[counter] = node.get(counter, 0) + value
+            
+            if supplier_id:
+                current = {supplier_id: store.reference(f'analytics/{supplier_id}').get() or {}}
+            else:
+                current = store.reference('analytics').get() or {}
+            existing = {
+                f'{supplier}/{day}': nodes
+                for supplier, days in current.items() if isinstance(days, dict)
+                for day, nodes in days.items()
+            }
+            
+            updates = {f'analytics/{path}': nodes for path, nodes in expected.items() if existing.get(path) != nodes}
+            stale = [path for path in existing if path not in expected]
+            updates.update({f'analytics/{path}': None for path in stale})
+            
+            paths = list(updates)
+            for start in range(0, len(paths), self.write_chunk_size):
+                store.reference().update({path: updates[path] for path in paths[start:start + self.write_chunk_size]})
+            
+            return {
+                'success': True,
+                'days': len(expected),
+                'written': len(updates) - len(stale),
+                'removed': len(stale)
+            }
+        except Exception as e:
+            print(f"Error rebuilding sales rollups: {e}")
+            return {'success': False, 'error': str(e)}
+
+# Global instance
+sales_rollup_service = SalesRollupService()
@@ -1,7 +1,12 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from firebase_admin import db
+from concurrent.futures import ThreadPoolExecutor
+from app.repositories import store, supplier_repository, price_repository
+from app.services.order_index import order_index_service
+from app.utils.cache import LRUCache
+from app.utils.helpers import is_delivered_on_time
 import math
+import time
 
 class TrustScoreService:
     """Service to calculate and manage trust scores for suppliers"""
@@ -16,6 +21,28 @@ class TrustScoreService:
             'response_time': 0.05,
             'price_consistency': 0.05
         }
+        
+        self.neutral_score = 70.0  # Score used for components with no data yet
+        self.decay_factor = 0.2  # Weight of the newest outcome in decayed averages
+        self.cache_duration = timedelta(hours=6)
+        self.terminal_statuses = ['delivered', 'cancelled']
+        # Aggregate fields refreshed from the supplier profile rather than from orders
+        self.profile_components = ['verification_score', 'response_score', 'price_consistency_score']
+        
+        # In-process cache in front of the Firebase-stored scores; entries are
+        # checked against trust_aggregates/{id}/updated_at, which any worker may move
+        self.score_cache = LRUCache(maxsize=5000, ttl=self.cache_duration.total_seconds())
+        self.degraded_cache_ttl = 60  # seconds to keep a score built from partial data
+        
+        # Independent Firebase reads run concurrently on a bounded pool
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='trust-score')
+        self.fetch_timeouts = {  # seconds, measured from the start of the fetch
+            'supplier_data': 3.0,
+            'order_history': 5.0,
+            'reviews': 3.0,
+            'response_time': 2.0,
+            'price_consistency': 3.0
+        }
     
     def calculate_trust_score(self, supplier_id: str) -> Dict[str, Any]:
         """
@@ -23,10 +50,10 @@ class TrustScoreService:
         Returns score out of 100 with breakdown
         """
         try:
-            # Get supplier data
-            supplier_data = self._get_supplier_data(supplier_id)
-            order_history = self._get_supplier_orders(supplier_id)
-            reviews = self._get_supplier_reviews(supplier_id)
+            # Fetch all inputs concurrently
+            inputs, degraded = self._fetch_supplier_inputs(supplier_id)
+            order_history = inputs['order_history']
+            reviews = inputs['reviews']
             
             # Calculate individual components
             components = {
@@ -34,36 +61,21 @@ class TrustScoreService:
                 'delivery_timeliness': self._calculate_delivery_score(order_history),
                 'product_quality': self._calculate_quality_score(reviews),
                 'customer_ratings': self._calculate_rating_score(reviews),
-                'business_verification': self._calculate_verification_score(supplier_data),
-                'response_time': self._calculate_response_score(supplier_id),
-                'price_consistency': self._calculate_price_consistency(supplier_id)
+                'business_verification': self._calculate_verification_score(inputs['supplier_data']),
+                'response_time': inputs['response_time'],
+                'price_consistency': inputs['price_consistency']
             }
             
-            # Calculate weighted total score
-            total_score = sum(
-                components[factor] * weight 
-                for factor, weight in self.weight_factors.items()
-            )
+            result = self._build_result(supplier_id, components, 
+                                        len(order_history), len(reviews))
             
-            # Determine trust level
-            trust_level = self._get_trust_level(total_score)
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(components)
-            
-            result = {
-                'supplier_id': supplier_id,
-                'overall_score': round(total_score, 1),
-                'trust_level': trust_level,
-                'components': {k: round(v, 1) for k, v in components.items()},
-                'recommendations': recommendations,
-                'last_updated': datetime.now().isoformat(),
-                'total_orders': len(order_history),
-                'total_reviews': len(reviews)
-            }
-            
-            # Cache the result
-            self._cache_trust_score(supplier_id, result)
+            if degraded:
+                # Serve the partial score briefly instead of persisting it
+                result['degraded_components'] = degraded
+                self.score_cache.set(supplier_id, result, ttl=self.degraded_cache_ttl)
+            else:
+                # Cache the result
+                self._cache_trust_score(supplier_id, result)
             
             return result
             
@@ -74,34 +86,567 @@ class TrustScoreService:
     def get_trust_score(self, supplier_id: str, force_recalculate: bool = False) -> Dict[str, Any]:
         """
         Get trust score for supplier, using cache if available
+        Checks the in-process cache, then Firebase, then the running aggregates
+        before doing a full history scan. Cached scores are only used while
+        the aggregates they were built from are unchanged
         """
         if not force_recalculate:
+            version = self._get_aggregates_version(supplier_id)
+            cached_score = self.score_cache.get(supplier_id)
+            if cached_score and cached_score.get('aggregates_updated_at') == version:
+                return cached_score
+            
             cached_score = self._get_cached_trust_score(supplier_id)
-            if cached_score and not self._is_score_outdated(cached_score):
+            if (cached_score and cached_score.get('aggregates_updated_at') == version
+                    and not self._is_score_outdated(cached_score)):
+                self.score_cache.set(supplier_id, cached_score)
                 return cached_score
+            
+            aggregates = self._get_aggregates(supplier_id)
+            if aggregates:
+                return self._score_aggregates(supplier_id, aggregates)
         
         return self.calculate_trust_score(supplier_id)
     
+    def invalidate(self, supplier_id: str) -> None:
+        """
+        Drop a supplier's score from the in-process cache
+        Called when one of the supplier's orders changes status or a review arrives
+        """
+        self.score_cache.invalidate(supplier_id)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit-rate metrics for the in-process score cache"""
+        return self.score_cache.stats()
+    
+    def calculate_score_from_aggregates(self, supplier_id: str, 
+                                        aggregates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Calculate trust score from running aggregates in constant time
+        No order or review history is read
+        """
+        total_orders = aggregates.get('total_orders', 0)
+        completed_orders = aggregates.get('completed_orders', 0)
+        
+        # Completion rate
+        if total_orders > 0:
+            completion_rate = (completed_orders / total_orders) * 100
+        else:
+            completion_rate = self.neutral_score
+        
+        # Timeliness blends the lifetime rate with the decayed recent rate
+        if completed_orders > 0:
+            lifetime_on_time = aggregates.get('on_time_orders', 0) / completed_orders
+            recent_on_time = aggregates.get('decayed_on_time', lifetime_on_time)
+            delivery_timeliness = ((lifetime_on_time + recent_on_time) / 2) * 100
+        else:
+            delivery_timeliness = self.neutral_score
+        
+        # Product quality from per-order quality ratings
+        quality_count = aggregates.get('quality_rating_count', 0)
+        if quality_count > 0:
+            product_quality = (aggregates.get('quality_rating_sum', 0) / quality_count / 5) * 100
+        else:
+            product_quality = self.neutral_score
+        
+        # Customer ratings from reviews and delivery ratings
+        rating_count = aggregates.get('rating_count', 0)
+        if rating_count > 0:
+            lifetime_rating = aggregates.get('rating_sum', 0) / rating_count
+            recent_rating = aggregates.get('decayed_rating', lifetime_rating)
+            customer_ratings = (((lifetime_rating + recent_rating) / 2) / 5) * 100
+        else:
+            customer_ratings = self.neutral_score
+        
+        components = {
+            'order_completion_rate': completion_rate,
+            'delivery_timeliness': delivery_timeliness,
+            'product_quality': product_quality,
+            'customer_ratings': customer_ratings,
+            'business_verification': aggregates.get('verification_score', 50.0),
+            'response_time': aggregates.get('response_score', self.neutral_score),
+            'price_consistency': aggregates.get('price_consistency_score', self.neutral_score)
+        }
+        
+        result = self._build_result(supplier_id, components, total_orders, 
+                                    aggregates.get('review_count', 0))
+        result['aggregates_updated_at'] = aggregates.get('updated_at')
+        return result
+    
     def update_score_on_order_completion(self, supplier_id: str, order_data: Dict[str, Any]) -> None:
         """
-        Update trust score components when an order is completed
+        Update trust score components when an order is completed or cancelled
+        Applies the outcome to the running aggregates in a single transaction
+        """
+        self.update_score_on_orders_completion(supplier_id, [order_data])
+    
+    def update_score_on_orders_completion(self, supplier_id: str, orders: List[Dict[str, Any]]) -> None:
+        """
+        Fold a batch of completed or cancelled orders for one supplier into the
+        aggregates with one transaction and one recalculation
         """
         try:
-            # Get current score
-            current_score = self.get_trust_score(supplier_id)
-            
-            # Update relevant components based on order outcome
-            delivery_rating = order_data.get('delivery_rating', 5)
-            quality_rating = order_data.get('quality_rating', 5)
-            on_time = order_data.get('delivered_on_time', True)
-            
-            # Store order outcome for future calculations
-            self._store_order_outcome(supplier_id, {
-                'order_id': order_data['order_id'],
-                'delivery_rating': delivery_rating,
-                'quality_rating': quality_rating,
-                'delivered_on_time': on_time,
-                'timestamp': datetime.now().isoformat()
+            timestamp = datetime.now().isoformat()
+            outcomes = [
+                {
+                    'order_id': order_data['order_id'],
+                    'status': order_data.get('status', 'delivered'),
+                    'delivery_rating': order_data.get('delivery_rating', 5),
+                    'quality_rating': order_data.get('quality_rating', 5),
+                    'delivered_on_time': order_data.get('delivered_on_time', True),
+                    'timestamp': timestamp
+                }
+                for order_data in orders
+            ]
+            # An order re-sent as delivered, or finished by two racing updates, counts once
+            outcomes = [outcome for outcome in outcomes if self._claim_outcome(supplier_id, outcome)]
+            if not outcomes:
+                return
+            
+            def apply_outcomes(current):
+                for outcome in outcomes:
+                    current = self._apply_order_outcome(current, outcome)
+                return current
+            
+            ref = store.reference(f'trust_aggregates/{supplier_id}')
+            try:
+                aggregates = ref.transaction(apply_outcomes)
+            except Exception:
+                # Let a retry count these orders
+                store.reference(f'trust_outcomes/{supplier_id}').update(
+                    {outcome['order_id']: None for outcome in outcomes}
+                )
+                raise
+            
+            # Store order outcomes so aggregates can be rebuilt from history
+            self._store_order_outcomes(supplier_id, outcomes)
+            
+            if aggregates:
+                self._score_aggregates(supplier_id, aggregates)
+        except Exception as e:
+            print(f"Error updating score on order completion for supplier {supplier_id}: {e}")
+            self.invalidate(supplier_id)
+    
+    def update_score_on_review(self, supplier_id: str, review_data: Dict[str, Any]) -> None:
+        """
+        Update trust score aggregates when a supplier review is added
+        """
+        self.invalidate(supplier_id)
+        try:
+            ref = store.reference(f'trust_aggregates/{supplier_id}')
+            aggregates = ref.transaction(
+                lambda current: self._apply_review(current, review_data)
+            )
+            
+            if aggregates:
+                self._score_aggregates(supplier_id, aggregates)
+        except Exception as e:
+            print(f"Error updating score on review for supplier {supplier_id}: {e}")
+            self.invalidate(supplier_id)
+    
+    def rebuild_aggregates(self, supplier_id: str) -> Dict[str, Any]:
+        """
+        Rebuild running aggregates for a supplier from full order and review history
+        Used for backfills and repair; also refreshes the slow-moving components
+        """
+        try:
+            inputs, degraded = self._fetch_supplier_inputs(supplier_id)
+            if degraded:
+                # A rebuild from partial history would undercount; keep the old record
+                print(f"Skipping aggregate rebuild for supplier {supplier_id}, failed: {degraded}")
+                return {}
+            
+            order_history = inputs['order_history']
+            reviews = inputs['reviews']
+            
+            aggregates = self._empty_aggregates()
+            counted = {}
+            
+            # Replay outcomes oldest first so the decayed averages end on recent data
+            order_history.sort(key=lambda x: x.get('created_at', ''))
+            for order in order_history:
+                if order.get('status') not in self.terminal_statuses:
+                    continue
+                counted[order['order_id']] = aggregates['updated_at']
+                aggregates = self._apply_order_outcome(aggregates, {
+                    'order_id': order['order_id'],
+                    'status': order.get('status'),
+                    'delivery_rating': order.get('delivery_rating', 5),
+                    'quality_rating': order.get('quality_rating', 5),
+                    'delivered_on_time': self._is_delivered_on_time(order)
+                })
+            
+            reviews.sort(key=lambda x: x.get('createdAt', ''))
+            for review in reviews:
+                aggregates = self._apply_review(aggregates, review)
+            
+            aggregates['verification_score'] = self._calculate_verification_score(inputs['supplier_data'])
+            aggregates['response_score'] = inputs['response_time']
+            aggregates['price_consistency_score'] = inputs['price_consistency']
+            
+            store.reference().update({
+                f'trust_aggregates/{supplier_id}': aggregates,
+                f'trust_outcomes/{supplier_id}': counted or None
             })
+            return aggregates
         except Exception as e:
-            print(f"Error updating score on order completion for supplier {supplier_id}: {e}")
\ No newline at end of file
+            print(f"Error rebuilding trust aggregates for supplier {supplier_id}: {e}")
+            return {}
+    
+    def _empty_aggregates(self) -> Dict[str, Any]:
+        """Return a zeroed aggregates record"""
+        return {
+            'total_orders': 0,
+            'completed_orders': 0,
+            'cancelled_orders': 0,
+            'on_time_orders': 0,
+            'quality_rating_sum': 0,
+            'quality_rating_count': 0,
+            'rating_sum': 0,
+            'rating_count': 0,
+            'review_count': 0,
+            'decayed_on_time': 1.0,
+            'decayed_rating': 5.0,
+            'updated_at': datetime.now().isoformat()
+        }
+    
+    def _apply_order_outcome(self, current: Optional[Dict[str, Any]], 
+                             outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """Fold one order outcome into the aggregates (transaction update function)"""
+        aggregates = {**self._empty_aggregates(), **(current or {})}
+        alpha = self.decay_factor
+        
+        aggregates['total_orders'] += 1
+        
+        if outcome.get('status') == 'cancelled':
+            aggregates['cancelled_orders'] += 1
+        else:
+            aggregates['completed_orders'] += 1
+            
+            on_time = 1.0 if outcome.get('delivered_on_time', True) else 0.0
+            aggregates['on_time_orders'] += int(on_time)
+            aggregates['decayed_on_time'] = alpha * on_time + (1 - alpha) * aggregates['decayed_on_time']
+            
+            quality_rating = outcome.get('quality_rating')
+            if quality_rating:
+                aggregates['quality_rating_sum'] += quality_rating
+                aggregates['quality_rating_count'] += 1
+            
+            delivery_rating = outcome.get('delivery_rating')
+            if delivery_rating:
+                aggregates['rating_sum'] += delivery_rating
+                aggregates['rating_count'] += 1
+                aggregates['decayed_rating'] = alpha * delivery_rating + (1 - alpha) * aggregates['decayed_rating']
+        
+        aggregates['last_order_id'] = outcome.get('order_id', '')
+        aggregates['updated_at'] = datetime.now().isoformat()
+        return aggregates
+    
+    def _claim_outcome(self, supplier_id: str, outcome: Dict[str, Any]) -> bool:
+        """Create the order's trust_outcomes marker; False if it was already counted"""
+        claimed = False
+        
+        def create_if_absent(current):
+            nonlocal claimed
+            claimed = current is None
+            return outcome['timestamp'] if claimed else current
+        
+        store.reference(f"trust_outcomes/{supplier_id}/{outcome['order_id']}").transaction(create_if_absent)
+        return claimed
+    
+    def _apply_review(self, current: Optional[Dict[str, Any]], 
+                      review: Dict[str, Any]) -> Dict[str, Any]:
+        """Fold one review into the aggregates (transaction update function)"""
+        aggregates = {**self._empty_aggregates(), **(current or {})}
+        alpha = self.decay_factor
+        
+        aggregates['review_count'] += 1
+        
+        rating = review.get('rating')
+        if rating:
+            aggregates['rating_sum'] += rating
+            aggregates['rating_count'] += 1
+            aggregates['decayed_rating'] = alpha * rating + (1 - alpha) * aggregates['decayed_rating']
+        
+        quality_rating = review.get('qualityRating') or review.get('quality_rating')
+        if quality_rating:
+            aggregates['quality_rating_sum'] += quality_rating
+            aggregates['quality_rating_count'] += 1
+        
+        aggregates['updated_at'] = datetime.now().isoformat()
+        return aggregates
+    
+    def _score_aggregates(self, supplier_id: str, aggregates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score from aggregates and cache the result
+        A record created by an order or review transaction has no profile
+        components yet; they are seeded here, and if that fails the score is
+        only kept briefly instead of being persisted
+        """
+        seeded = self._seed_profile_components(supplier_id, aggregates)
+        result = self.calculate_score_from_aggregates(supplier_id, aggregates)
+        if seeded:
+            self._cache_trust_score(supplier_id, result)
+        else:
+            result['degraded_components'] = ['business_verification', 'response_time', 'price_consistency']
+            self.score_cache.set(supplier_id, result, ttl=self.degraded_cache_ttl)
+        return result
+    
+    def _seed_profile_components(self, supplier_id: str, aggregates: Dict[str, Any]) -> bool:
+        """Fill in and store missing profile components; returns False if they could not be read"""
+        if all(key in aggregates for key in self.profile_components):
+            return True
+        try:
+            components = {
+                'verification_score': self._calculate_verification_score(self._get_supplier_data(supplier_id)),
+                'response_score': self._calculate_response_score(supplier_id),
+                'price_consistency_score': self._calculate_price_consistency(supplier_id)
+            }
+            store.reference(f'trust_aggregates/{supplier_id}').update(components)
+        except Exception as e:
+            print(f"Error seeding trust aggregates for supplier {supplier_id}: {e}")
+            return False
+        aggregates.update(components)
+        return True
+    
+    def _get_aggregates_version(self, supplier_id: str) -> Optional[str]:
+        """When a supplier's aggregates last changed, or None if they do not exist"""
+        try:
+            return store.reference(f'trust_aggregates/{supplier_id}/updated_at').get()
+        except Exception:
+            return None
+    
+    def _get_aggregates(self, supplier_id: str) -> Optional[Dict[str, Any]]:
+        """Get running aggregates for a supplier"""
+        try:
+            ref = store.reference(f'trust_aggregates/{supplier_id}')
+            return ref.get()
+        except Exception:
+            return None
+    
+    def _build_result(self, supplier_id: str, components: Dict[str, float], 
+                      total_orders: int, total_reviews: int) -> Dict[str, Any]:
+        """Assemble the trust score result from its components"""
+        # Calculate weighted total score
+        total_score = sum(
+            components[factor] * weight 
+            for factor, weight in self.weight_factors.items()
+        )
+        
+        return {
+            'supplier_id': supplier_id,
+            'overall_score': round(total_score, 1),
+            'trust_level': self._get_trust_level(total_score),
+            'components': {k: round(v, 1) for k, v in components.items()},
+            'recommendations': self._generate_recommendations(components),
+            'last_updated': datetime.now().isoformat(),
+            'total_orders': total_orders,
+            'total_reviews': total_reviews
+        }
+    
+    def _fetch_supplier_inputs(self, supplier_id: str) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Run the independent Firebase reads for a supplier concurrently
+        Each read gets its own timeout; failed or slow reads fall back to a
+        neutral default and are reported in the returned list
+        """
+        fetches = {
+            'supplier_data': (self._get_supplier_data, {}),
+            'order_history': (self._get_supplier_orders, []),
+            'reviews': (self._get_supplier_reviews, []),
+            'response_time': (self._calculate_response_score, self.neutral_score),
+            'price_consistency': (self._calculate_price_consistency, self.neutral_score)
+        }
+        
+        started = time.monotonic()
+        futures = {
+            name: self.executor.submit(fetch, supplier_id)
+            for name, (fetch, _) in fetches.items()
+        }
+        
+        inputs = {}
+        degraded = []
+        for name, future in futures.items():
+            remaining = self.fetch_timeouts[name] - (time.monotonic() - started)
+            try:
+                inputs[name] = future.result(timeout=max(0, remaining))
+            except Exception as e:
+                future.cancel()
+                print(f"Trust score input '{name}' unavailable for supplier {supplier_id}: {e!r}")
+                inputs[name] = fetches[name][1]
+                degraded.append(name)
+        
+        return inputs, degraded
+    
+    def _get_supplier_data(self, supplier_id: str) -> Dict[str, Any]:
+        """Get supplier profile from database"""
+        return supplier_repository.get(supplier_id) or {}
+    
+    def _get_supplier_orders(self, supplier_id: str) -> List[Dict[str, Any]]:
+        """Get all orders placed with a supplier, from the supplier order index"""
+        return order_index_service.get_all_supplier_orders(supplier_id)
+    
+    def _get_supplier_reviews(self, supplier_id: str) -> List[Dict[str, Any]]:
+        """Get all reviews left for a supplier"""
+        return list(supplier_repository.get_reviews(supplier_id).values())
+    
+    def _is_delivered_on_time(self, order: Dict[str, Any]) -> bool:
+        """Check whether an order was delivered by its estimated delivery time"""
+        return is_delivered_on_time(order.get('delivery_date'), order.get('estimated_delivery'))
+    
+    def _calculate_completion_rate(self, orders: List[Dict[str, Any]]) -> float:
+        """Percentage of finished orders that were delivered rather than cancelled"""
+        finished = [o for o in orders if o.get('status') in self.terminal_statuses]
+        if not finished:
+            return self.neutral_score
+        
+        delivered = sum(1 for o in finished if o.get('status') == 'delivered')
+        return (delivered / len(finished)) * 100
+    
+    def _calculate_delivery_score(self, orders: List[Dict[str, Any]]) -> float:
+        """Percentage of delivered orders that arrived on time"""
+        delivered = [o for o in orders if o.get('status') == 'delivered']
+        if not delivered:
+            return self.neutral_score
+        
+        on_time = sum(1 for o in delivered if self._is_delivered_on_time(o))
+        return (on_time / len(delivered)) * 100
+    
+    def _calculate_quality_score(self, reviews: List[Dict[str, Any]]) -> float:
+        """Average quality rating scaled to 100"""
+        ratings = [r.get('qualityRating') or r.get('quality_rating') for r in reviews]
+        ratings = [r for r in ratings if r]
+        if not ratings:
+            return self.neutral_score
+        
+        return (sum(ratings) / len(ratings) / 5) * 100
+    
+    def _calculate_rating_score(self, reviews: List[Dict[str, Any]]) -> float:
+        """Average review rating scaled to 100"""
+        ratings = [r.get('rating') for r in reviews if r.get('rating')]
+        if not ratings:
+            return self.neutral_score
+        
+        return (sum(ratings) / len(ratings) / 5) * 100
+    
+    def _calculate_verification_score(self, supplier_data: Dict[str, Any]) -> float:
+        """Score business verification documents on file"""
+        score = 0.0
+        if supplier_data.get('is_verified'):
+            score += 50
+        if supplier_data.get('business_license'):
+            score += 25
+        if supplier_data.get('gst_number'):
+            score += 25
+        return score
+    
+    def _calculate_response_score(self, supplier_id: str) -> float:
+        """Score how quickly the supplier responds to new orders"""
+        try:
+            ref = store.reference(f'suppliers/{supplier_id}/avg_response_minutes')
+            avg_response_minutes = ref.get()
+            if avg_response_minutes is None:
+                return self.neutral_score
+            
+            # Full score within 15 minutes, zero after 4 hours
+            return max(0.0, min(100.0, 100 - (avg_response_minutes - 15) * (100 / 225)))
+        except Exception:
+            return self.neutral_score
+    
+    def _calculate_price_consistency(self, supplier_id: str) -> float:
+        """Score how stable the supplier's prices have been"""
+        try:
+            price_history = price_repository.get_history(supplier_id)
+            
+            variations = []
+            for product_id, prices in price_history.items():
+                values = [p.get('price', 0) for p in prices.values() if p.get('price')]
+                if len(values) > 1:
+                    mean = sum(values) / len(values)
+                    variations.append((max(values) - min(values)) / mean)
+            
+            if not variations:
+                return self.neutral_score
+            
+            avg_variation = sum(variations) / len(variations)
+            return max(0.0, 100 - avg_variation * 100)
+        except Exception:
+            return self.neutral_score
+    
+    def _get_trust_level(self, score: float) -> str:
+        """Map score to trust level"""
+        if score >= 85:
+            return 'excellent'
+        elif score >= 70:
+            return 'good'
+        elif score >= 50:
+            return 'average'
+        else:
+            return 'poor'
+    
+    def _generate_recommendations(self, components: Dict[str, float]) -> List[str]:
+        """Generate improvement recommendations for weak components"""
+        messages = {
+            'order_completion_rate': "Reduce order cancellations to improve reliability",
+            'delivery_timeliness': "Deliver orders within the estimated time",
+            'product_quality': "Improve product quality to get better quality ratings",
+            'customer_ratings': "Engage with customers to improve ratings",
+            'business_verification': "Complete business verification (license, GST)",
+            'response_time': "Respond to new orders faster",
+            'price_consistency': "Keep prices stable and close to market rates"
+        }
+        
+        recommendations = [
+            messages[factor] for factor, value in components.items() 
+            if value < 60 and factor in messages
+        ]
+        return recommendations[:3]
+    
+    def _cache_trust_score(self, supplier_id: str, result: Dict[str, Any]) -> None:
+        """Cache trust score in memory and in Firebase"""
+        self.score_cache.set(supplier_id, result)
+        try:
+            ref = store.reference(f'trust_scores/{supplier_id}')
+            ref.set(result)
+        except Exception as e:
+            print(f"Error caching trust score: {e}")
+    
+    def _get_cached_trust_score(self, supplier_id: str) -> Optional[Dict[str, Any]]:
+        """Get cached trust score from Firebase"""
+        try:
+            ref = store.reference(f'trust_scores/{supplier_id}')
+            return ref.get()
+        except Exception:
+            return None
+    
+    def _is_score_outdated(self, score: Dict[str, Any]) -> bool:
+        """Check if cached score is older than the cache duration"""
+        try:
+            last_updated = datetime.fromisoformat(score.get('last_updated'))
+            return datetime.now() - last_updated > self.cache_duration
+        except Exception:
+            return True
+    
+    def _store_order_outcomes(self, supplier_id: str, outcomes: List[Dict[str, Any]]) -> None:
+        """Store order outcomes in database"""
+        try:
+            ref = store.reference(f'order_outcomes/{supplier_id}')
+            ref.update({outcome['order_id']: outcome for outcome in outcomes})
+        except Exception as e:
+            print(f"Error storing order outcome: {e}")
+    
+    def _get_default_trust_score(self, supplier_id: str) -> Dict[str, Any]:
+        """Return default trust score on error"""
+        return {
+            'supplier_id': supplier_id,
+            'overall_score': 50.0,
+            'trust_level': 'average',
+            'components': {factor: 50.0 for factor in self.weight_factors},
+            'recommendations': [],
+            'last_updated': datetime.now().isoformat(),
+            'total_orders': 0,
+            'total_reviews': 0
+        }
+
+# Global instance
+trust_score_service = TrustScoreService()
@@ -1,11 +1,269 @@
 import re
-from typing import Dict, List, Any
-from firebase_admin import db
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+from app.repositories import price_repository
+from app.utils.aho_corasick import AhoCorasick
+from app.utils.fuzzy_match import FuzzyMatcher
 
-def process_voice_transcript(transcript: str) -> Dict[str, Any]:
+# Product mapping with common variations
+PRODUCT_MAPPING = {
+    'onion': ['onion', 'onions', 'pyaj', 'kanda'],
+    'tomato': ['tomato', 'tomatoes', 'tamatar'],
+    'potato': ['potato', 'potatoes', 'aloo', 'batata'],
+    'garlic': ['garlic', 'lehsun', 'lasun'],
+    'ginger': ['ginger', 'adrak'],
+    'green_chili': ['green chili', 'green chilli', 'hari mirch', 'chili', 'chilli'],
+    'coriander': ['coriander', 'dhania', 'cilantro'],
+    'oil': ['oil', 'tel', 'cooking oil'],
+    'turmeric': ['turmeric', 'haldi'],
+    'red_chili': ['red chili', 'red chilli', 'lal mirch', 'red pepper']
+}
+
+# Built once at import: every alias -> product, matched in one pass over the transcript
+PRODUCT_MATCHER = AhoCorasick({
+    variation: product
+    for product, variations in PRODUCT_MAPPING.items()
+    for variation in variations
+})
+
+# Phonetic/edit-distance fallback for single-word aliases mangled by speech-to-text
+PRODUCT_FUZZY_MATCHER = FuzzyMatcher({
+    variation: product
+    for product, variations in PRODUCT_MAPPING.items()
+    for variation in variations
+    if ' ' not in variation
+})
+
+# Common filler words that are never fuzzy-matched against products
+FUZZY_STOPWORDS = {
+    'mujhe', 'chahiye', 'chaiye', 'bhaiya', 'bhai', 'jaldi', 'bhejo', 'bhej',
+    'dena', 'dijiye', 'please', 'aur', 'and', 'with', 'also', 'some', 'more',
+    'need', 'want', 'order', 'today', 'kal', 'aaj', 'abhi', 'wala', 'wali'
+}
+
+# Fuzzy matches below this confidence are flagged for the vendor to confirm
+CONFIRMATION_THRESHOLD = 0.8
+
+# Spoken number words (English and Hinglish) -> value
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'twenty': 20, 'fifty': 50, 'hundred': 100, 'half': 0.5,
+    'ek': 1, 'do': 2, 'teen': 3, 'char': 4, 'chaar': 4,
+    'paanch': 5, 'panch': 5, 'chhe': 6, 'che': 6, 'saat': 7,
+    'aath': 8, 'nau': 9, 'das': 10, 'bees': 20, 'pachaas': 50, 'sau': 100,
+    'aadha': 0.5, 'adha': 0.5, 'dedh': 1.5, 'dhai': 2.5, 'dhaai': 2.5,
+    'paav': 0.25, 'pav': 0.25
+}
+
+# Unit mapping
+UNIT_MAPPING = {
+    'kg': 'kg', 'kgs': 'kg', 'kilogram': 'kg', 'kilograms': 'kg', 'kilo': 'kg',
+    'g': 'g', 'gm': 'g', 'gms': 'g', 'gram': 'g', 'grams': 'g',
+    'piece': 'piece', 'pieces': 'piece', 'pc': 'piece', 'pcs': 'piece',
+    'liter': 'liter', 'litre': 'liter', 'liters': 'liter', 'litres': 'liter', 'l': 'liter', 'ltr': 'liter',
+    'packet': 'packet', 'packets': 'packet', 'pack': 'packet'
+}
+
+# Factor to convert a quantity into the unit mandi prices are quoted in
+PRICE_UNIT_FACTORS = {'g': 0.001}
+
+# Words that are not product aliases: digits (incl. decimals) or letter runs, so "2kg" -> "2", "kg"
+TOKEN_PATTERN = re.compile(r'\d+(?:\.\d+)?|[a-z]+')
+
+# How many tokens away a quantity may sit from the product it describes
+MAX_QUANTITY_DISTANCE = 4
+
+# Embedded fallback used until the first snapshot has been loaded
+DEFAULT_MANDI_PRICES = {
+    'onion': 30, 'tomato': 25, 'potato': 20, 'garlic': 80,
+    'ginger': 120, 'green_chili': 60, 'coriander': 40,
+    'oil': 150, 'turmeric': 200, 'red_chili': 180
+}
+
+class MandiPriceSnapshot:
+    """
+    Process-wide snapshot of /mandi_prices for voice order estimation
+    Reads never wait on Firebase: an expired snapshot is served while a
+    background thread refreshes it, and the embedded defaults are served
+    until the first load completes
+    """
+    
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl  # seconds
+        self._prices = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+    
+    def get(self) -> Dict[str, Any]:
+        """Return current prices, scheduling a background refresh if expired"""
+        prices = self._prices
+        if prices is None or time.monotonic() - self._loaded_at > self.ttl:
+            self._refresh_in_background()
+        return prices if prices is not None else DEFAULT_MANDI_PRICES
+    
+    def refresh(self) -> bool:
+        """Reload prices from Firebase; keeps the previous snapshot on failure"""
+        try:
+            prices = price_repository.get_mandi_prices()
+            if prices:
+                self._prices = prices
+                self._loaded_at = time.monotonic()
+                return True
+            return False
+        except Exception as e:
+            print(f"Error refreshing mandi price snapshot: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._refreshing = False
+    
+    def invalidate(self) -> None:
+        """Mark the snapshot as expired so the next read triggers a refresh"""
+        self._loaded_at = 0.0
+    
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful load, or None if never loaded"""
+        if self._prices is None:
+            return None
+        return time.monotonic() - self._loaded_at
+    
+    def _refresh_in_background(self) -> None:
+        """Start at most one refresh thread at a time"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name='mandi-price-refresh', daemon=True).start()
+
+# Shared instance
+mandi_price_snapshot = MandiPriceSnapshot()
+
+def tokenize_transcript(transcript: str) -> List[Tuple[str, Any]]:
+    """
+    Turn a normalized transcript into typed tokens
+    Token types: 'product', 'number', 'number_word', 'unit' and 'word'
+    Product token values are (product, confidence); exact alias matches have confidence 1.0
+    """
+    mentions = PRODUCT_MATCHER.find_words(transcript)
+    tokens = []
+    mention_index = 0
+    
+    for match in TOKEN_PATTERN.finditer(transcript):
+        start = match.start()
+        
+        # Collapse the words of a product alias into one product token
+        while mention_index < len(mentions) and mentions[mention_index][1] <= start:
+            mention_index += 1
+        if mention_index < len(mentions) and mentions[mention_index][0] <= start:
+            if mentions[mention_index][0] == start:
+                tokens.append(('product', (mentions[mention_index][2], 1.0)))
+            continue
+        
+        text = match.group()
+        if text[0].isdigit():
+            tokens.append(('number', float(text)))
+        elif text in UNIT_MAPPING:
+            tokens.append(('unit', UNIT_MAPPING[text]))
+        elif text in NUMBER_WORDS:
+            tokens.append(('number_word', NUMBER_WORDS[text]))
+        else:
+            fuzzy_match = None
+            if len(text) >= 4 and text not in FUZZY_STOPWORDS:
+                fuzzy_match = PRODUCT_FUZZY_MATCHER.lookup(text)
+            if fuzzy_match:
+                tokens.append(('product', (fuzzy_match[0], fuzzy_match[2])))
+            else:
+                tokens.append(('word', text))
+    
+    return tokens
+
+def extract_order_items(tokens: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Bind quantity phrases to the nearest product
+    A quantity phrase is one or more numbers (multiplied, e.g. "do paav") with an
+    optional unit. Number words only count when next to a unit or product, so
+    English "do" is not read as 2. Each product takes at most one quantity.
+    """
+    products = [(i, value) for i, (kind, value) in enumerate(tokens) if kind == 'product']
+    if not products:
+        return []
+    
+    # Parse quantity phrases: (first token index, last token index, quantity, unit)
+    phrases = []
+    i = 0
+    while i < len(tokens):
+        kind = tokens[i][0]
+        if kind not in ('number', 'number_word'):
+            i += 1
+            continue
+        
+        start = i
+        quantity = 1.0
+        has_digits = False
+        while i < len(tokens) and tokens[i][0] in ('number', 'number_word'):
+            quantity *= tokens[i][1]
+            has_digits = has_digits or tokens[i][0] == 'number'
+            i += 1
+        
+        unit = None
+        if i < len(tokens) and tokens[i][0] == 'unit':
+            unit = tokens[i][1]
+            i += 1
+        end = i - 1
+        
+        next_to_product = (
+            (start > 0 and tokens[start - 1][0] == 'product') or
+            (i < len(tokens) and tokens[i][0] == 'product')
+        )
+        if has_digits or unit or next_to_product:
+            phrases.append((start, end, quantity, unit))
+    
+    # Hindi word order puts the quantity first ("2 kg pyaj"), English often after
+    quantity_first = bool(phrases) and phrases[0][0] < products[0][0]
+    
+    quantities = {}
+    for start, end, quantity, unit in phrases:
+        best = None
+        for position, product in products:
+            if position in quantities:
+                continue
+            if position > end:
+                distance, follows = position - end, True
+            else:
+                distance, follows = start - position, False
+            if distance > MAX_QUANTITY_DISTANCE:
+                continue
+            rank = (distance, follows != quantity_first)
+            if best is None or rank < best[0]:
+                best = (rank, position)
+        if best:
+            quantities[best[1]] = (quantity, unit)
+    
+    items = []
+    seen = set()
+    for position, (product, confidence) in products:
+        if product in seen:
+            continue
+        seen.add(product)
+        quantity, unit = quantities.get(position, (1.0, None))
+        items.append({
+            'product': product,
+            'quantity': quantity,
+            'unit': unit or 'kg',
+            'confidence': confidence
+        })
+    
+    return items
+
+def process_voice_transcript(transcript: str, 
+                             mandi_prices: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Process voice transcript to extract order information
     This is a simplified NLP processor for demo purposes
+    mandi_prices overrides the shared snapshot, e.g. to price a whole batch consistently
     """
     try:
         # Normalize transcript
@@ -20,96 +278,25 @@ def process_voice_transcript(transcript: str) -> Dict[str, Any]:
             'raw_transcript': transcript
         }
         
-        # Product mapping with common variations
-        product_mapping = {
-            'onion': ['onion', 'onions', 'pyaj', 'kanda'],
-            'tomato': ['tomato', 'tomatoes', 'tamatar'],
-            'potato': ['potato', 'potatoes', 'aloo', 'batata'],
-            'garlic': ['garlic', 'lehsun', 'lasun'],
-            'ginger': ['ginger', 'adrak'],
-            'green_chili': ['green chili', 'green chilli', 'hari mirch', 'chili', 'chilli'],
-            'coriander': ['coriander', 'dhania', 'cilantro'],
-            'oil': ['oil', 'tel', 'cooking oil'],
-            'turmeric': ['turmeric', 'haldi'],
-            'red_chili': ['red chili', 'red chilli', 'lal mirch', 'red pepper']
-        }
-        
-        # Quantity patterns
-        quantity_patterns = [
-            r'(\d+\.?\d*)\s*(?:kg|kilogram|kilo)',
-            r'(\d+\.?\d*)\s*(?:g|gram|grams)',
-            r'(\d+\.?\d*)\s*(?:piece|pieces|pc)',
-            r'(\d+\.?\d*)\s*(?:liter|litre|l)',
-            r'(\d+\.?\d*)\s*(?:packet|packets|pack)',
-            r'(\d+\.?\d*)\s'  # Just number followed by space
-        ]
-        
-        # Unit mapping
-        unit_mapping = {
-            'kg': 'kg', 'kilogram': 'kg', 'kilo': 'kg',
-            'g': 'g', 'gram': 'g', 'grams': 'g',
-            'piece': 'piece', 'pieces': 'piece', 'pc': 'piece',
-            'liter': 'liter', 'litre': 'liter', 'l': 'liter',
-            'packet': 'packet', 'packets': 'packet', 'pack': 'packet'
-        }
-        
         # Get mandi prices for estimation
-        ref = db.reference('/mandi_prices')
-        mandi_prices = ref.get() or {
-            'onion': 30, 'tomato': 25, 'potato': 20, 'garlic': 80,
-            'ginger': 120, 'green_chili': 60, 'coriander': 40,
-            'oil': 150, 'turmeric': 200, 'red_chili': 180
-        }
+        if mandi_prices is None:
+            mandi_prices = mandi_price_snapshot.get()
         
         # Process transcript
         found_items = []
-        words = transcript.split()
-        
-        for i, word in enumerate(words):
-            # Check for product matches
-            matched_product = None
-            for product, variations in product_mapping.items():
-                if any(variation in transcript for variation in variations):
-                    matched_product = product
-                    break
-            
-            if matched_product:
-                # Look for quantity near the product name
-                quantity = 1.0
-                unit = 'kg'
-                
-                # Search in surrounding words for quantity
-                search_range = words[max(0, i-3):min(len(words), i+4)]
-                search_text = ' '.join(search_range)
-                
-                for pattern in quantity_patterns:
-                    match = re.search(pattern, search_text)
-                    if match:
-                        quantity = float(match.group(1))
-                        # Determine unit
-                        if 'kg' in search_text or 'kilo' in search_text:
-                            unit = 'kg'
-                        elif 'g' in search_text and 'kg' not in search_text:
-                            unit = 'g'
-                            quantity = quantity / 1000  # Convert to kg for price calculation
-                        elif 'piece' in search_text or 'pc' in search_text:
-                            unit = 'piece'
-                        elif 'liter' in search_text or 'l' in search_text:
-                            unit = 'liter'
-                        elif 'packet' in search_text or 'pack' in search_text:
-                            unit = 'packet'
-                        break
-                
-                # Check if already added
-                if not any(item['product'] == matched_product for item in found_items):
-                    estimated_price = mandi_prices.get(matched_product, 50) * quantity
-                    found_items.append({
-                        'product': matched_product,
-                        'product_name': matched_product.replace('_', ' ').title(),
-                        'quantity': quantity,
-                        'unit': unit,
-                        'estimated_price': round(estimated_price, 2)
-                    })
+        for item in extract_order_items(tokenize_transcript(transcript)):
+            product = item['product']
+            price_quantity = item['quantity'] * PRICE_UNIT_FACTORS.get(item['unit'], 1)
+            estimated_price = mandi_prices.get(product, 50) * price_quantity
+            found_items.append({
+                'product': product,
+                'product_name': product.replace('_', ' ').title(),
+                'quantity': item['quantity'],
+                'unit': item['unit'],
+                'estimated_price': round(estimated_price, 2),
+                'confidence': item['confidence'],
+                'needs_confirmation': item['confidence'] < CONFIRMATION_THRESHOLD
+            })
         
         if found_items:
             result['success'] = True
@@ -130,15 +317,43 @@ def process_voice_transcript(transcript: str) -> Dict[str, Any]:
             'raw_transcript': transcript
         }
 
+def process_voice_batch(transcripts: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Process many transcripts, one after another
+    Each entry is a transcript string or {'transcript': ..., 'id': ...}. Results come
+    back in input order with per-item errors, all priced from one price snapshot.
+    Parsing is pure Python, so threads would only contend for the GIL
+    """
+    mandi_prices = mandi_price_snapshot.get()
+    
+    def process_entry(index: int, entry: Any) -> Dict[str, Any]:
+        client_id = None
+        transcript = entry
+        if isinstance(entry, dict):
+            client_id = entry.get('id')
+            transcript = entry.get('transcript')
+        
+        if not isinstance(transcript, str) or not transcript.strip():
+            result = {
+                'success': False,
+                'items': [],
+                'total_estimated': 0.0,
+                'message': 'Transcript must be a non-empty string',
+                'raw_transcript': transcript if isinstance(transcript, str) else ''
+            }
+        else:
+            result = process_voice_transcript(transcript, mandi_prices)
+        
+        result['index'] = index
+        if client_id is not None:
+            result['id'] = client_id
+        return result
+    
+    return [process_entry(index, entry) for index, entry in enumerate(transcripts)]
+
 def get_product_suggestions(partial_text: str) -> List[str]:
     """Get product suggestions based on partial text input"""
-    products = [
-        'Onion', 'Tomato', 'Potato', 'Garlic', 'Ginger',
-        'Green Chili', 'Coriander', 'Cooking Oil', 'Turmeric', 'Red Chili',
-        'Carrot', 'Cabbage', 'Cauliflower', 'Spinach', 'Okra',
-        'Eggplant', 'Bell Pepper', 'Cucumber', 'Radish', 'Beetroot'
-    ]
-    
-    partial_text = partial_text.lower()
-    suggestions = [p for p in products if partial_text in p.lower()]
-    return suggestions[:5]  # Return top 5 suggestions
\ No newline at end of file
+    from app.services.autocomplete_service import autocomplete_service
+    
+    suggestions = autocomplete_service.suggest(partial_text, limit=5)
+    return [suggestion['name'] for suggestion in suggestions]  # Return top 5 suggestions
@@ -0,0 +1,85 @@
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher
+    Finds every occurrence of every pattern in a single pass over the text
+    """
+    
+    def __init__(self, patterns: Dict[str, Any]):
+        """patterns maps each pattern string to the value reported on a match"""
+        self._goto = [{}]  # state -> {char: next_state}
+        self._fail = [0]
+        self._output = [[]]  # state -> [(pattern_length, value)]
+        
+        for pattern, value in patterns.items():
+            self._add_pattern(pattern, value)
+        self._build_failure_links()
+    
+    def _add_pattern(self, pattern: str, value: Any) -> None:
+        """Insert a pattern into the trie"""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((len(pattern), value))
+    
+    def _build_failure_links(self) -> None:
+        """Breadth-first pass linking each state to its longest proper suffix state"""
+        queue = deque(self._goto[0].values())
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                
+                # Inherit matches that end at the suffix state
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Return (start, end, value) for every pattern occurrence, by end position"""
+        matches = []
+        state = 0
+        
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            
+            for length, value in self._output[state]:
+                matches.append((index + 1 - length, index + 1, value))
+        
+        return matches
+    
+    def find_words(self, text: str) -> List[Tuple[int, int, Any]]:
+        """
+        Return non-overlapping whole-word matches, leftmost-longest first
+        e.g. "green chili" wins over "chili", and "oil" does not match inside "boil"
+        """
+        candidates = [
+            (start, end, value) for start, end, value in self.find_all(text)
+            if (start == 0 or not text[start - 1].isalnum()) and
+               (end == len(text) or not text[end].isalnum())
+        ]
+        candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        
+        selected = []
+        last_end = 0
+        for start, end, value in candidates:
+            if start >= last_end:
+                selected.append((start, end, value))
+                last_end = end
+        
+        return selected
@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# Spelling variants common in romanized Hindi, applied before vowels are dropped
+PHONETIC_REPLACEMENTS = [
+    ('ck', 'k'), ('kh', 'k'), ('gh', 'g'), ('ch', 'c'),
+    ('th', 't'), ('dh', 'd'), ('bh', 'b'), ('ph', 'f'), ('sh', 's'),
+    ('q', 'k'), ('z', 'j'), ('w', 'v'), ('x', 'ks')
+]
+VOWELS = set('aeiouy')
+
+def phonetic_key(word: str) -> str:
+    """
+    Phonetic key tuned for Hinglish transliteration
+    Keeps the first letter and the consonant skeleton, so "tamaatar"/"tamatar",
+    "lasoon"/"lasun"/"lehsun" and "adrack"/"adrak" share a key
+    """
+    word = ''.join(char for char in word.lower() if char.isalpha())
+    if not word:
+        return ''
+    
+    for source, target in PHONETIC_REPLACEMENTS:
+        word = word.replace(source, target)
+    
+    key = word[0]
+    for char in word[1:]:
+        # Vowels and a silent 'h' carry most of the transliteration noise
+        if char in VOWELS or char == 'h':
+            continue
+        if char != key[-1]:
+            key += char
+    return key
+
+def _char_masks(pattern: str) -> Dict[str, int]:
+    """Bitmask of positions for each character of pattern"""
+    masks = {}
+    for index, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << index)
+    return masks
+
+def _bit_parallel_distance(pattern: str, masks: Dict[str, int], text: str) -> int:
+    """Levenshtein distance via Hyyrö's bit-vector algorithm, one step per text char"""
+    m = len(pattern)
+    if m == 0:
+        return len(text)
+    
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    positive, negative = full, 0
+    score = m
+    
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | negative
+        xh = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_pos = negative | (~(xh | positive) & full)
+        horizontal_neg = positive & xh
+        
+        if horizontal_pos & last:
+            score += 1
+        elif horizontal_neg & last:
+            score -= 1
+        
+        horizontal_pos = ((horizontal_pos << 1) | 1) & full
+        horizontal_neg = (horizontal_neg << 1) & full
+        positive = horizontal_neg | (~(xv | horizontal_pos) & full)
+        negative = horizontal_pos & xv
+    
+    return score
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance between a and b"""
+    if a == b:
+        return 0
+    return _bit_parallel_distance(a, _char_masks(a), b)
+
+class BKTree:
+    """Burkhard-Keller tree for bounded edit-distance search"""
+    
+    def __init__(self, words: List[str]):
+        self._root = None  # (word, {distance: child})
+        for word in words:
+            self.add(word)
+    
+    def add(self, word: str) -> None:
+        """Insert a word"""
+        if self._root is None:
+            self._root = (word, {})
+            return
+        
+        node = self._root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+    
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Return (distance, word) for every word within max_distance, closest first"""
+        if self._root is None:
+            return []
+        
+        masks = _char_masks(word)
+        results = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = _bit_parallel_distance(word, masks, node_word)
+            if distance <= max_distance:
+                results.append((distance, node_word))
+            
+            # Triangle inequality: only subtrees in [d - max, d + max] can match
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        
+        results.sort()
+        return results
+
+class FuzzyMatcher:
+    """
+    Fuzzy lookup of spoken words against a fixed alias table
+    Tries the phonetic key first, then a BK-tree search bounded by word length.
+    Results are memoized since transcripts repeat the same few words
+    """
+    
+    def __init__(self, aliases: Dict[str, Any], memo_size: int = 10000):
+        """aliases maps each single-word alias to the value reported on a match"""
+        self._aliases = dict(aliases)
+        self._by_key = {}
+        for alias in self._aliases:
+            self._by_key.setdefault(phonetic_key(alias), []).append(alias)
+        self._tree = BKTree(list(self._aliases))
+        self._memo = {}
+        self._memo_size = memo_size
+    
+    def lookup(self, word: str) -> Optional[Tuple[Any, str, float]]:
+        """Return (value, alias, confidence 0-1) for the best match, or None"""
+        if word in self._memo:
+            return self._memo[word]
+        
+        match = self._lookup(word)
+        if len(self._memo) >= self._memo_size:
+            self._memo.clear()
+        self._memo[word] = match
+        return match
+    
+    def _lookup(self, word: str) -> Optional[Tuple[Any, str, float]]:
+        if word in self._aliases:
+            return self._aliases[word], word, 1.0
+        
+        max_distance = 1 if len(word) <= 5 else 2
+        best = None
+        
+        # Same phonetic key: confidence from edit distance, floored since the sounds agree
+        for alias in self._by_key.get(phonetic_key(word), []):
+            distance = levenshtein(word, alias)
+            if distance > max_distance + 1:
+                continue
+            confidence = max(0.75, 1 - distance / max(len(word), len(alias)))
+            if best is None or confidence > best[2]:
+                best = (self._aliases[alias], alias, confidence)
+        
+        # Spelling slips that change the skeleton ("tomatp")
+        for distance, alias in self._tree.search(word, max_distance):
+            confidence = 1 - distance / max(len(word), len(alias)) - 0.1
+            if best is None or confidence > best[2]:
+                best = (self._aliases[alias], alias, confidence)
+        
+        if best is None:
+            return None
+        return best[0], best[1], round(best[2], 2)
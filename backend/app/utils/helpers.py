@@ -103,6 +103,31 @@ def generate_order_number() -> str:
     random_suffix = ''.join(random.choices(string.digits, k=4))
     return f"ORD{timestamp}{random_suffix}"
 
+def _parse_timestamp(value: str) -> datetime:
+    """ISO date or datetime as a naive local datetime"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def is_delivered_on_time(delivered_at: str, estimated: str) -> bool:
+    """
+    Check an ISO delivery timestamp against an ISO estimate
+    A date-only estimate covers its whole day; values that are missing or
+    cannot be parsed count as on time
+    """
+    if not delivered_at or not estimated:
+        return True
+    try:
+        delivered = _parse_timestamp(delivered_at)
+        deadline = _parse_timestamp(estimated)
+    except (TypeError, ValueError):
+        return True
+    
+    if 'T' not in estimated and ' ' not in estimated.strip():
+        return delivered.date() <= deadline.date()
+    return delivered <= deadline
+
 def calculate_delivery_time(distance: float, supplier_prep_time: int = 30) -> str:
     """
     Calculate estimated delivery time based on distance
@@ -0,0 +1,145 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+class _Node:
+    """Radix trie node; children are keyed by the first character of their edge label"""
+    __slots__ = ('children', 'values', 'top')
+    
+    def __init__(self):
+        self.children = {}  # first char -> (label, node)
+        self.values = {}  # value -> score, for every value indexed under this exact term
+        self.top = []  # best (score, value) pairs in this subtree, highest first
+
+class PrefixTrie:
+    """
+    Compressed prefix trie with ranked completions
+    Every node caches the top-K values of its subtree, so a lookup costs
+    O(len(prefix)) and never walks the subtree
+    """
+    
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self._root = _Node()
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def insert(self, term: str, value: Any, score: float = 0.0) -> None:
+        """Add value under term, or update its ranking score; a term may hold several values"""
+        path = [self._root]
+        node = self._root
+        remaining = term
+        
+        while remaining:
+            edge = node.children.get(remaining[0])
+            if edge is None:
+                child = _Node()
+                node.children[remaining[0]] = (remaining, child)
+                node = child
+                path.append(node)
+                break
+            
+            label, child = edge
+            common = self._common_prefix_length(label, remaining)
+            if common < len(label):
+                # Split the edge at the point where the term diverges
+                middle = _Node()
+                middle.children[label[common]] = (label[common:], child)
+                self._recompute_top(middle)
+                node.children[remaining[0]] = (label[:common], middle)
+                child = middle
+            
+            node = child
+            path.append(node)
+            remaining = remaining[common:]
+        
+        if not node.values:
+            self._size += 1
+        node.values[value] = score
+        
+        for path_node in reversed(path):
+            self._recompute_top(path_node)
+    
+    def remove(self, term: str, value: Any = None) -> bool:
+        """
+        Remove value from term, or every value of term when value is None
+        Returns False if it was not present
+        """
+        path = self._find_path(term, exact=True)
+        if path is None or not path[-1].values:
+            return False
+        
+        node = path[-1]
+        if value is None:
+            node.values.clear()
+        elif value in node.values:
+            del node.values[value]
+        else:
+            return False
+        if not node.values:
+            self._size -= 1
+        
+        for path_node in reversed(path):
+            self._recompute_top(path_node)
+        return True
+    
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[Tuple[float, Any]]:
+        """Return the highest-scoring (score, value) pairs for terms starting with prefix"""
+        path = self._find_path(prefix, exact=False)
+        if path is None:
+            return []
+        return path[-1].top[:limit or self.top_k]
+    
+    def _find_path(self, term: str, exact: bool) -> Optional[List[_Node]]:
+        """
+        Walk the trie along term, returning visited nodes
+        With exact=False the walk may end partway along an edge (prefix lookup)
+        """
+        path = [self._root]
+        node = self._root
+        remaining = term
+        
+        while remaining:
+            edge = node.children.get(remaining[0])
+            if edge is None:
+                return None
+            
+            label, child = edge
+            if remaining.startswith(label):
+                remaining = remaining[len(label):]
+            elif not exact and label.startswith(remaining):
+                remaining = ''
+            else:
+                return None
+            
+            node = child
+            path.append(node)
+        
+        return path
+    
+    def _recompute_top(self, node: _Node) -> None:
+        """Merge the node's own values with its children's cached top lists"""
+        candidates = [(score, value) for value, score in node.values.items()]
+        for label, child in node.children.values():
+            candidates.extend(child.top)
+        
+        candidates.sort(key=lambda pair: pair[0], reverse=True)
+        
+        top = []
+        seen = set()
+        for score, value in candidates:
+            if value in seen:
+                continue
+            seen.add(value)
+            top.append((score, value))
+            if len(top) == self.top_k:
+                break
+        node.top = top
+    
+    @staticmethod
+    def _common_prefix_length(a: str, b: str) -> int:
+        length = min(len(a), len(b))
+        for index in range(length):
+            if a[index] != b[index]:
+                return index
+        return length
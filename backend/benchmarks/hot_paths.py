@@ -0,0 +1,225 @@
+"""
+Benchmarks for backend hot paths at increasing data sizes
+
+Each case runs against the in-memory data backend seeded from
+benchmarks/synthetic.py, so no Firebase project or network is needed.
+Results are written as JSON; compare two runs to spot regressions:
+    
+    python benchmarks/hot_paths.py --scales 1000 10000 100000
+    python benchmarks/hot_paths.py --cases voice validators --repeat 5
+    python benchmarks/hot_paths.py compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+
+Cases whose previous scale took longer than --max-seconds are skipped at
+larger scales (and recorded as skipped) instead of running for hours.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault('DATA_BACKEND', 'memory')
+
+from flask import Flask
+from benchmarks.synthetic import SyntheticData, MUMBAI_AREAS
+from app.repositories import configure_store
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+
+def seed_store(tree: dict) -> None:
+    configure_store('memory', data=tree)
+
+def case_delivery_clusters(data: SyntheticData, scale: int):
+    """ClusteringService.create_delivery_clusters over one supplier's confirmed orders"""
+    from app.services.clustering_service import ClusteringService
+    suppliers = data.suppliers(1)
+    supplier_id = next(iter(suppliers))
+    products = data.products(20, [supplier_id])
+    orders = list(data.orders(scale, [supplier_id], products, status='confirmed').values())
+    service = ClusteringService()
+    
+    def run():
+        clusters = service.create_delivery_clusters(orders, supplier_id)
+        return {'clusters': len(clusters)}
+    return run
+
+def case_group_orders(data: SyntheticData, scale: int):
+    """ClusteringService.suggest_group_orders with scale orders in the database"""
+    from app.services.clustering_service import ClusteringService
+    seed_store(data.database(suppliers=max(10, scale // 100), products=max(50, scale // 10), orders=scale))
+    _, lat, lng = MUMBAI_AREAS[0]
+    service = ClusteringService()
+    
+    def run():
+        suggestions = service.suggest_group_orders({'lat': lat, 'lng': lng}, radius=10.0)
+        return {'suggestions': len(suggestions)}
+    return run
+
+def case_bulk_price_validation(data: SyntheticData, scale: int):
+    """PriceValidationService.bulk_validate_prices over scale products (prices from the mandi cache)"""
+    from app.services.price_validation import PriceValidationService
+    tree = data.database(suppliers=max(10, scale // 100), products=scale, orders=0)
+    seed_store(tree)
+    products = [{'id': product_id, **product} for product_id, product in tree['products'].items()]
+    service = PriceValidationService()
+    
+    def run():
+        result = service.bulk_validate_prices(products)
+        return {'validated': len(result['results']), 'overpriced': result['summary'].get('overpriced')}
+    return run
+
+def case_voice(data: SyntheticData, scale: int):
+    """process_voice_transcript over scale transcripts"""
+    from app.services.voice_processing import process_voice_transcript, DEFAULT_MANDI_PRICES
+    transcripts = data.transcripts(scale)
+    
+    def run():
+        parsed = [process_voice_transcript(transcript, DEFAULT_MANDI_PRICES) for transcript in transcripts]
+        return {'items': sum(len(result['items']) for result in parsed)}
+    return run
+
+def case_search_products(data: SyntheticData, scale: int):
+    """GET /api/vendors/products/search with scale products in the database"""
+    from app.routes.vendors import vendors_bp
+    seed_store(data.database(suppliers=max(10, scale // 100), products=scale, orders=0))
+    app = Flask(__name__)
+    app.register_blueprint(vendors_bp, url_prefix='/api/vendors')
+    client = app.test_client()
+    
+    def run():
+        response = client.get('/api/vendors/products/search?q=onion&max_price=40')
+        return {'status': response.status_code, 'found': response.get_json().get('total_found')}
+    return run
+
+def case_validators(data: SyntheticData, scale: int):
+    """app.utils.validators over scale generated payloads of each kind"""
+    from app.utils import validators
+    suppliers = data.suppliers(scale)
+    products = data.products(scale, list(suppliers))
+    orders = list(data.orders(scale, list(suppliers), products).values())
+    users = list(data.users(scale).values())
+    supplier_list = list(suppliers.values())
+    product_list = list(products.values())
+    
+    def run():
+        invalid = 0
+        for order in orders:
+            invalid += not validators.validate_order_data(order)['is_valid']
+            invalid += not validators.validate_location_data(order['delivery_address']['location'])['is_valid']
+        for product in product_list:
+            invalid += not validators.validate_product_data(product)['is_valid']
+        for supplier in supplier_list:
+            invalid += not validators.validate_supplier_data(supplier)['is_valid']
+        for user in users:
+            invalid += not validators.validate_user_data(user)['is_valid']
+        return {'payloads': len(orders) * 2 + len(product_list) + len(supplier_list) + len(users), 'invalid': invalid}
+    return run
+
+CASES = {
+    'delivery_clusters': case_delivery_clusters,
+    'group_orders': case_group_orders,
+    'bulk_price_validation': case_bulk_price_validation,
+    'voice': case_voice,
+    'search_products': case_search_products,
+    'validators': case_validators
+}
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_case(name: str, scale: int, seed: int, repeat: int) -> dict:
+    """Build the case's data (untimed), then time repeat runs"""
+    run = CASES[name](SyntheticData(seed), scale)
+    timings = []
+    output = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = run()
+        timings.append(time.perf_counter() - started)
+    
+    median = statistics.median(timings)
+    return {
+        'case': name,
+        'scale': scale,
+        'runs': [round(seconds, 6) for seconds in timings],
+        'min_seconds': round(min(timings), 6),
+        'median_seconds': round(median, 6),
+        'per_item_us': round(median / scale * 1e6, 3),
+        'output': output
+    }
+
+def benchmark(args) -> dict:
+    results = []
+    for name in args.cases:
+        too_slow = None
+        for scale in sorted(args.scales):
+            if too_slow:
+                results.append({'case': name, 'scale': scale, 'skipped': too_slow})
+                continue
+            result = run_case(name, scale, args.seed, args.repeat)
+            results.append(result)
+            print(f"{name:<24} {scale:>8}  median {result['median_seconds']:.4f}s  "
+                  f"{result['per_item_us']:.2f}us/item  {result['output']}", file=sys.stderr)
+            if result['median_seconds'] > args.max_seconds:
+                too_slow = f"{scale} took {result['median_seconds']:.1f}s (> --max-seconds {args.max_seconds})"
+    
+    return {
+        'revision': git_revision(),
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': results
+    }
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print median time ratios (new / old) for every case and scale in both files"""
+    with open(old_path) as old_file, open(new_path) as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    old_results = {(r['case'], r['scale']): r for r in old['results'] if 'median_seconds' in r}
+    print(f"{'case':<24} {'scale':>8} {old['revision']:>12} {new['revision']:>12}  ratio")
+    for result in new['results']:
+        previous = old_results.get((result['case'], result['scale']))
+        if not previous or 'median_seconds' not in result:
+            continue
+        ratio = result['median_seconds'] / previous['median_seconds'] if previous['median_seconds'] else float('inf')
+        flag = '  SLOWER' if ratio > 1.2 else ''
+        print(f"{result['case']:<24} {result['scale']:>8} {previous['median_seconds']:>11.4f}s "
+              f"{result['median_seconds']:>11.4f}s  {ratio:.2f}x{flag}")
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        if len(sys.argv) != 4:
+            sys.exit('usage: hot_paths.py compare OLD.json NEW.json')
+        compare(sys.argv[2], sys.argv[3])
+        return
+    
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=30.0)
+    parser.add_argument('--output', help='results file (default benchmarks/results/<revision>.json)')
+    args = parser.parse_args()
+    
+    report = benchmark(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f'Results written to {output}', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Concurrent load test for sharded stock reservation
+
+Many workers reserve the same hot product at once, first on a single
+counter and then on sharded counters, and report throughput, transaction
+retries and whether stock was oversold.
+
+Run against the Realtime Database emulator or a scratch project:
+    FIREBASE_DATABASE_EMULATOR_HOST=localhost:9000 \\
+    FIREBASE_DATABASE_URL=http://localhost:9000?ns=swadsupply-loadtest \\
+    python benchmarks/inventory_contention.py --workers 32 --orders 2000 --stock 1500
+
+or, with no emulator, against the in-memory backend with optimistic
+transactions and a fixed round trip (benchmarks/optimistic_store.py):
+    python benchmarks/inventory_contention.py --stand-in --round-trip-ms 2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.repositories import configure_store, store
+from app.services.inventory_service import InventoryService
+
+def init_database():
+    """Connect to the database named by FIREBASE_DATABASE_URL"""
+    import firebase_admin
+    from firebase_admin import credentials
+    configure_store('firebase')
+    if firebase_admin._apps:
+        return
+    cred_path = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+    cred = credentials.Certificate(cred_path) if cred_path else None
+    firebase_admin.initialize_app(cred, {'databaseURL': os.environ['FIREBASE_DATABASE_URL']})
+
+def init_stand_in(round_trip_ms: float):
+    """Use the in-memory backend with Realtime Database style transactions"""
+    from benchmarks.optimistic_store import OptimisticTransactions
+    OptimisticTransactions(round_trip_ms).install(configure_store('memory'))
+
+def run_scenario(shard_count: int, workers: int, orders: int, stock: int, quantity: int) -> dict:
+    """Reserve one hot product from many threads and summarize the outcome"""
+    service = InventoryService()
+    service.shard_count = shard_count
+    service.sweep_interval = float('inf')  # no expiry sweeps during the run
+    
+    product_id = f'loadtest-{uuid.uuid4().hex[:8]}'
+    products = {product_id: {'quantity_available': stock}}
+    service.restock(product_id, stock)
+    
+    def place_order(index):
+        order_id = f'{product_id}-{index}'
+        started = time.perf_counter()
+        result = service.reserve(order_id, [{'product_id': product_id, 'quantity': quantity}], products)
+        return result['success'], time.perf_counter() - started
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(place_order, range(orders)))
+    elapsed = time.perf_counter() - started
+    
+    accepted = sum(1 for success, _ in outcomes if success)
+    latencies = sorted(latency for _, latency in outcomes)
+    remaining = service.get_available(product_id)
+    stats = service.get_stats()
+    
+    # Clean up the scratch product and its reservations
+    store.reference(f'inventory/{product_id}').delete()
+    store.reference('reservations').update({f'{product_id}-{index}': None for index in range(orders)})
+    
+    return {
+        'shard_count': shard_count,
+        'orders': orders,
+        'accepted': accepted,
+        'rejected': orders - accepted,
+        'remaining_stock': remaining,
+        'oversold': accepted * quantity > stock or (remaining or 0) < 0,
+        'elapsed_seconds': round(elapsed, 3),
+        'orders_per_second': round(orders / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        'transactions': stats['transactions'],
+        'retries': stats['retries'],
+        'contended_transactions': stats['contended'],
+        'aborted_transactions': stats['aborted'],
+        'retry_rate': stats['retry_rate']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--stock', type=int, default=1500)
+    parser.add_argument('--quantity', type=int, default=1)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--stand-in', action='store_true', help='in-memory backend instead of Firebase')
+    parser.add_argument('--round-trip-ms', type=float, default=2.0, help='stand-in delay per read and write')
+    args = parser.parse_args()
+    
+    if args.stand_in:
+        init_stand_in(args.round_trip_ms)
+    else:
+        init_database()
+    
+    results = [
+        run_scenario(shard_count, args.workers, args.orders, args.stock, args.quantity)
+        for shard_count in args.shards
+    ]
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,515 @@
+"""
+End-to-end load test of the Flask app against local stand-ins
+
+A child process serves create_app() on 127.0.0.1 with the in-memory data
+backend (a local Realtime Database stand-in) seeded from benchmarks/synthetic.py,
+and agmarket_service pointed at a mock Agmarknet server. This process replays
+a traffic mix against it and reports requests/sec, p50/p95/p99 and latency
+histograms per blueprint and per mix entry, plus how many database calls
+(reads, multi-location writes, transactions) each endpoint made per request.
+    
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --mix benchmarks/mixes/morning_rush.json --rate 200 --duration 60
+    python benchmarks/load_test.py --concurrency 32 --orders 100000 --output /tmp/load.json
+
+A mix is a JSON file (or a .py file defining MIX) of weighted request templates:
+    
+    {"requests": [{"name": "search_products", "weight": 18, "method": "GET",
+                   "path": "/api/vendors/products/search?q={query}"}, ...]}
+
+Templates may use {user_id}, {supplier_id}, {product_id}, {vendor_id}, {query},
+{prefix}, {location}, {transcript}, {uuid}, {order_items}, {order_supplier_id},
+{delivery_address}, {order_id} and {next_status}; a string that is exactly one
+placeholder is replaced by the raw value (so {location} becomes an object).
+Without --rate each worker sends back to back (closed loop); with --rate requests
+are scheduled at that total rate and latency is measured from the scheduled time,
+so queueing behind a slow server is counted.
+
+/api/auth/verify-token needs Firebase Auth, so the auth blueprint is exercised
+through get-user-role.
+"""
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import re
+import runpy
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+from urllib.parse import quote
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import SyntheticData, MUMBAI_AREAS, PRODUCTS
+from benchmarks.hot_paths import RESULTS_DIR, git_revision
+
+ENDPOINT_HEADER = 'X-Load-Test-Endpoint'
+BLUEPRINTS = ('auth', 'vendors', 'suppliers', 'orders', 'mandi', 'analytics')
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+TERMINAL_STATUSES = ('delivered', 'cancelled')
+NEXT_STATUS = {'pending': 'confirmed', 'confirmed': 'preparing', 'preparing': 'shipped', 'shipped': 'delivered'}
+
+def build_database(args) -> dict:
+    """The seeded tree both processes derive from --seed and the size options"""
+    tree = SyntheticData(args.seed).database(
+        suppliers=args.suppliers, products=args.products, orders=args.orders, users=args.users
+    )
+    # No price cache, so the first mandi price lookup goes to the mock Agmarknet
+    tree.pop('cache', None)
+    return tree
+
+# Server side (child process)
+
+class StoreCallCounter:
+    """Counts data-store calls per Flask endpoint by wrapping a TreeStore's primitives"""
+    
+    OPERATIONS = {'_read': 'read', '_write': 'write', '_transaction': 'transaction'}
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = Counter()
+            self.calls = defaultdict(Counter)
+            self.seconds = Counter()
+    
+    def instrument(self, backend) -> None:
+        for method_name, operation in self.OPERATIONS.items():
+            setattr(backend, method_name, self._counted(getattr(backend, method_name), operation))
+    
+    def count_request(self, endpoint: str) -> None:
+        with self._lock:
+            self.requests[endpoint] += 1
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                endpoint: {
+                    'requests': self.requests.get(endpoint, 0),
+                    'store_calls': dict(self.calls[endpoint]),
+                    'store_seconds': round(self.seconds[endpoint], 6)
+                }
+                for endpoint in set(self.requests) | set(self.calls)
+            }
+    
+    def _counted(self, method, operation: str):
+        from flask import has_request_context, request
+        
+        def counted(*args, **kwargs):
+            endpoint = (request.endpoint or '(unmatched)') if has_request_context() else '(background)'
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.calls[endpoint][operation] += 1
+                    self.seconds[endpoint] += elapsed
+        return counted
+
+def serve(conn, args) -> None:
+    """Child process: seed the stand-ins, serve the app and answer stats/reset/stop over conn"""
+    from werkzeug.serving import make_server
+    from flask import request
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no access log per request
+    
+    work_dir = tempfile.mkdtemp(prefix='swadsupply-load-')
+    os.environ['DATA_BACKEND'] = 'memory'
+    os.environ['ORDER_QUEUE_DIR'] = os.path.join(work_dir, 'queue')
+    os.environ['ANALYTICS_REPLICA_PATH'] = os.path.join(work_dir, 'analytics_replica.sqlite3')
+    
+    from benchmarks.mock_agmarknet import MockAgmarknetServer
+    from app import create_app
+    from app.repositories import configure_store
+    from app.services.agmarket_service import agmarket_service
+    from app.services.order_index import order_index_service
+    from app.services.sales_rollups import sales_rollup_service
+    
+    agmarknet = MockAgmarknetServer(latency_ms=args.agmarknet_latency_ms).start()
+    agmarket_service.base_url = agmarknet.base_url
+    
+    backend = configure_store('memory', data=build_database(args))
+    app = create_app()
+    order_index_service.rebuild_vendor_index()
+    order_index_service.rebuild_supplier_index()
+    sales_rollup_service.rebuild()
+    
+    counter = StoreCallCounter()
+    counter.instrument(backend)
+    
+    @app.after_request
+    def tag_endpoint(response):
+        endpoint = request.endpoint or '(unmatched)'
+        counter.count_request(endpoint)
+        response.headers[ENDPOINT_HEADER] = endpoint
+        return response
+    
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='load-test-server', daemon=True).start()
+    conn.send(('ready', server.server_port))
+    
+    while True:
+        command = conn.recv()
+        if command == 'reset':
+            counter.reset()
+            agmarknet.requests = 0
+            conn.send('ok')
+        elif command == 'stats':
+            conn.send({'endpoints': counter.snapshot(), 'agmarknet_requests': agmarknet.requests})
+        else:
+            break
+    
+    server.shutdown()
+    agmarknet.stop()
+
+# Client side
+
+class TrafficData:
+    """IDs and values from the seeded database used to fill request templates"""
+    
+    def __init__(self, tree: dict, seed: int):
+        synthetic = SyntheticData(seed + 1)
+        self.user_ids = sorted(tree['users']) or ['user-000000']
+        self.supplier_ids = sorted(tree['suppliers'])
+        self.product_ids = sorted(tree['products'])
+        self.vendor_ids = sorted({order['vendor_id'] for order in tree['orders'].values()}) or ['vendor-000000']
+        self.transcripts = synthetic.transcripts(1000)
+        self.locations = [synthetic.location() for _ in range(1000)]
+        
+        self.products_by_supplier = defaultdict(list)
+        for product_id, product in tree['products'].items():
+            if product.get('is_available', True):
+                self.products_by_supplier[product['supplier_id']].append(product_id)
+        self.stocked_suppliers = sorted(self.products_by_supplier)
+        
+        # Statuses as this client last moved them, so status updates mostly follow valid transitions
+        self.order_statuses = {
+            order_id: order['status'] for order_id, order in tree['orders'].items()
+            if order['status'] not in TERMINAL_STATUSES
+        }
+        self.open_orders = sorted(self.order_statuses)
+        self._lock = threading.Lock()
+    
+    def generate(self, name: str, rng: random.Random) -> dict:
+        if name == 'user_id':
+            return {name: rng.choice(self.user_ids)}
+        if name == 'supplier_id':
+            return {name: rng.choice(self.supplier_ids)}
+        if name == 'product_id':
+            return {name: rng.choice(self.product_ids)}
+        if name == 'vendor_id':
+            return {name: rng.choice(self.vendor_ids)}
+        if name == 'query':
+            return {name: rng.choice(list(PRODUCTS))}
+        if name == 'prefix':
+            word = rng.choice(list(PRODUCTS))
+            return {name: word[:rng.randint(1, min(4, len(word)))]}
+        if name == 'location':
+            return {name: rng.choice(self.locations)}
+        if name == 'transcript':
+            return {name: rng.choice(self.transcripts)}
+        if name == 'uuid':
+            return {name: str(uuid.UUID(int=rng.getrandbits(128), version=4))}
+        if name == 'delivery_address':
+            area, _, _ = rng.choice(MUMBAI_AREAS)
+            return {name: {'street': f'{rng.randint(1, 500)} Station Road, {area}', 'city': 'Mumbai',
+                           'pincode': str(rng.randint(400001, 400104)), 'location': rng.choice(self.locations)}}
+        if name in ('order_items', 'order_supplier_id'):
+            supplier_id = rng.choice(self.stocked_suppliers)
+            stocked = self.products_by_supplier[supplier_id]
+            items = [{'product_id': product_id, 'quantity': rng.randint(1, 5)}
+                     for product_id in rng.sample(stocked, min(len(stocked), rng.randint(1, 3)))]
+            return {'order_items': items, 'order_supplier_id': supplier_id}
+        if name in ('order_id', 'next_status'):
+            with self._lock:
+                if not self.open_orders:
+                    return {'order_id': 'order-missing', 'next_status': 'confirmed'}
+                order_id = rng.choice(self.open_orders)
+                next_status = NEXT_STATUS[self.order_statuses[order_id]]
+                if next_status in TERMINAL_STATUSES:
+                    del self.order_statuses[order_id]
+                    self.open_orders.remove(order_id)
+                else:
+                    self.order_statuses[order_id] = next_status
+            return {'order_id': order_id, 'next_status': next_status}
+        raise KeyError(f'Unknown template value {{{name}}}')
+
+class RequestContext(dict):
+    """Template values for one request, generated on first use"""
+    
+    def __init__(self, data: TrafficData, rng: random.Random):
+        super().__init__()
+        self.data = data
+        self.rng = rng
+    
+    def __missing__(self, name: str):
+        self.update(self.data.generate(name, self.rng))
+        return self[name]
+
+class _Quoted:
+    """format_map view that URL-quotes values, for paths and query strings"""
+    
+    def __init__(self, context: RequestContext):
+        self.context = context
+    
+    def __getitem__(self, name: str) -> str:
+        return quote(str(self.context[name]), safe='')
+
+def render(template, context: RequestContext):
+    if isinstance(template, str):
+        whole = re.fullmatch(r'\{(\w+)\}', template)
+        if whole:
+            return context[whole.group(1)]
+        return template.format_map(context)
+    if isinstance(template, dict):
+        return {key: render(value, context) for key, value in template.items()}
+    if isinstance(template, list):
+        return [render(value, context) for value in template]
+    return template
+
+def load_mix(path: str) -> dict:
+    if path.endswith('.py'):
+        mix = runpy.run_path(path)['MIX']
+    else:
+        with open(path) as mix_file:
+            mix = json.load(mix_file)
+    if isinstance(mix, list):
+        mix = {'requests': mix}
+    
+    for entry in mix['requests']:
+        missing = [field for field in ('name', 'method', 'path') if field not in entry]
+        if missing:
+            raise ValueError(f"Mix entry {entry} is missing {', '.join(missing)}")
+        if entry.get('weight', 1) <= 0:
+            raise ValueError(f"Mix entry {entry['name']} needs a positive weight")
+    mix['name'] = os.path.splitext(os.path.basename(path))[0]
+    return mix
+
+class Schedule:
+    """Shared send times for open-loop runs at a fixed total rate"""
+    
+    def __init__(self, rate: float, start: float):
+        self.interval = 1.0 / rate
+        self.next = start
+        self._lock = threading.Lock()
+    
+    def slot(self) -> float:
+        with self._lock:
+            at = self.next
+            self.next += self.interval
+            return at
+
+def run_worker(index: int, base_url: str, mix: dict, data: TrafficData, args, start: float,
+               measure_from: float, end: float, schedule, samples: list) -> None:
+    import requests
+    
+    rng = random.Random(args.seed * 1000 + index)
+    entries = mix['requests']
+    weights = [entry.get('weight', 1) for entry in entries]
+    session = requests.Session()
+    
+    while True:
+        scheduled = schedule.slot() if schedule else time.perf_counter()
+        if scheduled >= end:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        
+        entry = rng.choices(entries, weights)[0]
+        context = RequestContext(data, rng)
+        url = base_url + entry['path'].format_map(_Quoted(context))
+        headers = render(entry.get('headers', {}), context)
+        body = render(entry['json'], context) if 'json' in entry else None
+        
+        sent = time.perf_counter()
+        try:
+            response = session.request(entry['method'], url, json=body, headers=headers, timeout=args.timeout)
+            status = response.status_code
+            endpoint = response.headers.get(ENDPOINT_HEADER, '(unmatched)')
+        except requests.RequestException:
+            status = 0
+            endpoint = '(unmatched)'
+        finished = time.perf_counter()
+        
+        if sent >= measure_from:
+            samples.append((entry['name'], endpoint, status, finished - (scheduled if schedule else sent)))
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def histogram(latencies_ms: list) -> list:
+    buckets = [{'le_ms': bound, 'count': 0} for bound in HISTOGRAM_BOUNDS_MS] + [{'le_ms': None, 'count': 0}]
+    for latency in latencies_ms:
+        for bucket in buckets:
+            if bucket['le_ms'] is None or latency <= bucket['le_ms']:
+                bucket['count'] += 1
+                break
+    return buckets
+
+def summarize(samples: list, seconds: float) -> dict:
+    latencies = sorted(sample[3] * 1000 for sample in samples)
+    statuses = Counter(sample[2] for sample in samples)
+    return {
+        'requests': len(samples),
+        'rps': round(len(samples) / seconds, 2) if seconds else 0,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3) if latencies else 0,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'errors': sum(count for status, count in statuses.items() if status == 0 or status >= 500),
+        'histogram': histogram(latencies)
+    }
+
+def build_report(mix: dict, args, samples: list, seconds: float, server_stats: dict) -> dict:
+    by_blueprint = defaultdict(list)
+    by_entry = defaultdict(list)
+    entry_endpoints = defaultdict(Counter)
+    for sample in samples:
+        name, endpoint = sample[0], sample[1]
+        by_blueprint[endpoint.split('.')[0] if '.' in endpoint else endpoint].append(sample)
+        by_entry[name].append(sample)
+        entry_endpoints[name][endpoint] += 1
+    
+    endpoints = server_stats['endpoints']
+    entries = {}
+    for name, entry_samples in by_entry.items():
+        endpoint = entry_endpoints[name].most_common(1)[0][0]
+        summary = summarize(entry_samples, seconds)
+        summary['endpoint'] = endpoint
+        served = endpoints.get(endpoint, {})
+        if served.get('requests'):
+            summary['store_calls_per_request'] = {
+                operation: round(count / served['requests'], 2) for operation, count in served['store_calls'].items()
+            }
+            summary['store_ms_per_request'] = round(served['store_seconds'] * 1000 / served['requests'], 3)
+        entries[name] = summary
+    
+    blueprint_order = list(BLUEPRINTS) + sorted(set(by_blueprint) - set(BLUEPRINTS))
+    return {
+        'revision': git_revision(),
+        'created_at': datetime.now().isoformat(),
+        'mix': mix['name'],
+        'options': {key: value for key, value in vars(args).items() if key != 'output'},
+        'duration_seconds': round(seconds, 3),
+        'overall': summarize(samples, seconds),
+        'blueprints': {name: summarize(by_blueprint[name], seconds) for name in blueprint_order if by_blueprint.get(name)},
+        'entries': dict(sorted(entries.items())),
+        'server': server_stats
+    }
+
+def print_report(report: dict) -> None:
+    overall = report['overall']
+    print(f"\nmix {report['mix']}: {overall['requests']} requests in {report['duration_seconds']}s, "
+          f"{overall['rps']} req/s, {overall['errors']} errors, "
+          f"{report['server']['agmarknet_requests']} Agmarknet calls\n")
+    
+    header = f"{'':<24} {'req':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses"
+    for title, rows in (('blueprint', report['blueprints']), ('entry', report['entries'])):
+        print(title.upper().ljust(24) + header[24:])
+        for name, row in rows.items():
+            statuses = ' '.join(f'{status}:{count}' for status, count in row['statuses'].items())
+            print(f"{name:<24} {row['requests']:>7} {row['rps']:>8.1f} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+                  f"{row['p99_ms']:>9.2f} {row['max_ms']:>9.2f}  {statuses}")
+        print()
+    
+    print('DATABASE CALLS PER REQUEST')
+    for name, row in report['entries'].items():
+        calls = row.get('store_calls_per_request')
+        if calls is not None:
+            described = ', '.join(f'{operation} {count}' for operation, count in sorted(calls.items())) or 'none'
+            print(f"{name:<24} {described}  ({row['store_ms_per_request']:.2f} ms in the store)")
+    background = report['server']['endpoints'].get('(background)')
+    if background:
+        print(f"{'(background)':<24} {background['store_calls']}")
+    print()
+    
+    for name, row in report['blueprints'].items():
+        print(f'{name} latency')
+        total = max(1, row['requests'])
+        lower = 0
+        for bucket in row['histogram']:
+            label = f"{lower}-{bucket['le_ms']} ms" if bucket['le_ms'] else f'> {lower} ms'
+            bar = '#' * round(bucket['count'] * 50 / total)
+            print(f"  {label:>14} {bucket['count']:>7}  {bar}")
+            lower = bucket['le_ms']
+        print()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mix', default=os.path.join(BACKEND_DIR, 'benchmarks', 'mixes', 'default.json'))
+    parser.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5.0, help='seconds of traffic before measuring')
+    parser.add_argument('--concurrency', type=int, default=16, help='client threads')
+    parser.add_argument('--rate', type=float, help='total requests/sec (open loop); default closed loop')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--suppliers', type=int, default=200)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--agmarknet-latency-ms', type=float, default=150.0)
+    parser.add_argument('--port', type=int, default=0, help='app port (default any free port)')
+    parser.add_argument('--output', help='report file (default benchmarks/results/load-<mix>-<revision>.json)')
+    args = parser.parse_args()
+    
+    mix = load_mix(args.mix)
+    data = TrafficData(build_database(args), args.seed)
+    
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(child_conn, args), daemon=True)
+    server.start()
+    _, port = parent_conn.recv()
+    base_url = f'http://127.0.0.1:{port}'
+    print(f'Serving on {base_url}; {args.warmup:.0f}s warmup, {args.duration:.0f}s measured', file=sys.stderr)
+    
+    start = time.perf_counter()
+    measure_from = start + args.warmup
+    end = measure_from + args.duration
+    schedule = Schedule(args.rate, start) if args.rate else None
+    samples = []
+    workers = [
+        threading.Thread(target=run_worker, args=(index, base_url, mix, data, args, start, measure_from, end, schedule, samples))
+        for index in range(args.concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    
+    time.sleep(max(0.0, measure_from - time.perf_counter()))
+    parent_conn.send('reset')
+    parent_conn.recv()
+    for worker in workers:
+        worker.join()
+    
+    parent_conn.send('stats')
+    server_stats = parent_conn.recv()
+    parent_conn.send('stop')
+    server.join(timeout=10)
+    
+    report = build_report(mix, args, samples, args.duration, server_stats)
+    print_report(report)
+    
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{mix['name']}-{report['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as report_file:
+        json.dump(report, report_file, indent=2)
+    print(f'Report written to {output}', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
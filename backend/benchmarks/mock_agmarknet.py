@@ -0,0 +1,91 @@
+"""
+Local stand-in for the Agmarknet (data.gov.in) mandi price API
+
+Answers GET /resource/<resource_id> with records shaped like the real API,
+built from the synthetic product list, so agmarket_service can be pointed
+at it with agmarket_service.base_url = server.base_url.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime
+import json
+import threading
+import time
+
+from benchmarks.synthetic import PRODUCTS
+
+class MockAgmarknetServer:
+    """Threaded HTTP server on 127.0.0.1 with an optional fixed response delay"""
+    
+    def __init__(self, port: int = 0, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/resource'
+    
+    def records(self, commodity: str = None) -> list:
+        today = datetime.now().strftime('%d/%m/%Y')
+        records = []
+        for name, (_, _, price) in PRODUCTS.items():
+            if commodity and commodity.lower() != name:
+                continue
+            modal = price * 100  # per quintal, as Agmarknet reports
+            records.append({
+                'state': 'Maharashtra',
+                'district': 'Mumbai',
+                'market': 'Vashi',
+                'commodity': name.title(),
+                'unit': 'per quintal',
+                'min_price': str(round(modal * 0.85)),
+                'max_price': str(round(modal * 1.15)),
+                'modal_price': str(modal),
+                'price_date': today
+            })
+        return records
+    
+    def start(self) -> 'MockAgmarknetServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-agmarknet', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                
+                url = urlparse(self.path)
+                if not url.path.startswith('/resource/'):
+                    self.send_error(404)
+                    return
+                commodity = parse_qs(url.query).get('filters[commodity]', [None])[0]
+                records = server.records(commodity)
+                body = json.dumps({'status': 'ok', 'total': len(records), 'count': len(records), 'records': records}).encode()
+                
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
@@ -0,0 +1,47 @@
+"""
+Local stand-in for Realtime Database transactions
+
+The memory backend runs a transaction under one lock, so concurrent
+transactions never conflict. This wraps a memory store so transactions
+behave like the Admin SDK's instead: read the current value, compute the
+new one, then write it only if the value is unchanged, retrying up to 25
+times before raising TransactionAbortedError. Every read and every
+compare-and-set waits round_trip_ms, standing in for the network.
+"""
+import time
+
+from app.repositories.base import TransactionAbortedError, clone, get_in, set_in
+
+class OptimisticTransactions:
+    """Replaces a MemoryStore's _read and _transaction with optimistic, delayed versions"""
+    
+    def __init__(self, round_trip_ms: float = 2.0, max_retries: int = 25):
+        self.round_trip = round_trip_ms / 1000
+        self.max_retries = max_retries
+    
+    def install(self, backend) -> None:
+        read = backend._read
+        lock = backend._lock
+        round_trip = self.round_trip
+        max_retries = self.max_retries
+        
+        def delayed_read(parts):
+            time.sleep(round_trip)
+            return read(parts)
+        
+        def optimistic_transaction(parts, transaction_update):
+            for _ in range(max_retries):
+                expected = delayed_read(parts)
+                new_value = clone(transaction_update(clone(expected)))
+                time.sleep(round_trip)
+                with lock:
+                    if get_in(backend._root, parts) == expected:
+                        backend._root = set_in(backend._root, parts, new_value) or {}
+                        break
+            else:
+                raise TransactionAbortedError(f'Transaction at /{"/".join(parts)} aborted after {max_retries} attempts')
+            backend._notify([(parts, new_value)], 'put')
+            return clone(new_value)
+        
+        backend._read = delayed_read
+        backend._transaction = optimistic_transaction
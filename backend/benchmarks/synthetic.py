@@ -0,0 +1,212 @@
+"""
+Seeded synthetic data for benchmarks and load tests
+
+Everything is drawn from one random.Random(seed), so the same seed and sizes
+give the same suppliers, products, orders and transcripts on every machine.
+Locations are scattered around Mumbai market areas.
+"""
+from datetime import datetime, timedelta
+import random
+
+# (area, lat, lng) centres that generated points are scattered around
+MUMBAI_AREAS = [
+    ('Dadar', 19.0178, 72.8478),
+    ('Andheri', 19.1136, 72.8697),
+    ('Bandra', 19.0596, 72.8295),
+    ('Kurla', 19.0726, 72.8845),
+    ('Borivali', 19.2307, 72.8567),
+    ('Colaba', 18.9067, 72.8147),
+    ('Ghatkopar', 19.0860, 72.9081),
+    ('Chembur', 19.0522, 72.9005),
+    ('Vashi', 19.0771, 72.9986),
+    ('Byculla', 18.9750, 72.8258)
+]
+
+# name -> (category, unit, typical price per unit)
+PRODUCTS = {
+    'onion': ('vegetables', 'kg', 30),
+    'tomato': ('vegetables', 'kg', 25),
+    'potato': ('vegetables', 'kg', 20),
+    'garlic': ('spices', 'kg', 120),
+    'ginger': ('spices', 'kg', 80),
+    'green chili': ('vegetables', 'kg', 60),
+    'coriander': ('vegetables', 'kg', 40),
+    'oil': ('oils', 'liter', 140),
+    'turmeric': ('spices', 'kg', 200),
+    'red chili': ('spices', 'kg', 250)
+}
+
+# Spoken forms the voice parser recognises, per product
+SPOKEN_NAMES = {
+    'onion': ['onion', 'pyaj', 'kanda'],
+    'tomato': ['tomato', 'tamatar'],
+    'potato': ['potato', 'aloo', 'batata'],
+    'garlic': ['garlic', 'lehsun'],
+    'ginger': ['ginger', 'adrak'],
+    'green chili': ['hari mirch', 'green chilli'],
+    'coriander': ['dhania', 'coriander'],
+    'oil': ['tel', 'cooking oil'],
+    'turmeric': ['haldi', 'turmeric'],
+    'red chili': ['lal mirch', 'red chili']
+}
+
+SPOKEN_QUANTITIES = ['ek', 'do', 'teen', 'paanch', 'das', 'aadha', 'dedh', '2', '5', '10', '2.5']
+SPOKEN_UNITS = ['kg', 'kilo', 'gram', 'litre', 'packet', '']
+FILLERS = ['mujhe', 'bhaiya', 'please', 'aaj', 'jaldi bhejo', 'chahiye']
+STATUSES = ['pending', 'confirmed', 'preparing', 'shipped', 'delivered', 'cancelled']
+STATUS_WEIGHTS = [30, 25, 10, 10, 20, 5]
+
+class SyntheticData:
+    """Generators for the app's records; ids are stable per seed and index"""
+    
+    def __init__(self, seed: int = 42, now: datetime = None):
+        self.random = random.Random(seed)
+        self.now = now or datetime(2025, 1, 15, 12, 0, 0)
+    
+    def location(self) -> dict:
+        """A point within about a kilometre of a Mumbai market area"""
+        _, lat, lng = self.random.choice(MUMBAI_AREAS)
+        return {
+            'lat': round(self.random.gauss(lat, 0.01), 6),
+            'lng': round(self.random.gauss(lng, 0.01), 6)
+        }
+    
+    def phone(self) -> str:
+        return '+91' + self.random.choice('6789') + ''.join(self.random.choice('0123456789') for _ in range(9))
+    
+    def suppliers(self, count: int) -> dict:
+        suppliers = {}
+        for index in range(count):
+            area = self.random.choice(MUMBAI_AREAS)[0]
+            suppliers[f'supplier-{index:06d}'] = {
+                'business_name': f'{area} Traders {index}',
+                'owner_name': f'Owner {chr(65 + index % 26)} {area}',
+                'email': f'supplier{index}@example.com',
+                'phone': self.phone(),
+                'address': f'{self.random.randint(1, 300)} Market Road, {area}, Mumbai',
+                'location': self.location(),
+                'delivery_radius': self.random.choice([5, 10, 15]),
+                'average_rating': round(self.random.uniform(3, 5), 1),
+                'total_reviews': self.random.randint(0, 200),
+                'is_active': self.random.random() > 0.05
+            }
+        return suppliers
+    
+    def products(self, count: int, supplier_ids: list) -> dict:
+        products = {}
+        for index in range(count):
+            name = self.random.choice(list(PRODUCTS))
+            category, unit, price = PRODUCTS[name]
+            products[f'product-{index:06d}'] = {
+                'name': name.title(),
+                'description': f'Fresh {name}',
+                'category': category,
+                'unit': unit,
+                # Mostly near the typical price, with some outliers for the price checks
+                'price': round(price * self.random.choice([1, 1, 1, 1, 0.5, 1.8]) * self.random.uniform(0.85, 1.15), 2),
+                'quantity_available': self.random.randint(10, 1000),
+                'supplier_id': self.random.choice(supplier_ids),
+                'is_available': self.random.random() > 0.1
+            }
+        return products
+    
+    def orders(self, count: int, supplier_ids: list, products: dict, vendor_count: int = None,
+               status: str = None) -> dict:
+        """Orders of 1-4 items from one supplier each, placed over the last 30 days"""
+        vendor_count = vendor_count or max(1, count // 5)
+        by_supplier = {}
+        for product_id, product in products.items():
+            by_supplier.setdefault(product['supplier_id'], []).append((product_id, product))
+        stocked = [supplier_id for supplier_id in supplier_ids if supplier_id in by_supplier]
+        
+        orders = {}
+        for index in range(count):
+            supplier_id = self.random.choice(stocked)
+            lines = self.random.sample(by_supplier[supplier_id], min(len(by_supplier[supplier_id]), self.random.randint(1, 4)))
+            items = []
+            for product_id, product in lines:
+                quantity = self.random.randint(1, 20)
+                items.append({
+                    'product_id': product_id,
+                    'product_name': product['name'],
+                    'quantity': quantity,
+                    'unit_price': product['price'],
+                    'total_price': round(product['price'] * quantity, 2),
+                    'unit': product['unit']
+                })
+            created_at = (self.now - timedelta(minutes=self.random.randint(0, 30 * 24 * 60))).isoformat()
+            order_id = f'order-{index:07d}'
+            orders[order_id] = {
+                'id': order_id,
+                'vendor_id': f'vendor-{self.random.randrange(vendor_count):06d}',
+                'supplier_id': supplier_id,
+                'items': items,
+                'total_amount': round(sum(item['total_price'] for item in items), 2),
+                'status': status or self.random.choices(STATUSES, STATUS_WEIGHTS)[0],
+                'delivery_address': {
+                    'street': f'{self.random.randint(1, 500)} Station Road',
+                    'city': 'Mumbai',
+                    'state': 'Maharashtra',
+                    'pincode': str(self.random.randint(400001, 400104)),
+                    'location': self.location()
+                },
+                'delivery_window': self.random.choice(['morning', 'afternoon', 'evening']),
+                'payment_method': self.random.choice(['cash_on_delivery', 'upi']),
+                'created_at': created_at,
+                'updated_at': created_at
+            }
+        return orders
+    
+    def users(self, count: int) -> dict:
+        users = {}
+        for index in range(count):
+            users[f'user-{index:06d}'] = {
+                'name': f'Vendor {chr(65 + index % 26)}{chr(65 + index // 26 % 26)}',
+                'email': f'vendor{index}@example.com',
+                'phone': self.phone(),
+                'role': self.random.choice(['vendor', 'vendor', 'supplier'])
+            }
+        return users
+    
+    def transcripts(self, count: int, typo_rate: float = 0.1) -> list:
+        """Hinglish order phrases, some with speech-to-text style typos"""
+        transcripts = []
+        for _ in range(count):
+            parts = [self.random.choice(FILLERS)] if self.random.random() < 0.5 else []
+            for product in self.random.sample(list(SPOKEN_NAMES), self.random.randint(1, 3)):
+                spoken = self.random.choice(SPOKEN_NAMES[product])
+                if self.random.random() < typo_rate and len(spoken) > 4:
+                    cut = self.random.randrange(1, len(spoken) - 1)
+                    spoken = spoken[:cut] + spoken[cut + 1] + spoken[cut] + spoken[cut + 2:]
+                unit = self.random.choice(SPOKEN_UNITS)
+                parts.append(' '.join(word for word in (self.random.choice(SPOKEN_QUANTITIES), unit, spoken) if word))
+                if self.random.random() < 0.5:
+                    parts.append('aur')
+            parts.append(self.random.choice(['chahiye', 'bhejo', 'dena']))
+            transcripts.append(' '.join(parts))
+        return transcripts
+    
+    def mandi_price_cache(self) -> dict:
+        """A fresh cache/mandi_prices entry, so price checks never call Agmarknet"""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'source': 'agmarknet',
+            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'prices': {
+                name: {'price': price * 100, 'unit': 'quintal', 'market': 'Vashi', 'date': self.now.strftime('%d/%m/%Y')}
+                for name, (_, _, price) in PRODUCTS.items()
+            }
+        }
+    
+    def database(self, suppliers: int, products: int, orders: int, users: int = 0) -> dict:
+        """A whole database tree for the memory store"""
+        supplier_records = self.suppliers(suppliers)
+        product_records = self.products(products, list(supplier_records))
+        return {
+            'suppliers': supplier_records,
+            'products': product_records,
+            'orders': self.orders(orders, list(supplier_records), product_records),
+            'users': self.users(users),
+            'mandi_prices': {name.replace(' ', '_'): price for name, (_, _, price) in PRODUCTS.items()},
+            'cache': {'mandi_prices': self.mandi_price_cache()}
+        }
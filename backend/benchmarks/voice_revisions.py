@@ -0,0 +1,95 @@
+"""
+Compare voice transcript parsing speed between git revisions
+
+Each revision is checked out into a temporary worktree and timed in its
+own interpreter on the same synthetic transcripts (benchmarks/synthetic.py
+from this checkout), calling process_voice_transcript once per transcript.
+Every revision prices from its built-in fallback table: newer ones run on
+an empty memory backend, older ones that read Firebase directly get a
+database that has no prices. For example, the tokenizer change:
+    
+    python benchmarks/voice_revisions.py e0c5300^ e0c5300 --count 100000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import SyntheticData
+
+# Runs inside the revision's backend directory: argv[1] is the transcripts file
+TIMER = '''
+import json, sys, time
+sys.path.insert(0, '.')
+from app.services import voice_processing
+
+class NoPrices:
+    def reference(self, path='/'):
+        return self
+    
+    def get(self):
+        return None
+
+if hasattr(voice_processing, 'db'):
+    voice_processing.db = NoPrices()
+
+with open(sys.argv[1]) as transcripts_file:
+    transcripts = json.load(transcripts_file)
+process = voice_processing.process_voice_transcript
+process(transcripts[0])  # warm up import-time caches
+
+started = time.perf_counter()
+parsed = [process(transcript) for transcript in transcripts]
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'seconds': round(elapsed, 3),
+    'per_second': round(len(transcripts) / elapsed),
+    'parsed': sum(1 for result in parsed if result['success'])
+}))
+'''
+
+def git(*args) -> str:
+    return subprocess.run(['git', *args], cwd=BACKEND_DIR, check=True, capture_output=True, text=True).stdout.strip()
+
+def time_revision(revision: str, transcripts_path: str, work_dir: str) -> dict:
+    """Check out revision and time it in a fresh interpreter"""
+    commit = git('rev-parse', '--short', revision)
+    checkout = os.path.join(work_dir, commit)
+    git('worktree', 'add', '--detach', checkout, commit)
+    try:
+        backend = os.path.join(checkout, os.path.relpath(BACKEND_DIR, git('rev-parse', '--show-toplevel')))
+        env = dict(os.environ, DATA_BACKEND='memory', ORDER_QUEUE_DIR=os.path.join(work_dir, f'queue-{commit}'))
+        output = subprocess.run([sys.executable, '-c', TIMER, transcripts_path], cwd=backend, env=env,
+                                check=True, capture_output=True, text=True).stdout
+        return {'revision': revision, 'commit': commit, **json.loads(output.strip().splitlines()[-1])}
+    finally:
+        git('worktree', 'remove', '--force', checkout)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('revisions', nargs='+')
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix='swadsupply-voice-')
+    try:
+        transcripts_path = os.path.join(work_dir, 'transcripts.json')
+        with open(transcripts_path, 'w') as transcripts_file:
+            json.dump(SyntheticData(args.seed).transcripts(args.count), transcripts_file)
+        
+        for revision in args.revisions:
+            result = time_revision(revision, transcripts_path, work_dir)
+            print(f"{result['commit']} ({revision}): {result['seconds']} s, "
+                  f"{result['per_second']}/s, {result['parsed']}/{args.count} parsed")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Gunicorn settings for the backend, read when gunicorn starts in this directory:
+    gunicorn run:app
+
+Order event streams (GET /api/orders/stream) stay open for as long as the
+client is connected, so workers are gevent workers: each connection is a
+greenlet parked on its subscription queue, and one worker holds thousands of
+idle streams next to ordinary requests. At most ORDER_STREAM_MAX_CONNECTIONS
+of a worker's GUNICORN_WORKER_CONNECTIONS may be streams; streams over the
+cap get 503 and the browser's EventSource retries them.
+
+The request profiler samples OS threads, which greenlets are not; to profile,
+run with GUNICORN_WORKER_CLASS=gthread, where each worker serves
+GUNICORN_THREADS requests and a quarter of them are kept free of streams.
+"""
+import multiprocessing
+import os
+import shutil
+
+bind = f"{os.environ.get('HOST', '127.0.0.1')}:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+timeout = 60  # worker heartbeat; streams may stay open longer than this
+keepalive = 5
+
+if worker_class == 'gevent':
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 5000))
+    # Leave a fifth of each worker's connections for ordinary requests
+    stream_limit = worker_connections * 4 // 5
+else:
+    threads = int(os.environ.get('GUNICORN_THREADS', 64))
+    stream_limit = threads * 3 // 4
+os.environ.setdefault('ORDER_STREAM_MAX_CONNECTIONS', str(max(1, stream_limit)))
+
+def on_starting(server):
+    """Empty the shared metrics directory so /metrics totals start with this run"""
+    multiprocess_dir = os.environ.get('METRICS_MULTIPROC_DIR')
+    if multiprocess_dir:
+        shutil.rmtree(multiprocess_dir, ignore_errors=True)
+        os.makedirs(multiprocess_dir, exist_ok=True)
@@ -0,0 +1,14 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ['DATA_BACKEND'] = 'memory'
+
+# Apps built by the tests queue orders here rather than in backend/data
+ORDER_QUEUE_DIR = tempfile.mkdtemp(prefix='order-queue-')
+os.environ['ORDER_QUEUE_DIR'] = ORDER_QUEUE_DIR
+atexit.register(shutil.rmtree, ORDER_QUEUE_DIR, ignore_errors=True)
@@ -0,0 +1,8 @@
+from app import create_app
+from app.repositories import configure_store, get_store
+
+def test_create_app_keeps_the_configured_store():
+    backend = configure_store('memory', data={'products': {'product-1': {'name': 'Onion'}}})
+    create_app()
+    
+    assert get_store() is backend
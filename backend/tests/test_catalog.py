@@ -0,0 +1,24 @@
+from app.services import catalog_service as catalog_module
+from app.services.catalog_service import ProductCatalog
+
+class SlowProducts:
+    """Product listing during which the API changes the catalog"""
+    
+    def __init__(self, catalog):
+        self.catalog = catalog
+    
+    def list_all(self):
+        snapshot = {'product-1': {'price': 10}, 'product-2': {'price': 20}, 'product-3': {'price': 30}}
+        self.catalog.apply_update('product-1', {'price': 12})
+        self.catalog.remove('product-2')
+        self.catalog.upsert('product-4', {'price': 40})
+        return snapshot
+
+def test_refresh_keeps_changes_made_while_it_loads(monkeypatch):
+    catalog = ProductCatalog()
+    catalog._products = {'product-1': {'price': 10}, 'product-2': {'price': 20}}
+    monkeypatch.setattr(catalog_module, 'product_repository', SlowProducts(catalog))
+    
+    assert catalog.refresh()
+    
+    assert catalog._products == {'product-1': {'price': 12}, 'product-3': {'price': 30}, 'product-4': {'price': 40}}
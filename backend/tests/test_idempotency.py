@@ -0,0 +1,27 @@
+from app.repositories import configure_store, store
+from app.services.idempotency_service import IdempotencyService
+
+def test_a_key_claimed_by_one_worker_is_honoured_by_another():
+    configure_store('memory', data={})
+    first, second = IdempotencyService(), IdempotencyService()
+    second.wait_timeout = 0.2
+    
+    outcome, claim = first.begin('orders.create_order:key-1', 'body-a')
+    assert outcome == 'run'
+    assert second.begin('orders.create_order:key-1', 'body-a') == ('busy', None)
+    assert second.begin('orders.create_order:key-1', 'body-b') == ('mismatch', None)
+    
+    first.complete('orders.create_order:key-1', claim, 202, {'orderId': 'order-1'})
+    outcome, record = second.begin('orders.create_order:key-1', 'body-a')
+    assert outcome == 'replay'
+    assert record['body'] == {'orderId': 'order-1'}
+
+def test_an_abandoned_claim_lets_a_retry_run():
+    configure_store('memory', data={})
+    first, second = IdempotencyService(), IdempotencyService()
+    
+    outcome, claim = first.begin('orders.create_order:key-1', 'body-a')
+    first.abandon('orders.create_order:key-1', claim)
+    
+    assert store.reference('idempotency_keys').get() is None
+    assert second.begin('orders.create_order:key-1', 'body-a')[0] == 'run'
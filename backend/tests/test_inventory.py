@@ -0,0 +1,74 @@
+import pytest
+
+from app.repositories import configure_store, store
+from app.services import inventory_service as inventory_module
+from app.services.inventory_service import InventoryService
+from app.services.order_queue import OrderIntakeQueue
+
+PRODUCTS = {'product-1': {'quantity_available': 10}}
+
+def reserve(service, order_id, quantity):
+    return service.reserve(order_id, [{'product_id': 'product-1', 'quantity': quantity}], PRODUCTS)
+
+def test_restock_keeps_outstanding_holds():
+    configure_store('memory', data={})
+    service = InventoryService()
+    service.restock('product-1', 10)
+    
+    assert reserve(service, 'order-1', 3)['success']
+    service.restock('product-1', 20)
+    assert service.get_available('product-1') == 17
+    
+    # Releasing the hold returns what it took, without creating stock
+    assert service.release('order-1')
+    assert service.get_available('product-1') == 20
+    
+    service.restock('product-1', 5)
+    assert service.get_available('product-1') == 5
+
+def test_failed_reservation_record_gives_stock_back(monkeypatch):
+    configure_store('memory', data={})
+    service = InventoryService()
+    service.restock('product-1', 10)
+    
+    class FailingReservations:
+        def reference(self, path='/'):
+            if path.startswith('reservations/'):
+                raise RuntimeError('write failed')
+            return store.reference(path)
+        
+        TransactionAbortedError = store.TransactionAbortedError
+    
+    monkeypatch.setattr(inventory_module, 'store', FailingReservations())
+    with pytest.raises(RuntimeError):
+        reserve(service, 'order-1', 4)
+    
+    assert service.get_available('product-1') == 10
+
+def test_a_hold_expired_by_another_worker_refuses_the_queued_order(tmp_path):
+    configure_store('memory', data={})
+    service = InventoryService()
+    service.restock('product-1', 10)
+    assert reserve(service, 'order-1', 4)['success']
+    assert reserve(service, 'order-2', 3)['success']
+    store.reference('reservations/order-1/expires_at').set('2000-01-01T00:00:00')
+    
+    # The sweep runs on a worker whose queue does not hold order-1
+    assert service.release_expired() == 1
+    assert service.get_available('product-1') == 7
+    
+    queue = OrderIntakeQueue(queue_dir=str(tmp_path))
+    for order_id in ('order-1', 'order-2'):
+        queue.enqueue(order_id, {f'orders/{order_id}/status': 'pending'}, claims=service.commit_claims(order_id))
+    assert queue.wait_until_drained(timeout=5)
+    
+    assert store.reference('orders/order-1').get() is None
+    assert store.reference('reservations/order-1/status').get() == 'expired'
+    assert store.reference('orders/order-2/status').get() == 'pending'
+    assert store.reference('reservations/order-2/status').get() == 'committed'
+    assert queue.get_stats()['dead_lettered'] == 1
+    
+    # A committed hold is never expired
+    store.reference('reservations/order-2/expires_at').set('2000-01-01T00:00:00')
+    assert service.release_expired() == 0
+    assert service.get_available('product-1') == 7
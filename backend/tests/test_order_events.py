@@ -0,0 +1,44 @@
+import pytest
+
+from app.repositories import configure_store
+from app.repositories.base import Event
+from app.services.order_events import OrderEventHub, StreamLimitError
+
+def test_streams_beyond_the_cap_are_refused_until_one_closes():
+    configure_store('memory', data={})
+    hub = OrderEventHub()
+    hub.max_connections = 2
+    
+    first, _ = hub.subscribe(['vendor:v1'])
+    hub.subscribe(['supplier:s1'])
+    with pytest.raises(StreamLimitError):
+        hub.subscribe(['vendor:v2'])
+    
+    hub.unsubscribe(first)
+    hub.subscribe(['vendor:v2'])
+    
+    stats = hub.get_stats()
+    assert stats['connections'] == 2
+    assert stats['rejected_connections'] == 1
+
+def _feed(hub, event_type, path, data):
+    hub._on_change(Event(event_type, path, data))
+
+def test_a_stream_resumes_on_another_worker():
+    order = {'vendor_id': 'v1', 'supplier_id': 's1', 'status': 'pending', 'created_at': '2026-01-01T10:00:00'}
+    hubs = [OrderEventHub(), OrderEventHub()]
+    for hub in hubs:
+        hub._listener = object()  # fed by hand below
+        _feed(hub, 'put', '/', {})
+        _feed(hub, 'put', '/order-1', order)
+        _feed(hub, 'patch', '/order-1', {'status': 'confirmed', 'updated_at': '2026-01-01T10:05:00'})
+    
+    first, second = hubs
+    assert first.get_stats()['last_event_id'] == second.get_stats()['last_event_id']
+    
+    created_id = first._buffer[0][1]['id']
+    _, backlog = second.subscribe(['vendor:v1'], last_event_id=created_id)
+    assert [event['data']['status'] for event in backlog] == ['confirmed']
+    
+    _, backlog = second.subscribe(['vendor:v1'], last_event_id='order-9:unknown:created')
+    assert backlog is None
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+from app.repositories import configure_store, store
+from app.services.order_index import (
+    order_index_service, build_order_status_updates, order_summary, supplier_index_path, vendor_index_path
+)
+
+def seed_pending_orders(supplier_id, count):
+    start = datetime(2025, 1, 1, 9, 0, 0)
+    tree = {}
+    for index in range(count):
+        order_id = f'order-{index:03d}'
+        order = {
+            'id': order_id,
+            'vendor_id': 'vendor-1',
+            'supplier_id': supplier_id,
+            'status': 'pending',
+            'total_amount': 100,
+            'created_at': (start + timedelta(minutes=index)).isoformat()
+        }
+        path = supplier_index_path(order_id, order).split('/')
+        tree.setdefault(path[0], {}).setdefault(path[1], {}).setdefault(path[2], {})[path[3]] = order_summary(order_id, order)
+    configure_store('memory', data=tree)
+
+def test_supplier_inbox_pages_reach_every_order():
+    seed_pending_orders('supplier-1', 50)
+    
+    seen = []
+    cursor = None
+    while True:
+        page = order_index_service.get_supplier_orders('supplier-1', 'pending', limit=20, before=cursor)
+        seen.extend(entry['order_id'] for entry in page['orders'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    
+    assert len(seen) == 50
+    assert len(set(seen)) == 50
+    assert seen == sorted(seen, reverse=True)
+
+def test_status_change_writes_a_whole_vendor_entry():
+    order = {
+        'id': 'order-1',
+        'vendor_id': 'vendor-1',
+        'supplier_id': 'supplier-1',
+        'status': 'pending',
+        'total_amount': 100,
+        'created_at': '2025-01-01T09:00:00'
+    }
+    updates = build_order_status_updates('order-1', order, 'confirmed', '2025-01-01T10:00:00')
+    
+    vendor_path = vendor_index_path('order-1', order)
+    assert f'{vendor_path}/status' not in updates
+    assert updates[vendor_path] == {**order_summary('order-1', order), 'status': 'confirmed'}
+
+def test_supplier_inbox_pages_through_orders_sharing_a_timestamp():
+    seed_pending_orders('supplier-1', 30)
+    tab = store.reference('supplier_orders/supplier-1/pending')
+    for order_id in list(tab.get()):
+        tab.child(order_id).child('created_at').set('2025-01-01T09:00:00')
+    
+    seen = []
+    cursor = None
+    while True:
+        page = order_index_service.get_supplier_orders('supplier-1', 'pending', limit=7, before=cursor)
+        seen.extend(entry['order_id'] for entry in page['orders'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    
+    assert seen == sorted(seen, reverse=True)
+    assert len(set(seen)) == 30
@@ -0,0 +1,90 @@
+import json
+import os
+
+from app import create_app
+from app.repositories import configure_store, store
+from app.services import order_queue as order_queue_module
+from app.services.order_queue import OrderIntakeQueue
+
+def write_log(path, records):
+    with open(path, 'w') as log_file:
+        for record in records:
+            log_file.write(json.dumps(record) + '\n')
+
+def test_logs_beyond_the_worker_count_are_replayed(tmp_path):
+    configure_store('memory', data={})
+    # Left behind by a third worker before a scale-down
+    orphan = tmp_path / 'order_queue.2.wal'
+    write_log(orphan, [
+        {'seq': 1, 'order_id': 'order-1', 'updates': {'orders/order-1/status': 'pending'}},
+        {'commit': 1},
+        {'seq': 2, 'order_id': 'order-2', 'updates': {'orders/order-2/status': 'pending'}}
+    ])
+    
+    queue = OrderIntakeQueue(queue_dir=str(tmp_path))
+    queue.start()
+    
+    assert queue.get_stats()['replayed'] == 1
+    assert queue.wait_until_drained(timeout=5)
+    assert store.reference('orders/order-2/status').get() == 'pending'
+    assert store.reference('orders/order-1').get() is None
+    assert os.path.getsize(orphan) == 0
+    assert queue.path == str(tmp_path / 'order_queue.wal')
+
+class RefusingStore:
+    """Stands in for Firebase refusing any update that touches a bad order"""
+    
+    def __init__(self, bad_order_id):
+        self.bad_order_id = bad_order_id
+    
+    def reference(self, path='/'):
+        return self
+    
+    def update(self, updates):
+        if any(self.bad_order_id in path for path in updates):
+            raise ValueError('Invalid data')
+        store.reference().update(updates)
+
+def test_a_refused_entry_is_dead_lettered_without_blocking_later_orders(tmp_path, monkeypatch):
+    configure_store('memory', data={})
+    monkeypatch.setattr(order_queue_module, 'store', RefusingStore('order-bad'))
+    
+    queue = OrderIntakeQueue(queue_dir=str(tmp_path))
+    queue.retry_backoff = queue.max_backoff = 0.01
+    queue.max_attempts = 3
+    queue.enqueue('order-1', {'orders/order-1/status': 'pending'})
+    queue.enqueue('order-bad', {'orders/order-bad/status': 'pending'})
+    queue.enqueue('order-2', {'orders/order-2/status': 'pending'})
+    
+    assert queue.wait_until_drained(timeout=5)
+    assert store.reference('orders/order-1/status').get() == 'pending'
+    assert store.reference('orders/order-2/status').get() == 'pending'
+    assert queue.get_stats()['dead_lettered'] == 1
+    
+    with open(queue.dead_letter_path) as dead_letters:
+        records = [json.loads(line) for line in dead_letters]
+    assert [record['order_id'] for record in records] == ['order-bad']
+    assert records[0]['updates'] == {'orders/order-bad/status': 'pending'}
+    
+    # Set aside for good: a restarted worker does not replay it
+    log = open(queue.path)
+    assert OrderIntakeQueue._read_uncommitted(log)[0] == []
+    log.close()
+
+def test_order_bodies_are_validated_before_queueing():
+    configure_store('memory', data={})
+    client = create_app().test_client()
+    
+    for body, error in [
+        ([], 'Request body must be a JSON object'),
+        ({'items': [{'product': 'onion', 'quantity': 2}]}, 'vendor_id is required'),
+        ({'vendorId': 'v1', 'items': []}, 'items must be a non-empty list'),
+        ({'vendorId': 'v1', 'items': [{'product': 'onion', 'quantity': -1}]}, 'Item quantities must be positive numbers'),
+        ({'vendorId': 'v1', 'items': [{'product': 'onion', 'a.b': 1}]}, "Invalid field name: 'a.b'")
+    ]:
+        response = client.post('/api/orders/', json=body)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == error
+    
+    response = client.post('/api/orders/', json={'vendorId': 'v1', 'items': [{'product': 'onion', 'quantity': 2}]})
+    assert response.status_code == 202
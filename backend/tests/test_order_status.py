@@ -0,0 +1,37 @@
+from app import create_app
+from app.repositories import configure_store, store
+from app.services.order_queue import order_queue
+from app.services.order_status_service import order_status_service
+from app.utils.helpers import is_delivered_on_time
+
+def test_date_only_estimate_covers_the_whole_day():
+    assert is_delivered_on_time('2025-03-10T18:30:00', '2025-03-10')
+    assert not is_delivered_on_time('2025-03-11T08:00:00', '2025-03-10')
+
+def test_on_time_compares_instants_not_strings():
+    assert is_delivered_on_time('2025-03-10T09:00:00+05:30', '2025-03-10T04:00:00+00:00')
+    assert not is_delivered_on_time('2025-03-10T10:00:00+05:30', '2025-03-10T04:00:00Z')
+    assert is_delivered_on_time('2025-03-10T09:00:00', None)
+
+def test_transition_is_refused_while_the_order_write_is_queued(monkeypatch):
+    configure_store('memory', data={
+        'orders': {'order-1': {'id': 'order-1', 'supplier_id': 'supplier-1', 'status': 'pending'}}
+    })
+    monkeypatch.setattr(order_queue, 'is_pending', lambda order_id: order_id == 'order-1')
+    
+    outcome = order_status_service.apply_transitions([{'order_id': 'order-1', 'status': 'confirmed'}])
+    
+    assert outcome['updated'] == 0
+    assert outcome['results'][0]['error'] == 'Order is still being saved, retry shortly'
+    assert store.reference('orders/order-1/status').get() == 'pending'
+
+def test_an_order_not_in_the_database_yet_is_refused_with_a_conflict():
+    configure_store('memory', data={})
+    # Accepted by another worker, whose queue has not flushed it
+    client = create_app().test_client()
+    
+    response = client.put('/api/orders/order-1/status', json={'status': 'confirmed'})
+    
+    assert response.status_code == 409
+    assert response.get_json()['error'] == 'Order is still being saved, retry shortly'
+    assert store.reference('orders/order-1').get() is None
@@ -0,0 +1,54 @@
+import time
+from datetime import datetime, timedelta
+
+from app.repositories import configure_store
+from app.services.autocomplete_service import AutocompleteService
+from app.utils.prefix_trie import PrefixTrie
+
+def test_values_sharing_a_term_are_all_kept():
+    trie = PrefixTrie(top_k=5)
+    trie.insert('onion', 'Onion', 3)
+    trie.insert('onion', 'Masala Onion', 1)
+    
+    assert trie.complete('on') == [(3, 'Onion'), (1, 'Masala Onion')]
+    assert len(trie) == 1
+
+def test_remove_drops_only_the_given_value():
+    trie = PrefixTrie(top_k=5)
+    trie.insert('onion', 'Onion', 3)
+    trie.insert('onion', 'Masala Onion', 1)
+    trie.insert('onion rings', 'Onion Rings', 2)
+    
+    assert trie.remove('onion', 'Masala Onion')
+    assert not trie.remove('onion', 'Masala Onion')
+    assert trie.complete('on') == [(3, 'Onion'), (2, 'Onion Rings')]
+    
+    assert trie.remove('onion')
+    assert trie.complete('on') == [(2, 'Onion Rings')]
+    assert len(trie) == 1
+
+def test_removed_product_is_no_longer_suggested():
+    service = AutocompleteService()
+    service._built_at = time.monotonic()  # no background rebuild from the store
+    
+    service.add_product({'name': 'Masala Onion'})
+    assert 'Masala Onion' in [match['name'] for match in service.suggest('on', limit=10)]
+    
+    service.remove_product({'name': 'Masala Onion'})
+    names = [match['name'] for match in service.suggest('on', limit=10)]
+    assert 'Masala Onion' not in names
+    assert 'Onion' in names
+
+def test_rebuild_ranks_by_orders_inside_the_window_only():
+    recent = datetime.now().isoformat()
+    old = (datetime.now() - timedelta(days=60)).isoformat()
+    configure_store('memory', data={'orders': {
+        'order-1': {'created_at': recent, 'items': [{'product_name': 'Tomato'}]},
+        'order-2': {'created_at': recent, 'items': [{'product_name': 'Tomato'}]},
+        'order-3': {'created_at': old, 'items': [{'product_name': 'Turmeric'}] * 5}
+    }})
+    service = AutocompleteService()
+    service.rebuild()
+    
+    assert service.suggest('tom', limit=1) == [{'name': 'Tomato', 'popularity': 2}]
+    assert service.suggest('turm', limit=1) == [{'name': 'Turmeric', 'popularity': 0}]
@@ -0,0 +1,41 @@
+import pytest
+
+from app import create_app
+from app.repositories import configure_store
+from app.services.ranking_service import supplier_ranking_service
+
+@pytest.fixture
+def client():
+    configure_store('memory', data={})
+    return create_app().test_client()
+
+@pytest.mark.parametrize('body', [
+    {'location': {'lat': 19.07, 'lng': 72.87}, 'radius': 'far'},
+    {'location': {'lat': 19.07, 'lng': 72.87}, 'limit': 'all'},
+    {'location': {'lat': 19.07, 'lng': 72.87}, 'radius': -5},
+    {'location': {'lat': 19.07, 'lng': 72.87}, 'limit': 0},
+    ['not', 'an', 'object']
+])
+def test_bad_ranking_input_is_rejected(client, body):
+    response = client.post('/api/vendors/ranked-suppliers', json=body)
+    assert response.status_code == 400
+
+def test_numeric_strings_are_accepted(client):
+    response = client.post('/api/vendors/ranked-suppliers', json={
+        'location': {'lat': 19.07, 'lng': 72.87}, 'radius': '5', 'limit': '500'
+    })
+    assert response.status_code == 200
+
+def test_a_supplier_with_a_bad_location_is_skipped():
+    configure_store('memory', data={'suppliers': {
+        'supplier-1': {'business_name': 'Good', 'location': {'lat': 19.07, 'lng': 72.87}},
+        'supplier-2': {'business_name': 'Bad', 'location': {'lat': 'unknown', 'lng': 72.87}},
+        'supplier-3': {'business_name': 'Partial', 'location': {'lat': 19.07}}
+    }})
+    supplier_ranking_service.invalidate_candidates()
+    client = create_app().test_client()
+    
+    response = client.post('/api/vendors/ranked-suppliers', json={'location': {'lat': 19.07, 'lng': 72.87}})
+    
+    assert response.status_code == 200
+    assert [supplier['id'] for supplier in response.get_json()['suppliers']] == ['supplier-1']
@@ -0,0 +1,13 @@
+from app import create_app
+from app.repositories import configure_store
+
+def test_profiler_stats_are_served():
+    configure_store('memory', data={})
+    client = create_app().test_client()
+    
+    response = client.get('/profiler/stats')
+    
+    assert response.status_code == 200
+    stats = response.get_json()
+    assert stats['enabled'] is False
+    assert stats['profiled'] == 0
@@ -0,0 +1,11 @@
+import pytest
+
+from app.repositories.base import TreeStore
+
+def test_backend_missing_a_primitive_fails_at_construction():
+    class ReadOnlyStore(TreeStore):
+        def _read(self, parts):
+            return None
+    
+    with pytest.raises(TypeError):
+        ReadOnlyStore()
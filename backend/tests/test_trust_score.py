@@ -0,0 +1,61 @@
+from app.repositories import configure_store, store
+from app.services.order_index import order_summary, supplier_index_path
+from app.services.trust_score_service import TrustScoreService
+
+def delivered(order_id):
+    return {'order_id': order_id, 'status': 'delivered', 'delivered_on_time': True}
+
+def test_order_outcome_is_counted_once():
+    configure_store('memory', data={})
+    service = TrustScoreService()
+    
+    service.update_score_on_order_completion('supplier-1', delivered('order-1'))
+    service.update_score_on_order_completion('supplier-1', delivered('order-1'))
+    service.update_score_on_orders_completion('supplier-1', [delivered('order-1'), delivered('order-2')])
+    
+    aggregates = store.reference('trust_aggregates/supplier-1').get()
+    assert aggregates['total_orders'] == 2
+    assert aggregates['completed_orders'] == 2
+    assert 'counted_orders' not in aggregates
+    assert set(store.reference('trust_outcomes/supplier-1').get()) == {'order-1', 'order-2'}
+
+def test_aggregates_created_by_an_order_get_profile_components():
+    configure_store('memory', data={
+        'suppliers': {'supplier-1': {'is_verified': True, 'gst_number': 'GST1', 'avg_response_minutes': 15}}
+    })
+    service = TrustScoreService()
+    
+    service.update_score_on_order_completion('supplier-1', delivered('order-1'))
+    
+    aggregates = store.reference('trust_aggregates/supplier-1').get()
+    assert aggregates['verification_score'] == 75.0
+    assert aggregates['response_score'] == 100.0
+    
+    score = service.get_trust_score('supplier-1')
+    assert score['components']['business_verification'] == 75.0
+    assert score['components']['response_time'] == 100.0
+    assert 'degraded_components' not in score
+
+def test_rebuilt_orders_are_not_counted_again():
+    order = {'supplier_id': 'supplier-1', 'vendor_id': 'vendor-1', 'status': 'delivered',
+             'created_at': '2025-01-01T09:00:00'}
+    tree = {}
+    parts = supplier_index_path('order-1', order).split('/')
+    tree.setdefault(parts[0], {}).setdefault(parts[1], {}).setdefault(parts[2], {})[parts[3]] = order_summary('order-1', order)
+    configure_store('memory', data=tree)
+    service = TrustScoreService()
+    
+    assert service.rebuild_aggregates('supplier-1')['total_orders'] == 1
+    service.update_score_on_order_completion('supplier-1', delivered('order-1'))
+    
+    assert store.reference('trust_aggregates/supplier-1/total_orders').get() == 1
+
+def test_a_score_cached_by_one_worker_follows_updates_from_another():
+    configure_store('memory', data={})
+    first, second = TrustScoreService(), TrustScoreService()
+    
+    first.update_score_on_order_completion('supplier-1', delivered('order-1'))
+    assert first.get_trust_score('supplier-1')['total_orders'] == 1
+    
+    second.update_score_on_order_completion('supplier-1', delivered('order-2'))
+    assert first.get_trust_score('supplier-1')['total_orders'] == 2
@@ -0,0 +1,23 @@
+import pytest
+
+from app import create_app
+from app.repositories import configure_store
+
+@pytest.fixture
+def client():
+    configure_store('memory', data={})
+    return create_app().test_client()
+
+def test_missing_body_is_rejected(client):
+    response = client.post('/api/process-voice-orders/batch')
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('body', [['2 kg onion'], 'onion', 5])
+def test_non_object_body_is_rejected(client, body):
+    response = client.post('/api/process-voice-orders/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Request body must be a JSON object'
+
+def test_malformed_json_is_rejected(client):
+    response = client.post('/api/process-voice-orders/batch', data='{', content_type='application/json')
+    assert response.status_code == 400
@@ -2,6 +2,18 @@ import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL;
 
+// crypto.randomUUID only exists in secure contexts (https or localhost)
+const newIdempotencyKey = () => {
+  if (typeof crypto !== 'undefined' && crypto.randomUUID) {
+    return crypto.randomUUID();
+  }
+  if (typeof crypto !== 'undefined' && crypto.getRandomValues) {
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, (byte) => byte.toString(16).padStart(2, '0')).join('');
+  }
+  return `${Date.now().toString(16)}-${Math.random().toString(16).slice(2)}${Math.random().toString(16).slice(2)}`;
+};
+
 class ApiService {
   constructor() {
     this.api = axios.create({
@@ -61,17 +73,66 @@ class ApiService {
     return response.data;
   }
 
-  // Orders
-  async createOrder(orderData) {
-    const response = await this.api.post('/orders', orderData);
+  async processVoiceOrdersBatch(transcripts) {
+    const response = await this.api.post('/process-voice-orders/batch', {
+      transcripts
+    });
     return response.data;
   }
 
+  // Orders
+  async createOrder(orderData, idempotencyKey = newIdempotencyKey()) {
+    // Retries reuse the key so a flaky network cannot create duplicate orders
+    for (let attempt = 1; ; attempt++) {
+      try {
+        const response = await this.api.post('/orders', orderData, {
+          headers: { 'Idempotency-Key': idempotencyKey }
+        });
+        return response.data;
+      } catch (error) {
+        if (error.response || attempt >= 3) {
+          throw error;
+        }
+      }
+    }
+  }
+
   async updateOrderStatus(orderId, status) {
     const response = await this.api.put(`/orders/${orderId}/status`, { status });
     return response.data;
   }
 
+  async bulkUpdateOrderStatus(changes, supplierId) {
+    const response = await this.api.post('/orders/status/bulk', {
+      changes,
+      supplier_id: supplierId
+    });
+    return response.data;
+  }
+
+  // Live order changes over server-sent events; returns a function that closes the stream
+  subscribeToOrderEvents({ vendorId, supplierId }, onEvent, onReset) {
+    const params = new URLSearchParams();
+    if (vendorId) params.append('vendor_id', vendorId);
+    if (supplierId) params.append('supplier_id', supplierId);
+
+    // EventSource reconnects on its own and resumes from the last event ID
+    const source = new EventSource(`${API_BASE_URL}/orders/stream?${params}`);
+    ['order.created', 'order.updated', 'order.deleted'].forEach((type) => {
+      source.addEventListener(type, (event) => onEvent(type, JSON.parse(event.data)));
+    });
+    source.addEventListener('reset', () => onReset && onReset());
+
+    return () => source.close();
+  }
+
+  async getSupplierOrders(supplierId, status = 'pending', before = null) {
+    const params = { status };
+    if (before) params.before = before;
+    const response = await this.api.get(`/suppliers/${supplierId}/orders`, { params });
+    return response.data;
+  }
+
   async getVendorOrders(vendorId) {
     const response = await this.api.get(`/orders/vendor/${vendorId}`);
     return response.data;
@@ -102,6 +163,23 @@ class ApiService {
     return response.data;
   }
 
+  async getRankedSuppliers(location, { radius = 10, product, limit = 20 } = {}) {
+    const response = await this.api.post('/vendors/ranked-suppliers', {
+      location,
+      radius,
+      product,
+      limit
+    });
+    return response.data;
+  }
+
+  async autocompleteProducts(query, limit = 5) {
+    const response = await this.api.get('/vendors/products/autocomplete', {
+      params: { q: query, limit }
+    });
+    return response.data;
+  }
+
   async createGroupOrder(orderData) {
     const response = await this.api.post('/vendors/group-orders', orderData);
     return response.data;